@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare polling throughput and p99 latency between WSGI and ASGI deployments
+
+Starts gunicorn (WSGI, threaded workers) and uvicorn (ASGI) in turn against
+a throwaway database, then drives each with many concurrent keep-alive
+clients alternating the dataset list and summary requests, once through
+the sync DRF endpoints and once through the async /api/live/ endpoints.
+
+Requires gunicorn and uvicorn. Usage (from the backend directory):
+    python -m benchmarks.bench_asgi --clients 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import setup_django, create_dataset
+from benchmarks.http_client import HTTPConnection, start_server
+
+ENDPOINTS = {
+    'drf': ['/api/datasets/', '/api/datasets/{id}/summary/'],
+    'live': ['/api/live/datasets/', '/api/live/datasets/{id}/summary/'],
+}
+
+
+async def client(port, paths, token, deadline, latencies, errors):
+    """One keep-alive connection issuing GETs back to back until `deadline`"""
+    connection = HTTPConnection('127.0.0.1', port)
+    headers = {'Authorization': f'Token {token}'}
+    i = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            status, _, _ = await connection.request('GET', paths[i % len(paths)], headers)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            status = type(e).__name__
+        i += 1
+        if status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors.append(status)
+    connection.close()
+
+
+async def drive(port, paths, token, clients, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(client(port, paths, token, deadline, latencies, errors)
+                           for _ in range(clients)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200, help='concurrent connections')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per run')
+    parser.add_argument('--workers', type=int, default=2, help='server worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per WSGI worker')
+    parser.add_argument('--rows', type=int, default=1000, help='equipment rows in the polled dataset')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--servers', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework.authtoken.models import Token
+
+    dataset = create_dataset(args.rows)
+    token = Token.objects.create(user=dataset.uploaded_by).key
+    env = {'DB_NAME': str(settings.DATABASES['default']['NAME'])}
+
+    print(f'{args.clients} clients, {args.duration:.0f}s per run, {args.workers} workers'
+          f' ({args.threads} threads each under WSGI)')
+    print(f"{'server':>6} {'endpoints':>9} {'requests':>9} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for server in args.servers:
+        process = start_server(server, args.port, env, args.workers, args.threads)
+        try:
+            for name, paths in ENDPOINTS.items():
+                paths = [p.format(id=dataset.id) for p in paths]
+                # Warm up worker processes and connection pools
+                asyncio.run(drive(args.port, paths, token, min(args.clients, 20), 1))
+                latencies, errors = asyncio.run(
+                    drive(args.port, paths, token, args.clients, args.duration)
+                )
+                if latencies:
+                    q = statistics.quantiles(latencies, n=100)
+                    p50, p99 = f'{q[49]:.1f}', f'{q[98]:.1f}'
+                else:
+                    p50 = p99 = '-'
+                print(f'{server:>6} {name:>9} {len(latencies):>9} '
+                      f'{len(latencies) / args.duration:>8.0f} {p50:>8} {p99:>8} {len(errors):>7}')
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
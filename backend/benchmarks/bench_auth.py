@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark CachedTokenAuthentication against DRF's stock TokenAuthentication
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_auth --requests 20000 --tokens 1 100
+"""
+
+import argparse
+import random
+
+from benchmarks.common import setup_django, Timer
+
+
+def run(auth, requests, keys):
+    """Authenticate `requests` requests spread over `keys`; return (seconds, queries)"""
+    from django.db import connection
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    rng = random.Random(0)
+    prepared = [
+        Request(factory.get('/api/datasets/', HTTP_AUTHORIZATION=f'Token {rng.choice(keys)}'))
+        for _ in range(requests)
+    ]
+
+    queries = [0]
+
+    def count_query(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query), Timer() as timer:
+        for request in prepared:
+            auth.authenticate(request)
+    return timer.seconds, queries[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1, 100])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from equipment.authentication import CachedTokenAuthentication, _local_cache
+
+    print(f"{'tokens':>7} {'class':>28} {'us/request':>11} {'queries':>8}")
+    for count in args.tokens:
+        keys = []
+        for i in range(count):
+            user = User.objects.create_user(username=f'bench-auth-{count}-{i}')
+            keys.append(Token.objects.create(user=user).key)
+
+        for auth in (TokenAuthentication(), CachedTokenAuthentication()):
+            _local_cache.clear()
+            seconds, queries = run(auth, args.requests, keys)
+            print(f'{count:>7} {type(auth).__name__:>28} '
+                  f'{seconds / args.requests * 1e6:>11.1f} {queries:>8}')
+
+
+if __name__ == '__main__':
+    main()
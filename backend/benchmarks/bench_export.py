@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming dataset export throughput (MB/s) per format
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_export --rows 10000 100000
+"""
+
+import argparse
+import tracemalloc
+
+from benchmarks.common import setup_django, create_dataset, Timer
+
+
+def consume_export(client, dataset, export_format):
+    """Request one export and return the number of bytes streamed"""
+    response = client.get(f'/api/datasets/{dataset.id}/export/{export_format}/')
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+
+def run_export(client, dataset, export_format):
+    """Return (bytes, seconds, peak traced bytes) for one export format"""
+    # Timed pass without tracemalloc, whose overhead would distort throughput
+    with Timer() as timer:
+        total = consume_export(client, dataset, export_format)
+
+    tracemalloc.start()
+    consume_export(client, dataset, export_format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, timer.seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson', 'parquet'])
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.test import APIClient
+    from equipment.exports import parquet_available
+
+    formats = [f for f in args.formats if f != 'parquet' or parquet_available()]
+
+    # Warm up imports and the URL resolver so the first row isn't penalised
+    warmup = create_dataset(10)
+    client = APIClient()
+    client.force_authenticate(user=warmup.uploaded_by)
+    for export_format in formats:
+        consume_export(client, warmup, export_format)
+    warmup.delete()
+
+    print(f"{'rows':>10} {'format':>8} {'MB':>9} {'seconds':>9} {'MB/s':>8} {'peak MB':>8}")
+    for rows in args.rows:
+        dataset = create_dataset(rows)
+        client = APIClient()
+        client.force_authenticate(user=dataset.uploaded_by)
+        for export_format in formats:
+            size, seconds, peak = run_export(client, dataset, export_format)
+            mb = size / 1e6
+            print(f'{rows:>10} {export_format:>8} {mb:>9.2f} {seconds:>9.3f} '
+                  f'{mb / seconds:>8.2f} {peak / 1e6:>8.2f}')
+        dataset.delete()
+
+
+if __name__ == '__main__':
+    main()
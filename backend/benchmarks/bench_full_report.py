@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-dataset PDF report rendering: seconds and peak RSS per 10k rows
+
+Each render runs in a freshly spawned process so its peak RSS is not
+inflated by dataset creation or earlier renders. Peak RSS is read from
+/proc on Linux and from the resource module elsewhere on Unix.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_full_report --rows 10000 50000 100000
+"""
+
+import argparse
+import copy
+import multiprocessing
+import resource
+import sys
+
+from benchmarks.common import setup_django, create_dataset, Timer
+
+
+def _proc_status_mb(field):
+    """Read a memory field (e.g. VmRSS, VmHWM) from /proc/self/status in MB"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1e3
+    raise KeyError(field)
+
+
+def _reset_peak_rss():
+    """Reset the peak RSS high-water mark where the kernel allows it (Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    if sys.platform.startswith('linux'):
+        # VmHWM belongs to this process image; ru_maxrss is inherited from the parent
+        return _proc_status_mb('VmHWM')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def render_in_worker(databases, dataset_id):
+    """Render a full report and return (seconds, pages, RSS before, peak RSS)"""
+    from equipment.workers import init_django_worker
+    init_django_worker(databases)
+
+    from equipment.models import Dataset
+    from equipment.utils import generate_pdf_report
+
+    dataset = Dataset.objects.get(pk=dataset_id)
+    page_count = [0]
+    # Warm up ReportLab fonts and imports before taking the baseline
+    generate_pdf_report(dataset)
+    _reset_peak_rss()
+    rss_before = _peak_rss_mb()
+
+    with Timer() as timer:
+        generate_pdf_report(dataset, full=True,
+                            progress=lambda pages, rows: page_count.__setitem__(0, pages))
+    return timer.seconds, page_count[0], rss_before, _peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'rows':>10} {'pages':>7} {'seconds':>9} {'s/10k':>7} "
+          f"{'RSS MB':>8} {'+peak MB':>9} {'+MB/10k':>8}")
+    for rows in args.rows:
+        dataset = create_dataset(rows)
+        with context.Pool(1) as pool:
+            seconds, pages, rss_before, rss_peak = pool.apply(
+                render_in_worker, (copy.deepcopy(settings.DATABASES), dataset.id)
+            )
+        growth = rss_peak - rss_before
+        per_10k = rows / 10000
+        print(f'{rows:>10} {pages:>7} {seconds:>9.2f} {seconds / per_10k:>7.2f} '
+              f'{rss_peak:>8.1f} {growth:>9.1f} {growth / per_10k:>8.2f}')
+        dataset.delete()
+
+
+if __name__ == '__main__':
+    main()
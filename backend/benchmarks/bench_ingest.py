@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark CSV ingest (process_csv_file) on the configured database engine
+
+Runs on SQLite by default; set DB_ENGINE=postgresql and the DB_* variables
+to measure the COPY path against a local PostgreSQL server, e.g.:
+
+    DB_ENGINE=postgresql DB_USER=postgres python -m benchmarks.bench_ingest --rows 100000 1000000
+
+Add --per-row to also time the previous one-INSERT-per-row loop (slow).
+"""
+
+import argparse
+
+import pandas as pd
+
+from benchmarks.common import setup_django, synthetic_rows, Timer
+
+
+def per_row_ingest(dataset, df):
+    """The previous ingest path: one Equipment.objects.create per row"""
+    from equipment.models import Equipment
+
+    for _, row in df.iterrows():
+        Equipment.objects.create(
+            dataset=dataset,
+            equipment_name=row['Equipment Name'],
+            equipment_type=row['Type'],
+            flowrate=row['Flowrate'],
+            pressure=row['Pressure'],
+            temperature=row['Temperature']
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--per-row', action='store_true', help='also time the per-row INSERT loop')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+    from equipment.models import Dataset
+    from equipment.utils import process_csv_file
+
+    user = User.objects.create(username='bench-ingest')
+    print(f'database: {connection.vendor}')
+    print(f"{'rows':>10} {'method':>10} {'seconds':>9} {'rows/s':>11}")
+    for rows in args.rows:
+        df = pd.DataFrame(
+            synthetic_rows(rows),
+            columns=['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'],
+        )
+
+        with Timer() as timer:
+            dataset, _ = process_csv_file(df, f'bench_{rows}.csv', user)
+        assert dataset.equipment_items.count() == rows
+        print(f"{rows:>10} {'bulk':>10} {timer.seconds:>9.2f} {rows / timer.seconds:>11,.0f}")
+        dataset.delete()
+
+        if args.per_row:
+            dataset = Dataset.objects.create(name=f'bench_{rows}.csv', uploaded_by=user)
+            with Timer() as timer, transaction.atomic():
+                per_row_ingest(dataset, df)
+            print(f"{rows:>10} {'per-row':>10} {timer.seconds:>9.2f} {rows / timer.seconds:>11,.0f}")
+            dataset.delete()
+
+
+if __name__ == '__main__':
+    main()
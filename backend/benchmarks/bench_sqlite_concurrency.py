@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure API read latency on SQLite while a large CSV upload is ingested
+
+Reader threads poll the dataset list and summary endpoints, first on an idle
+database and then while another thread ingests a large upload through the
+writer queue. Run it once as is and once with --untuned (rollback journal,
+no pragmas) to see what the WAL/pragma tuning buys.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_sqlite_concurrency --rows 1000000
+    python -m benchmarks.bench_sqlite_concurrency --rows 1000000 --untuned
+"""
+
+import argparse
+import logging
+import statistics
+import threading
+
+import pandas as pd
+
+from benchmarks.common import setup_django, create_dataset, synthetic_rows, Timer
+
+
+def poll(client, dataset_id, stop, latencies, errors):
+    """Alternate list/summary requests until `stop` is set"""
+    from django.db import connection
+
+    urls = ['/api/datasets/', f'/api/datasets/{dataset_id}/summary/']
+    i = 0
+    try:
+        while not stop.is_set():
+            with Timer() as timer:
+                try:
+                    status = client.get(urls[i % 2]).status_code
+                except Exception as e:
+                    status = type(e).__name__
+            if status == 200:
+                latencies.append(timer.seconds * 1000)
+            else:
+                errors.append(status)
+            i += 1
+    finally:
+        connection.close()
+
+
+def run_readers(make_client, dataset_id, readers, until):
+    """Poll with `readers` threads while `until()` runs; return (latencies ms, errors)"""
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=poll, args=(make_client(), dataset_id, stop, latencies, errors))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        until()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return latencies, errors
+
+
+def describe(label, latencies, errors):
+    """Print request count, latency percentiles and error count for a phase"""
+    if latencies:
+        q = statistics.quantiles(latencies, n=100)
+        print(f'{label:>14} {len(latencies):>9} {q[49]:>8.1f} {q[94]:>8.1f} '
+              f'{max(latencies):>9.1f} {len(errors):>7}')
+    else:
+        print(f'{label:>14} {0:>9} {"-":>8} {"-":>8} {"-":>9} {len(errors):>7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='rows in the ingested upload')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--idle-seconds', type=float, default=3.0)
+    parser.add_argument('--untuned', action='store_true',
+                        help='rollback journal and no pragmas, as before SQLITE_PRAGMAS')
+    args = parser.parse_args()
+
+    from django.conf import settings
+    if args.untuned:
+        # Must happen before the first connection is opened
+        settings.SQLITE_PRAGMAS = {'journal_mode': 'DELETE'}
+    setup_django()
+    # Failed requests are counted below; don't print a traceback for each
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from equipment.utils import process_csv_file
+    from equipment.write_queue import serialized_write
+
+    dataset = create_dataset(10000)
+    token = Token.objects.create(user=dataset.uploaded_by)
+    writer = User.objects.create(username='bench-writer')
+
+    def make_client():
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    df = pd.DataFrame(
+        synthetic_rows(args.rows),
+        columns=['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'],
+    )
+
+    mode = 'untuned' if args.untuned else 'tuned'
+    print(f'{mode}: {args.readers} readers, {args.rows} row upload')
+    print(f"{'phase':>14} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9} {'errors':>7}")
+
+    idle = threading.Event()
+    describe('idle', *run_readers(make_client, dataset.id, args.readers,
+                                  lambda: idle.wait(args.idle_seconds)))
+
+    ingest = {}
+
+    def upload():
+        with Timer() as timer:
+            serialized_write(process_csv_file, df, 'bench_upload.csv', writer)
+        ingest['seconds'] = timer.seconds
+
+    describe('during ingest', *run_readers(make_client, dataset.id, args.readers, upload))
+    print(f"ingest: {ingest['seconds']:.1f}s ({args.rows / ingest['seconds']:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Shared helpers for the offline backend benchmarks
+
+Benchmarks run against a throwaway database so they never touch the
+configured one. Run them from the backend directory, e.g.:
+
+    python -m benchmarks.bench_export --rows 100000
+"""
+
+import csv
+import io
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chemical_equipment_backend.settings')
+
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+CSV_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+
+def setup_django():
+    """
+    Configure Django against a throwaway database and migrate it
+
+    SQLite benchmarks use a temporary file. Other engines (DB_ENGINE=postgresql)
+    get a fresh test database next to the configured one, which is dropped
+    and recreated on every run.
+    """
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    db_dir = tempfile.mkdtemp(prefix='equipment-bench-')
+    django.setup()
+    if connection.vendor == 'sqlite':
+        # Connections are created lazily, so this takes effect before first use
+        settings.DATABASES['default']['NAME'] = os.path.join(db_dir, 'bench.sqlite3')
+        call_command('migrate', verbosity=0)
+    else:
+        # Creates test_<NAME>, migrates it and points the connection at it
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    return db_dir
+
+
+def synthetic_rows(count, seed=42, type_weights=None):
+    """
+    Yield (name, type, flowrate, pressure, temperature) tuples
+
+    Args:
+        count: number of rows
+        seed: random seed, so the same arguments give the same rows
+        type_weights: optional {type: weight} mix; defaults to an even mix
+            of EQUIPMENT_TYPES
+    """
+    rng = random.Random(seed)
+    types = list(type_weights) if type_weights else EQUIPMENT_TYPES
+    weights = list(type_weights.values()) if type_weights else None
+    for i in range(count):
+        eq_type = rng.choices(types, weights)[0] if weights else rng.choice(types)
+        yield (
+            f'{eq_type}-{i + 1}',
+            eq_type,
+            round(rng.uniform(50, 250), 2),
+            round(rng.uniform(1, 15), 2),
+            round(rng.uniform(60, 200), 2),
+        )
+
+
+def synthetic_csv(count, seed=42, type_weights=None):
+    """Return an upload-ready CSV (bytes) of `count` synthetic equipment rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(synthetic_rows(count, seed, type_weights))
+    return buffer.getvalue().encode()
+
+
+def create_dataset(rows, username='bench'):
+    """Create a user and a dataset populated with `rows` synthetic equipment items"""
+    from django.contrib.auth.models import User
+    from equipment.models import Dataset, Equipment
+
+    user, _ = User.objects.get_or_create(username=username)
+    dataset = Dataset.objects.create(name=f'bench_{rows}.csv', uploaded_by=user, total_count=rows)
+    Equipment.objects.bulk_create(
+        (
+            Equipment(dataset=dataset, equipment_name=name, equipment_type=eq_type,
+                      flowrate=flowrate, pressure=pressure, temperature=temperature)
+            for name, eq_type, flowrate, pressure, temperature in synthetic_rows(rows)
+        ),
+        batch_size=5000,
+    )
+    return dataset
+
+
+class Timer:
+    """Context manager measuring wall-clock seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        return False
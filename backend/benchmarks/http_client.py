@@ -0,0 +1,133 @@
+"""
+Minimal asyncio HTTP/1.1 client and local server launcher for load tests
+
+A keep-alive connection per virtual user costs a socket and a coroutine
+rather than a thread, so a single load generator process can hold
+hundreds of concurrent users. Only what the API needs is supported:
+Content-Length and chunked bodies, and Connection: close.
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class HTTPConnection:
+    """A lazily (re)opened keep-alive connection to one host"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=b''):
+        """Send a request and return (status, headers dict, body bytes)"""
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            lines.append(f'Content-Length: {len(body)}')
+        data = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        # Servers close idle keep-alive connections; retry once on a fresh one
+        for reused in (self.writer is not None, False):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self.writer.write(data)
+                await self.writer.drain()
+                return await self._read_response()
+            except ConnectionError:
+                self.close()
+                if not reused:
+                    raise
+            except BaseException:
+                self.close()
+                raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('server closed the connection')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in response_headers:
+            body = await self.reader.readexactly(int(response_headers['content-length']))
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            await self.reader.readline()
+            body = b''.join(chunks)
+        else:
+            body = await self.reader.read()
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def multipart_body(field, filename, content, content_type='text/csv'):
+    """Encode a single file field as multipart/form-data; return (body, content type header)"""
+    boundary = f'----loadtest{os.urandom(8).hex()}'
+    body = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def server_command(server, port, workers=2, threads=8):
+    """Command line starting the backend under runserver, gunicorn (wsgi) or uvicorn (asgi)"""
+    if server == 'runserver':
+        return [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+    if server == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'chemical_equipment_backend.wsgi:application',
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+                '--worker-class', 'gthread', '--threads', str(threads),
+                '--keep-alive', '30', '--timeout', '300', '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'chemical_equipment_backend.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--no-access-log', '--log-level', 'warning']
+
+
+def wait_for_port(port, timeout=30, process=None):
+    """Block until something listens on the local port (or `process` exits)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'server exited with status {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server did not start listening on port {port}')
+
+
+def start_server(server, port, env, workers=2, threads=8):
+    """Start a local backend server process and wait until it accepts connections"""
+    process = subprocess.Popen(server_command(server, port, workers, threads), cwd=BACKEND_DIR,
+                               env=dict(os.environ, **env))
+    try:
+        wait_for_port(port, process=process)
+    except BaseException:
+        process.terminate()
+        raise
+    return process
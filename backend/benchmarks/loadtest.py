@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+End-to-end HTTP load test with a mixed population of simulated users
+
+Virtual users are split between three roles:
+  uploader    uploads synthetic equipment CSVs
+  poller      polls the dataset list and latest summary like the desktop
+              auto-refresh (--live polls the async change feed instead)
+  downloader  downloads PDF reports of listed datasets
+
+Users share a handful of accounts (--accounts), the way a plant team
+shares a login; each account gets one seed upload before timing starts.
+Throughput, errors and latency percentiles are reported per endpoint.
+
+Run against a server you started yourself:
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --users 500 --duration 60
+
+or let the harness start one on a throwaway database (runserver, wsgi or asgi):
+    python -m benchmarks.loadtest --start-server wsgi --users 200 --duration 30
+
+Only write the synthetic CSVs to a directory:
+    python -m benchmarks.loadtest --save-csvs /tmp/csvs --csv-rows 1000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from urllib.parse import quote, urlsplit
+
+from benchmarks.common import synthetic_csv
+from benchmarks.http_client import HTTPConnection, multipart_body, start_server
+
+
+ROLES = ('uploader', 'poller', 'downloader')
+
+
+def parse_weights(text):
+    """Parse 'a=3,b=1' into {'a': 3.0, 'b': 1.0}"""
+    weights = {}
+    for part in filter(None, text.split(',')):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Recorder:
+    """Latencies and failures per endpoint label"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.active = False
+
+    def record(self, label, seconds, status):
+        if not self.active:
+            return
+        if isinstance(status, int) and status < 400:
+            self.latencies[label].append(seconds * 1000)
+        else:
+            self.errors[label][status] += 1
+
+    def summary(self, duration):
+        rows = []
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[label])
+            errors = self.errors[label]
+            q = (statistics.quantiles(latencies, n=100, method='inclusive')
+                 if len(latencies) > 1 else latencies * 99)
+            rows.append({
+                'endpoint': label,
+                'requests': len(latencies) + sum(errors.values()),
+                'rps': len(latencies) / duration,
+                'errors': dict(errors),
+                'p50': q[49] if q else None,
+                'p90': q[89] if q else None,
+                'p99': q[98] if q else None,
+                'max': latencies[-1] if latencies else None,
+            })
+        return rows
+
+
+class Client:
+    """One virtual user's keep-alive connection, timing every request"""
+
+    def __init__(self, host, port, token, recorder, timeout):
+        self.connection = HTTPConnection(host, port)
+        self.headers = {'Authorization': f'Token {token}'} if token else {}
+        self.recorder = recorder
+        self.timeout = timeout
+
+    async def request(self, label, method, path, body=b'', headers=None):
+        """Return (status, body); status is an exception name on network failure"""
+        start = time.perf_counter()
+        try:
+            status, _, content = await asyncio.wait_for(
+                self.connection.request(method, path, dict(self.headers, **(headers or {})), body),
+                self.timeout,
+            )
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError,
+                asyncio.TimeoutError) as e:
+            status, content = type(e).__name__, b''
+        self.recorder.record(label, time.perf_counter() - start, status)
+        return status, content
+
+    async def get_json(self, label, path):
+        status, content = await self.request(label, 'GET', path)
+        return json.loads(content) if status == 200 else None
+
+    async def upload(self, filename, content):
+        body, content_type = multipart_body('file', filename, content)
+        return await self.request('POST /api/datasets/upload_csv/', 'POST',
+                                  '/api/datasets/upload_csv/', body, {'Content-Type': content_type})
+
+    def close(self):
+        self.connection.close()
+
+
+def jittered(seconds):
+    return seconds * random.uniform(0.5, 1.5)
+
+
+async def uploader(client, deadline, args, csvs):
+    while time.monotonic() < deadline:
+        rows, content = random.choice(csvs)
+        await client.upload(f'loadtest_{rows}.csv', content)
+        await asyncio.sleep(jittered(args.upload_interval))
+
+
+async def poller(client, deadline, args, csvs):
+    since = None
+    while time.monotonic() < deadline:
+        if args.live:
+            path = '/api/live/datasets/changes/' + (f'?since={quote(since)}' if since else '')
+            feed = await client.get_json('GET /api/live/datasets/changes/', path)
+            if feed:
+                since = feed['latest'] or since
+                if feed['datasets']:
+                    await client.get_json('GET /api/live/datasets/{id}/summary/',
+                                          f"/api/live/datasets/{feed['datasets'][0]['id']}/summary/")
+        else:
+            datasets = await client.get_json('GET /api/datasets/', '/api/datasets/')
+            if datasets:
+                await client.get_json('GET /api/datasets/{id}/summary/',
+                                      f"/api/datasets/{datasets[0]['id']}/summary/")
+        await asyncio.sleep(jittered(args.poll_interval))
+
+
+async def downloader(client, deadline, args, csvs):
+    while time.monotonic() < deadline:
+        datasets = await client.get_json('GET /api/datasets/', '/api/datasets/')
+        if datasets:
+            dataset_id = random.choice(datasets)['id']
+            await client.request('GET /api/datasets/{id}/generate_report/', 'GET',
+                                 f'/api/datasets/{dataset_id}/generate_report/')
+        await asyncio.sleep(jittered(args.download_interval))
+
+
+BEHAVIOURS = {'uploader': uploader, 'poller': poller, 'downloader': downloader}
+
+
+def assign_roles(users, mix):
+    """Split `users` between roles in proportion to the mix weights"""
+    total = sum(mix.values())
+    counts = {role: int(users * mix.get(role, 0) / total) for role in ROLES}
+    # Hand out rounding leftovers to the most heavily weighted roles
+    for role in sorted(ROLES, key=lambda r: -mix.get(r, 0)):
+        if sum(counts.values()) >= users:
+            break
+        counts[role] += 1
+    return counts
+
+
+async def create_accounts(host, port, count, csvs, timeout):
+    """Register `count` accounts with one seed upload each; return their tokens"""
+    run_id = os.urandom(4).hex()
+    tokens = []
+    for i in range(count):
+        client = Client(host, port, None, Recorder(), timeout)
+        body = json.dumps({'username': f'loadtest-{run_id}-{i}', 'password': 'loadtest-pass'}).encode()
+        status, content = await client.request('register', 'POST', '/api/auth/register/', body,
+                                               {'Content-Type': 'application/json'})
+        if status != 201:
+            raise RuntimeError(f'registering a load test account failed: {status} {content[:200]!r}')
+        client.headers['Authorization'] = f"Token {json.loads(content)['token']}"
+        rows, content = csvs[i % len(csvs)]
+        await client.upload(f'seed_{rows}.csv', content)
+        client.close()
+        tokens.append(client.headers['Authorization'].split()[1])
+    return tokens
+
+
+async def run(args, host, port, csvs):
+    recorder = Recorder()
+    tokens = await create_accounts(host, port, args.accounts, csvs, args.timeout)
+    counts = assign_roles(args.users, parse_weights(args.mix))
+    print('users: ' + ', '.join(f'{n} {role}s' for role, n in counts.items()) +
+          f' over {args.accounts} accounts')
+
+    roles = [role for role, n in counts.items() for _ in range(n)]
+    random.shuffle(roles)
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    clients = []
+
+    async def user(i, role):
+        # Stagger start-up across the ramp-up period
+        await asyncio.sleep(args.ramp_up * i / max(len(roles), 1))
+        client = Client(host, port, tokens[i % len(tokens)], recorder, args.timeout)
+        clients.append(client)
+        await BEHAVIOURS[role](client, deadline, args, csvs)
+
+    async def measure():
+        # Only the steady state after ramp-up is recorded
+        await asyncio.sleep(args.ramp_up)
+        recorder.active = True
+
+    await asyncio.gather(measure(), *(user(i, role) for i, role in enumerate(roles)))
+    for client in clients:
+        client.close()
+    return recorder
+
+
+def print_summary(rows, duration):
+    print(f"\n{'endpoint':<42} {'requests':>8} {'req/s':>7} {'errors':>6} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    def ms(value):
+        return f'{value:.1f}' if value is not None else '-'
+
+    for row in rows:
+        print(f"{row['endpoint']:<42} {row['requests']:>8} {row['rps']:>7.1f} "
+              f"{sum(row['errors'].values()):>6} {ms(row['p50']):>8} {ms(row['p90']):>8} "
+              f"{ms(row['p99']):>8} {ms(row['max']):>8}")
+        if row['errors']:
+            print(' ' * 4 + ', '.join(f'{status}: {n}' for status, n in row['errors'].items()))
+    total = sum(row['requests'] for row in rows)
+    print(f'\ntotal: {total} requests in {duration:.0f}s ({total / duration:.1f} req/s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split('\n', 2)[2])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default='http://127.0.0.1:8000', help='running backend to test')
+    target.add_argument('--start-server', choices=['runserver', 'wsgi', 'asgi'],
+                        help='start a local server on a throwaway database instead')
+    parser.add_argument('--port', type=int, default=8766, help='port for --start-server')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes for --start-server')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--mix', default='uploader=1,poller=17,downloader=2',
+                        help='relative weights of the user roles')
+    parser.add_argument('--accounts', type=int, default=5)
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='seconds to start all users')
+    parser.add_argument('--timeout', type=float, default=60.0, help='per-request timeout')
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    parser.add_argument('--upload-interval', type=float, default=20.0)
+    parser.add_argument('--download-interval', type=float, default=15.0)
+    parser.add_argument('--live', action='store_true', help='pollers use the async change feed')
+    parser.add_argument('--csv-rows', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='sizes of the synthetic CSVs uploaders pick from')
+    parser.add_argument('--type-mix', default='',
+                        help="equipment type weights, e.g. 'Pump=5,Valve=3,Reactor=1'")
+    parser.add_argument('--save-csvs', metavar='DIR', help='write the synthetic CSVs to DIR and exit')
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    type_weights = parse_weights(args.type_mix) or None
+    csvs = [(rows, synthetic_csv(rows, args.seed + i, type_weights))
+            for i, rows in enumerate(args.csv_rows)]
+
+    if args.save_csvs:
+        os.makedirs(args.save_csvs, exist_ok=True)
+        for rows, content in csvs:
+            path = os.path.join(args.save_csvs, f'equipment_{rows}.csv')
+            with open(path, 'wb') as f:
+                f.write(content)
+            print(path)
+        return
+
+    process = None
+    if args.start_server:
+        from benchmarks.common import setup_django
+        from django.conf import settings
+
+        db_dir = setup_django()
+        env = {
+            'DB_NAME': str(settings.DATABASES['default']['NAME']),
+            'REPORT_CACHE_DIR': os.path.join(db_dir, 'report_cache'),
+        }
+        process = start_server(args.start_server, args.port, env, args.workers)
+        host, port = '127.0.0.1', args.port
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        recorder = asyncio.run(run(args, host, port, csvs))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    rows = recorder.summary(args.duration)
+    print_summary(rows, args.duration)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'endpoints': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the backend hot paths, with regression thresholds
+
+Times process_csv_file, generate_pdf_report (preview and full),
+DatasetSerializer and the dataset retention prune across input sizes on a
+temporary SQLite database. Each case reports the median of --repeat runs
+and is compared with a stored baseline; the command exits with status 1
+if any case is slower than baseline by more than --threshold.
+
+Baselines depend on the machine, so record one on the machine that will
+run the comparisons (e.g. the CI runner) before changing code:
+
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite --threshold 0.25
+    python -m benchmarks.suite --filter pdf --repeat 3
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+
+import pandas as pd
+
+from benchmarks.common import CSV_COLUMNS, setup_django, create_dataset, synthetic_rows, Timer
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Datasets kept by the retention prune in views._prune_datasets
+RETAINED_DATASETS = 5
+
+
+def case_process_csv(rows):
+    """Ingest an uploaded DataFrame: summary stats, dataset and equipment rows"""
+    from django.contrib.auth.models import User
+    from equipment.utils import process_csv_file
+
+    df = pd.DataFrame(synthetic_rows(rows), columns=CSV_COLUMNS)
+    user, _ = User.objects.get_or_create(username='bench')
+    return (
+        None,
+        lambda _: process_csv_file(df, f'bench_{rows}.csv', user),
+        lambda result: result[0].delete(),
+    )
+
+
+def case_pdf_preview(rows):
+    """Render the default report (summary, charts, first rows) to memory"""
+    from equipment.utils import generate_pdf_report
+
+    dataset = create_dataset(rows)
+    return None, lambda _: generate_pdf_report(dataset, output=io.BytesIO()), None
+
+
+def case_pdf_full(rows):
+    """Render the full report listing every equipment row to memory"""
+    from equipment.utils import generate_pdf_report
+
+    dataset = create_dataset(rows)
+    return None, lambda _: generate_pdf_report(dataset, output=io.BytesIO(), full=True), None
+
+
+def case_dataset_serializer(rows):
+    """Serialize a dataset with all of its equipment items (dataset detail view)"""
+    from equipment.models import Dataset
+    from equipment.serializers import DatasetSerializer
+
+    dataset_id = create_dataset(rows).id
+    return (
+        lambda: Dataset.objects.get(pk=dataset_id),
+        lambda dataset: DatasetSerializer(dataset).data,
+        None,
+    )
+
+
+def case_retention_prune(rows):
+    """Prune to the newest datasets after an upload; each pruned dataset has `rows` items"""
+    from equipment.models import Dataset
+    from equipment.views import _prune_datasets
+
+    Dataset.objects.all().delete()
+
+    def before():
+        for _ in range(RETAINED_DATASETS * 2):
+            create_dataset(rows)
+
+    return before, lambda _: _prune_datasets(), lambda _: Dataset.objects.all().delete()
+
+
+# name -> (function, default sizes)
+CASES = {
+    'process_csv_file': (case_process_csv, [1000, 10000, 50000]),
+    'generate_pdf_report': (case_pdf_preview, [1000, 100000]),
+    'generate_pdf_report_full': (case_pdf_full, [1000, 10000]),
+    'dataset_serializer': (case_dataset_serializer, [100, 1000, 10000]),
+    'retention_prune': (case_retention_prune, [1000, 10000]),
+}
+
+
+def measure(before, run, after, repeat):
+    """Median seconds of `repeat` timed runs, after one untimed warm-up run"""
+    timings = []
+    for i in range(repeat + 1):
+        arg = before() if before else None
+        with Timer() as timer:
+            result = run(arg)
+        if after:
+            after(result)
+        if i:
+            timings.append(timer.seconds)
+    return statistics.median(timings)
+
+
+def compare(results, baseline, threshold):
+    """Print results against the baseline; return the names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<34} {'median ms':>10} {'baseline ms':>12} {'change':>8}  status")
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f'{name:<34} {seconds * 1000:>10.1f} {"-":>12} {"-":>8}  new')
+            continue
+        change = seconds / base - 1
+        status = 'ok'
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            status = 'faster'
+        print(f'{name:<34} {seconds * 1000:>10.1f} {base * 1000:>12.1f} {change:>+8.1%}  {status}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split('\n', 2)[2])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results as the new baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown before failing, as a fraction (0.2 = 20%%)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    args = parser.parse_args()
+
+    db_dir = setup_django()
+    from django.conf import settings
+    # Keep rendered charts out of the real report cache
+    settings.REPORT_CACHE_DIR = os.path.join(db_dir, 'report_cache')
+
+    results = {}
+    for case, (function, sizes) in CASES.items():
+        if args.filter not in case:
+            continue
+        for size in sizes:
+            name = f'{case}[{size}]'
+            results[name] = measure(*function(size), args.repeat)
+            print(f'{name:<34} {results[name] * 1000:>10.1f} ms', flush=True)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'machine': platform.platform(),
+                'python': platform.python_version(),
+                'results': baseline,
+            }, f, indent=2, sort_keys=True)
+        print(f'\nbaseline written to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f'no baseline at {args.baseline}; record one with --save-baseline')
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != platform.platform():
+        print(f"warning: baseline was recorded on {baseline.get('machine')}")
+
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        sys.exit(f'\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: '
+                 + ', '.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
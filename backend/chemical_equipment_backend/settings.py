@@ -29,14 +29,15 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'equipment',  # Before staticfiles so its runserver command takes precedence
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
-    'equipment',
 ]
 
 MIDDLEWARE = [
+    'equipment.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -71,12 +72,31 @@ WSGI_APPLICATION = 'chemical_equipment_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Set DB_ENGINE=postgresql (plus DB_NAME, DB_USER, DB_PASSWORD, DB_HOST,
+# DB_PORT) to run on PostgreSQL; SQLite is used otherwise.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'chemical_equipment'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Keep connections open between requests instead of reconnecting each time
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
     }
-}
 
 
 # Password validation
@@ -123,7 +143,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'equipment.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -131,6 +151,12 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Token authentication settings
+TOKEN_EXPIRY_HOURS = 168  # 7 days; login issues a fresh token after expiry (0 disables)
+TOKEN_AUTH_CACHE_SIZE = 10000  # Tokens kept in each process's LRU cache
+TOKEN_AUTH_CACHE_TTL = 60  # Seconds a cached token is trusted before re-checking the DB
+TOKEN_AUTH_SHARED_CACHE = None  # Name of a CACHES alias (e.g. Redis) shared by all processes
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -141,3 +167,44 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # CSV upload settings
 MAX_UPLOAD_SIZE = 5242880  # 5MB
+
+# CSV ingest settings
+INGEST_BATCH_SIZE = 5000  # Equipment rows per bulk insert / COPY write
+
+# Export settings
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched and written per streamed chunk
+
+# PDF report cache settings
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(BASE_DIR, 'report_cache'))
+REPORT_CACHE_MAX_BYTES = 524288000  # 500MB, least recently used reports are evicted first
+REPORT_CACHE_ACCEL_REDIRECT = ''  # e.g. '/protected/reports/' to serve via nginx X-Accel-Redirect
+
+# Background report job settings
+REPORT_JOB_WORKERS = 2  # Size of the report rendering process pool
+REPORT_JOB_MAX_PENDING = 5  # Unfinished jobs allowed per user
+REPORT_JOB_PROGRESS_INTERVAL = 0.5  # Seconds between progress updates written by workers
+BATCH_REPORT_MAX_DATASETS = 50  # Reports per batch zip download
+
+# SQLite concurrency settings (ignored on other databases)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Readers keep working while a write transaction is open
+    'synchronous': 'NORMAL',  # Durable with WAL; fsync only at checkpoints
+    'busy_timeout': 30000,  # ms to wait for the write lock before "database is locked"
+    'mmap_size': 268435456,  # 256MB of the database file read through mmap
+    'cache_size': -65536,  # 64MB page cache per connection (negative means KiB)
+    'temp_store': 'MEMORY',
+}
+SQLITE_WRITE_QUEUE = True  # Run upload writes one at a time on a single writer thread
+
+# Instrumentation settings
+SERVER_TIMING_HEADER = True  # Per-phase timings in a Server-Timing response header
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # If set, /metrics requires "Authorization: Bearer <token>"
+
+# Request profiling settings (staff send "X-Profile: 1" or ?profile=1)
+PROFILING_ENABLED = True
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_FILES = 200  # Oldest profiles are deleted beyond this
+
+# Equipment paging settings
+EQUIPMENT_PAGE_SIZE = 5000  # Default rows per page of /datasets/<id>/equipment/
+EQUIPMENT_PAGE_MAX = 20000  # Largest page a client may request
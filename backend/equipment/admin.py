@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Dataset, Equipment
+from .models import Dataset, Equipment, ReportJob
 
 
 @admin.register(Dataset)
@@ -14,3 +14,9 @@ class EquipmentAdmin(admin.ModelAdmin):
     list_display = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature', 'dataset']
     list_filter = ['equipment_type', 'dataset']
     search_fields = ['equipment_name', 'equipment_type']
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['dataset', 'requested_by', 'status', 'pages_done', 'rows_done', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
@@ -0,0 +1,116 @@
+"""
+Native async read endpoints for polling clients
+
+DRF views are synchronous, so under ASGI each DRF request still ties up a
+worker thread for its whole duration. These plain Django async views serve
+the read-heavy polling endpoints with the async ORM instead: while a
+request waits on the database or a slow client, the event loop serves
+others. Responses match the corresponding DRF endpoints.
+
+They also work under WSGI, where Django runs each one in its own event
+loop, but only an ASGI server (e.g. uvicorn) gets the concurrency benefit.
+"""
+
+import functools
+from django.db.models import Avg, Count, Max
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions
+from .authentication import aauthenticate_request
+from .models import Dataset, Equipment
+from .serializers import DatasetSummarySerializer
+
+
+def _unauthorized(detail):
+    response = JsonResponse({'detail': str(detail)}, status=401)
+    response['WWW-Authenticate'] = 'Token'
+    return response
+
+
+def async_read_view(view):
+    """Restrict an async view to GET and require token authentication"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return HttpResponseNotAllowed(['GET'])
+        try:
+            credentials = await aauthenticate_request(request)
+        except exceptions.AuthenticationFailed as e:
+            return _unauthorized(e.detail)
+        if credentials is None:
+            return _unauthorized('Authentication credentials were not provided.')
+        request.user, request.auth = credentials
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _user_datasets(request):
+    return Dataset.objects.filter(uploaded_by=request.user).select_related('uploaded_by')
+
+
+async def _get_dataset(request, pk):
+    try:
+        return await _user_datasets(request).aget(pk=pk)
+    except Dataset.DoesNotExist:
+        return None
+
+
+@async_read_view
+async def dataset_list(request):
+    """Return last 5 datasets for the current user"""
+    datasets = [d async for d in _user_datasets(request).order_by('-uploaded_at')[:5]]
+    return JsonResponse(DatasetSummarySerializer(datasets, many=True).data, safe=False)
+
+
+@async_read_view
+async def dataset_summary(request, pk):
+    """Get summary statistics for a dataset"""
+    dataset = await _get_dataset(request, pk)
+    if dataset is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    return JsonResponse(DatasetSummarySerializer(dataset).data)
+
+
+@async_read_view
+async def dataset_stats(request, pk):
+    """Per-type equipment count and average parameters, aggregated in the database"""
+    dataset = await _get_dataset(request, pk)
+    if dataset is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    types = Equipment.objects.filter(dataset=dataset).values('equipment_type').annotate(
+        count=Count('id'), avg_flowrate=Avg('flowrate'),
+        avg_pressure=Avg('pressure'), avg_temperature=Avg('temperature'),
+    ).order_by('-count', 'equipment_type')
+    return JsonResponse({
+        'id': dataset.id,
+        'total_count': dataset.total_count,
+        'types': [row async for row in types],
+    })
+
+
+@async_read_view
+async def dataset_changes(request):
+    """
+    Change feed for polling clients: ?since=<ISO timestamp>
+
+    Returns the user's datasets uploaded after `since`, the ids of all
+    datasets still present (so clients can drop deleted ones) and `latest`,
+    the value to pass as `since` on the next poll.
+    """
+    datasets = _user_datasets(request)
+    since = request.GET.get('since')
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return JsonResponse({'error': 'since must be an ISO 8601 timestamp'}, status=400)
+
+    # Full precision: a millisecond-truncated `since` would repeat the newest dataset
+    latest = (await datasets.aaggregate(latest=Max('uploaded_at')))['latest'] or since
+    new = datasets.filter(uploaded_at__gt=since) if since else datasets
+    new = [d async for d in new.order_by('-uploaded_at')[:5]]
+    return JsonResponse({
+        'datasets': DatasetSummarySerializer(new, many=True).data,
+        'ids': [pk async for pk in datasets.order_by('-uploaded_at').values_list('id', flat=True)],
+        'latest': latest.isoformat() if latest else None,
+    })
@@ -0,0 +1,197 @@
+"""
+Token authentication with a cache in front of the token/user lookup
+
+Polling clients authenticate every few seconds, and the stock
+TokenAuthentication joins authtoken_token and auth_user on each request.
+CachedTokenAuthentication keeps recently seen tokens in an in-process LRU
+with a TTL and, when TOKEN_AUTH_SHARED_CACHE names a Django cache alias,
+in that shared cache too. Tokens also expire after TOKEN_EXPIRY_HOURS.
+
+Invalidation (logout, token deletion, user deactivation) is immediate in
+the current process. With a shared cache it is immediate everywhere: a
+generation counter in the shared cache is bumped, and every process drops
+its local entries when it sees the new generation. Without one, other
+processes may keep serving a revoked token for up to TOKEN_AUTH_CACHE_TTL
+seconds.
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+
+_GENERATION_KEY = 'token-auth:generation'
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries expire after `ttl` seconds"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_local_cache = LRUCache(settings.TOKEN_AUTH_CACHE_SIZE, settings.TOKEN_AUTH_CACHE_TTL)
+
+
+def _shared_cache():
+    alias = settings.TOKEN_AUTH_SHARED_CACHE
+    return caches[alias] if alias else None
+
+
+def _shared_key(key):
+    # Never store raw token keys in an external cache
+    return 'token-auth:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def token_expired(token):
+    """Return True if a token is older than TOKEN_EXPIRY_HOURS (0 disables expiry)"""
+    if not settings.TOKEN_EXPIRY_HOURS:
+        return False
+    return token.created < timezone.now() - timedelta(hours=settings.TOKEN_EXPIRY_HOURS)
+
+
+def invalidate_token(key):
+    """Drop a token from every cache tier so the next request hits the database"""
+    _local_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(_shared_key(key))
+        # Tell other processes to discard their local entries
+        try:
+            shared.incr(_GENERATION_KEY)
+        except ValueError:
+            shared.add(_GENERATION_KEY, 1, timeout=None)
+
+
+def _local_entry(key, generation):
+    """Return the locally cached (user, token, generation) if still current"""
+    entry = _local_cache.get(key)
+    if entry is not None and entry[2] != generation:
+        return None
+    return entry
+
+
+def _checked_copies(entry):
+    """Reject expired tokens; hand out copies so cached instances are never mutated"""
+    user, token = entry[0], entry[1]
+    if token_expired(token):
+        raise exceptions.AuthenticationFailed('Token has expired. Please log in again.')
+    return copy.copy(user), copy.copy(token)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication backed by an LRU/TTL cache, with token expiry"""
+
+    def authenticate_credentials(self, key):
+        shared = _shared_cache()
+        generation = shared.get(_GENERATION_KEY, 0) if shared is not None else 0
+
+        entry = _local_entry(key, generation)
+        if entry is None and shared is not None:
+            cached = shared.get(_shared_key(key))
+            if cached is not None:
+                entry = (cached[0], cached[1], generation)
+                _local_cache.set(key, entry)
+
+        if entry is None:
+            user, token = super().authenticate_credentials(key)
+            entry = (user, token, generation)
+            _local_cache.set(key, entry)
+            if shared is not None:
+                shared.set(_shared_key(key), (user, token), timeout=settings.TOKEN_AUTH_CACHE_TTL)
+
+        try:
+            return _checked_copies(entry)
+        except exceptions.AuthenticationFailed:
+            invalidate_token(key)
+            raise
+
+
+async def aauthenticate_request(request):
+    """
+    Async counterpart of CachedTokenAuthentication.authenticate for plain
+    Django async views
+
+    Returns (user, token) or None when the request carries no token header;
+    raises AuthenticationFailed for a bad, inactive or expired token.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return None
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+
+    shared = _shared_cache()
+    generation = await shared.aget(_GENERATION_KEY, 0) if shared is not None else 0
+
+    entry = _local_entry(key, generation)
+    if entry is None and shared is not None:
+        cached = await shared.aget(_shared_key(key))
+        if cached is not None:
+            entry = (cached[0], cached[1], generation)
+            _local_cache.set(key, entry)
+
+    if entry is None:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        entry = (token.user, token, generation)
+        _local_cache.set(key, entry)
+        if shared is not None:
+            await shared.aset(_shared_key(key), (token.user, token), timeout=settings.TOKEN_AUTH_CACHE_TTL)
+
+    try:
+        return _checked_copies(entry)
+    except exceptions.AuthenticationFailed:
+        await sync_to_async(invalidate_token)(key)
+        raise
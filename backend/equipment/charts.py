@@ -0,0 +1,148 @@
+"""
+Server-side chart rendering with matplotlib's headless Agg canvas
+
+Charts mirror the desktop ChartWidget styling but are drawn from aggregates
+computed in the database, so they cost the same for 15 rows or 1M rows.
+"""
+
+from django.db.models import Avg, Count
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .file_cache import cache_path, get_or_render
+from .models import Equipment
+
+
+# Bump whenever chart styling changes so cached images are regenerated
+CHART_VERSION = 1
+
+CHART_COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b', '#fa709a']
+CHART_CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+CHART_DPI = 100
+CHART_MIN_SIZE = 200
+CHART_MAX_SIZE = 2000
+
+# Types beyond the most common ones are grouped into a single "Other" entry
+CHART_MAX_TYPES = 8
+
+
+def _type_stats(dataset):
+    """
+    Return per-type (name, count, avg flowrate, avg pressure, avg temperature)
+
+    Types are ordered by count; everything after CHART_MAX_TYPES is merged
+    into a count-weighted "Other" entry.
+    """
+    rows = list(
+        Equipment.objects.filter(dataset=dataset)
+        .values('equipment_type')
+        .annotate(count=Count('id'), flowrate=Avg('flowrate'),
+                  pressure=Avg('pressure'), temperature=Avg('temperature'))
+        .order_by('-count', 'equipment_type')
+    )
+    stats = [(r['equipment_type'], r['count'], r['flowrate'], r['pressure'], r['temperature'])
+             for r in rows[:CHART_MAX_TYPES]]
+
+    rest = rows[CHART_MAX_TYPES:]
+    if rest:
+        count = sum(r['count'] for r in rest)
+        stats.append((
+            f'Other ({len(rest)} types)',
+            count,
+            sum(r['flowrate'] * r['count'] for r in rest) / count,
+            sum(r['pressure'] * r['count'] for r in rest) / count,
+            sum(r['temperature'] * r['count'] for r in rest) / count,
+        ))
+    return stats
+
+
+def _plot_types(figure, stats):
+    ax = figure.add_subplot(111)
+    labels = [s[0] for s in stats]
+    sizes = [s[1] for s in stats]
+    colors = [CHART_COLORS[i % len(CHART_COLORS)] for i in range(len(labels))]
+
+    wedges, texts, autotexts = ax.pie(
+        sizes,
+        labels=labels,
+        autopct='%1.1f%%',
+        colors=colors,
+        startangle=90,
+        textprops={'fontsize': 11, 'weight': 'bold'},
+        explode=[0.05] * len(labels)
+    )
+
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(10)
+        autotext.set_weight('bold')
+
+    ax.set_title('Equipment Type Distribution', fontsize=16, fontweight='bold', pad=20)
+
+
+def _plot_parameters(figure, stats):
+    ax = figure.add_subplot(111)
+    names = [s[0] for s in stats]
+    y = range(len(names))
+    height = 0.25
+
+    ax.barh([i - height for i in y], [s[2] for s in stats], height, label='Flowrate', color='#667eea', alpha=0.8)
+    ax.barh(y, [s[3] for s in stats], height, label='Pressure', color='#764ba2', alpha=0.8)
+    ax.barh([i + height for i in y], [s[4] for s in stats], height, label='Temperature', color='#f093fb', alpha=0.8)
+
+    ax.set_ylabel('Equipment Type', fontweight='bold', fontsize=12)
+    ax.set_xlabel('Average Value', fontweight='bold', fontsize=12)
+    ax.set_title('Average Parameters by Type', fontsize=16, fontweight='bold', pad=20)
+    ax.set_yticks(list(y))
+    ax.set_yticklabels(names, fontsize=10)
+    ax.invert_yaxis()  # Most common type on top
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=3, fontsize=10)
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+
+
+CHART_PLOTTERS = {
+    'types': _plot_types,
+    'parameters': _plot_parameters,
+}
+
+
+def render_chart(dataset, chart, output, image_format='png', width=800, height=600, dpi=CHART_DPI):
+    """
+    Render one of the CHART_PLOTTERS charts for a dataset
+
+    Args:
+        dataset: Dataset object
+        chart: 'types' or 'parameters'
+        output: binary file object to write the image to
+        image_format: 'png' or 'svg'
+        width, height: image size in pixels at `dpi`
+        dpi: resolution used to convert pixels to figure inches
+    """
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+
+    stats = _type_stats(dataset)
+    if stats:
+        CHART_PLOTTERS[chart](figure, stats)
+    else:
+        figure.text(0.5, 0.5, 'No equipment data', ha='center', va='center', fontsize=14)
+
+    figure.tight_layout()
+    figure.savefig(output, format=image_format, dpi=dpi)
+
+
+def chart_cache_path(dataset_id, chart, image_format, width, height, dpi=CHART_DPI):
+    """Return the cache file path of a rendered chart"""
+    return cache_path(
+        f'dataset-{dataset_id}-chart-{chart}-{width}x{height}-{dpi}dpi-v{CHART_VERSION}.{image_format}'
+    )
+
+
+def get_cached_chart(dataset, chart, image_format='png', width=800, height=600, dpi=CHART_DPI):
+    """Return the path of a rendered chart, rendering it on a cache miss"""
+    return get_or_render(
+        chart_cache_path(dataset.id, chart, image_format, width, height, dpi),
+        lambda f: render_chart(dataset, chart, f, image_format, width, height, dpi),
+    )
@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+from django.conf import settings
+from .models import Equipment
+
+
+# Column headers match the upload format so an exported CSV can be re-uploaded
+EXPORT_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+EXPORT_FIELDS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def iter_equipment_rows(dataset, chunk_size=None):
+    """
+    Iterate over the equipment rows of a dataset without loading them all
+
+    Rows are fetched in upload order as plain tuples through a chunked
+    iterator, which uses a server-side cursor on backends that support one.
+
+    Args:
+        dataset: Dataset object
+        chunk_size: number of rows fetched from the database per round-trip
+
+    Returns:
+        iterator: tuples in EXPORT_FIELDS order
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    return (
+        Equipment.objects.filter(dataset=dataset)
+        .order_by('id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _batched(rows, size):
+    """Group an iterator of rows into lists of at most `size` rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(dataset, chunk_size=None):
+    """Yield a dataset as CSV, one encoded chunk per batch of rows"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for batch in _batched(iter_equipment_rows(dataset, chunk_size), chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only when the dataset is empty
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(dataset, chunk_size=None):
+    """Yield a dataset as newline-delimited JSON objects"""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    for batch in _batched(iter_equipment_rows(dataset, chunk_size), chunk_size):
+        lines = [json.dumps(dict(zip(EXPORT_FIELDS, row))) for row in batch]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def parquet_available():
+    """Return True when the optional pyarrow dependency is installed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(dataset, chunk_size=None):
+    """
+    Yield a dataset as a Parquet file, one row group per batch of rows
+
+    Requires pyarrow; raises ImportError when it is not installed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    schema = pa.schema([
+        (EXPORT_COLUMNS[0], pa.string()),
+        (EXPORT_COLUMNS[1], pa.string()),
+        (EXPORT_COLUMNS[2], pa.float64()),
+        (EXPORT_COLUMNS[3], pa.float64()),
+        (EXPORT_COLUMNS[4], pa.float64()),
+    ])
+
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batched(iter_equipment_rows(dataset, chunk_size), chunk_size):
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORT_STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
@@ -0,0 +1,203 @@
+"""
+On-disk cache of rendered dataset artifacts (PDF reports and chart images)
+
+Datasets never change after upload, so anything rendered from one can be
+kept in REPORT_CACHE_DIR until the dataset is deleted. File names start with
+`dataset-<id>-` so all artifacts of a dataset can be evicted together.
+"""
+
+import os
+import re
+import tempfile
+import time
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def cache_path(name):
+    """Return the absolute path of a cache entry"""
+    return os.path.join(settings.REPORT_CACHE_DIR, name)
+
+
+def get_or_render(path, render):
+    """
+    Return `path`, calling render(file) to create it on a cache miss
+
+    The artifact is rendered to a temporary file and renamed into place so
+    concurrent readers never see a partially written file.
+
+    Args:
+        path: cache entry path from cache_path()
+        render: callable writing the artifact to a binary file object
+
+    Returns:
+        str: path to the cached file
+    """
+    try:
+        # Record the access for LRU eviction without changing the mtime-based ETag
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+        return path
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(settings.REPORT_CACHE_DIR, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=settings.REPORT_CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            render(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # The new entry is about to be served, so it is never the one evicted
+    enforce_cache_size(keep=[path])
+    return path
+
+
+def evict_dataset_artifacts(dataset_id):
+    """Delete every cached report and chart (any version or size) for a dataset"""
+    prefix = f'dataset-{dataset_id}-'
+    try:
+        names = os.listdir(settings.REPORT_CACHE_DIR)
+    except FileNotFoundError:
+        return
+
+    for name in names:
+        if name.startswith(prefix) and not name.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(settings.REPORT_CACHE_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+def enforce_cache_size(max_bytes=None, keep=()):
+    """
+    Evict least recently used artifacts until the cache fits within max_bytes
+
+    Args:
+        max_bytes: size limit (defaults to settings.REPORT_CACHE_MAX_BYTES)
+        keep: paths of entries never to evict, even if the cache stays over the limit
+    """
+    max_bytes = settings.REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    keep = {os.path.basename(path) for path in keep}
+
+    entries = []
+    total = 0
+    with os.scandir(settings.REPORT_CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                total += stat.st_size
+                if entry.name not in keep:
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+class _RangeFile:
+    """File wrapper that only exposes `length` bytes starting at `start`"""
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self._file = f
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _parse_range(header, size):
+    """
+    Parse a single-range `Range` header into an inclusive (start, end) pair
+
+    Returns None for headers that should be ignored (malformed or multi-range)
+    and raises ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+
+    if start > end or start >= size:
+        raise ValueError(f'Unsatisfiable range: {header}')
+    return start, end
+
+
+def cached_file_response(request, path, content_type, filename=None):
+    """
+    Serve a cached artifact with ETag, conditional GET and byte-range support
+
+    Files are sent as attachments when a filename is given and inline
+    otherwise. When REPORT_CACHE_ACCEL_REDIRECT is set the file is handed off
+    to the front-end web server (nginx X-Accel-Redirect) instead of being
+    read here.
+    """
+    stat = os.stat(path)
+    etag = f'"{os.path.splitext(os.path.basename(path))[0]}-{int(stat.st_mtime)}-{stat.st_size}"'
+    disposition = f'attachment; filename="{filename}"' if filename else 'inline'
+
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    if settings.REPORT_CACHE_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            settings.REPORT_CACHE_ACCEL_REDIRECT.rstrip('/') + '/' + os.path.basename(path)
+        )
+        response['Content-Disposition'] = disposition
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = _parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(_RangeFile(open(path, 'rb'), start, end - start + 1),
+                                content_type=content_type, status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Content-Disposition'] = disposition
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
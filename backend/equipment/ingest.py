@@ -0,0 +1,84 @@
+"""
+Bulk insertion of Equipment rows from an uploaded DataFrame
+
+On PostgreSQL rows are streamed with COPY FROM STDIN, which skips
+per-statement parsing and planning entirely. Other databases fall back to
+bulk_create in INGEST_BATCH_SIZE batches. Both paths work through the
+DataFrame one batch at a time, so only a single batch is converted to
+Python objects or CSV text at once.
+"""
+
+import io
+from django.conf import settings
+from django.db import connections, router
+from .models import Equipment
+
+
+# DataFrame column -> Equipment field, in COPY column order
+INGEST_COLUMNS = {
+    'Equipment Name': 'equipment_name',
+    'Type': 'equipment_type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+
+def _frames(df, batch_size):
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def _csv_batches(dataset, df, batch_size):
+    """Yield CSV text of (dataset_id, *INGEST_COLUMNS) rows, one batch at a time"""
+    frame = df[list(INGEST_COLUMNS)]
+    for batch in _frames(frame, batch_size):
+        yield batch.assign(_dataset=dataset.pk)[['_dataset', *INGEST_COLUMNS]].to_csv(
+            header=False, index=False
+        )
+
+
+def _copy_equipment(connection, dataset, df, batch_size):
+    """Stream rows into the Equipment table with COPY FROM STDIN"""
+    table = connection.ops.quote_name(Equipment._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(f) for f in ['dataset_id', *INGEST_COLUMNS.values()])
+    sql = f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):
+            # psycopg 3: a single COPY fed batch by batch
+            with raw.copy(sql) as copy:
+                for chunk in _csv_batches(dataset, df, batch_size):
+                    copy.write(chunk)
+        else:
+            # psycopg2: one COPY per batch
+            for chunk in _csv_batches(dataset, df, batch_size):
+                raw.copy_expert(sql, io.StringIO(chunk))
+
+
+def _bulk_create_equipment(dataset, df, batch_size):
+    for batch in _frames(df[list(INGEST_COLUMNS)], batch_size):
+        Equipment.objects.bulk_create(
+            Equipment(dataset=dataset, equipment_name=name, equipment_type=eq_type,
+                      flowrate=flowrate, pressure=pressure, temperature=temperature)
+            for name, eq_type, flowrate, pressure, temperature
+            in batch.itertuples(index=False, name=None)
+        )
+
+
+def insert_equipment(dataset, df, batch_size=None):
+    """
+    Insert one Equipment row per DataFrame row for a dataset
+
+    Args:
+        dataset: Dataset the rows belong to
+        df: pandas DataFrame with the upload CSV columns
+        batch_size: rows per batch (defaults to settings.INGEST_BATCH_SIZE)
+    """
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    connection = connections[router.db_for_write(Equipment)]
+    if connection.vendor == 'postgresql':
+        _copy_equipment(connection, dataset, df, batch_size)
+    else:
+        _bulk_create_equipment(dataset, df, batch_size)
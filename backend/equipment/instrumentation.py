@@ -0,0 +1,244 @@
+"""
+Per-request timing and query instrumentation, with Prometheus metrics
+
+RequestTimingMiddleware tracks each request in a context variable. Code
+marks interesting phases with `timed_phase('name')`, and every database
+query is counted by an execute wrapper installed on each new connection.
+Context variables follow requests into sync_to_async threads, so this
+works for sync and async views alike.
+
+Each response gets a Server-Timing header (total, db and every phase)
+that browser dev tools display directly. The same numbers are aggregated
+into in-process metrics, which the /metrics view exposes in the
+Prometheus text format. Metrics are per process: with several server
+workers, each scrape sees only the worker that answered it.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+
+# Metrics
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+
+
+def _label_text(names, values):
+    if not names:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for v in values)
+    return '{' + ','.join(f'{n}="{v}"' for n, v in zip(names, escaped)) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels[name] for name in self.labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(_label_text(self.labels, key), key, value))
+        return lines
+
+    def _samples(self, label_text, key, value):
+        return [f'{self.name}{label_text} {value}']
+
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self, label_text, key, value):
+        counts, total = value
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            samples.append(f'{self.name}_bucket{_label_text(self.labels + ("le",), key + (le,))} '
+                           f'{cumulative}')
+        samples.append(f'{self.name}_sum{label_text} {total}')
+        samples.append(f'{self.name}_count{label_text} {cumulative}')
+        return samples
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request processing time by view',
+                            ['view', 'method', 'status'])
+REQUEST_QUERIES = Counter('http_request_db_queries_total', 'Database queries run by requests',
+                          ['view'])
+REQUEST_DB_SECONDS = Counter('http_request_db_seconds_total', 'Time requests spent in database queries',
+                             ['view'])
+PHASE_SECONDS = Histogram('http_request_phase_duration_seconds', 'Time spent in instrumented phases',
+                          ['view', 'phase'], buckets=SLOW_BUCKETS)
+INGEST_ROWS = Counter('equipment_ingest_rows_total', 'Equipment rows ingested from uploads')
+INGEST_SECONDS = Histogram('equipment_ingest_duration_seconds', 'Time to ingest one upload',
+                           buckets=SLOW_BUCKETS)
+INGEST_ROWS_PER_SECOND = Gauge('equipment_ingest_rows_per_second', 'Throughput of the latest ingest')
+REPORT_RENDER_SECONDS = Histogram('report_render_duration_seconds', 'PDF report render time',
+                                  ['variant'], buckets=SLOW_BUCKETS)
+
+
+def render_metrics():
+    """Return every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires `Bearer METRICS_TOKEN` when that is set"""
+    if settings.METRICS_TOKEN and (request.headers.get('Authorization')
+                                   != f'Bearer {settings.METRICS_TOKEN}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Request timings
+
+class RequestTimings:
+    """Phases, query count and database time of the request being served"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []  # (name, seconds, queries)
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def timed_phase(name):
+    """
+    Time a block of code as a named phase of the current request
+
+    Outside a request (management commands, report workers) the block runs
+    untimed.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    queries = timings.queries
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases.append((name, time.perf_counter() - start, timings.queries - queries))
+
+
+def count_query(execute, sql, params, many, context):
+    """Database execute wrapper attributing each query to the current request"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_seconds += time.perf_counter() - start
+
+
+class RequestTimingMiddleware:
+    """Record request timings into metrics and the Server-Timing header"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current.set(RequestTimings())
+        try:
+            response = self.get_response(request)
+            return self._finish(request, response)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        token = _current.set(RequestTimings())
+        try:
+            response = await self.get_response(request)
+            return self._finish(request, response)
+        finally:
+            _current.reset(token)
+
+    def _finish(self, request, response):
+        timings = _current.get()
+        total = time.perf_counter() - timings.start
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unmatched'
+
+        REQUEST_SECONDS.observe(total, view=view, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.inc(timings.queries, view=view)
+        REQUEST_DB_SECONDS.inc(timings.db_seconds, view=view)
+        for name, seconds, _ in timings.phases:
+            PHASE_SECONDS.observe(seconds, view=view, phase=name)
+
+        if settings.SERVER_TIMING_HEADER:
+            entries = [f'total;dur={total * 1000:.1f}',
+                       f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries"']
+            for name, seconds, queries in timings.phases:
+                entry = f'{name};dur={seconds * 1000:.1f}'
+                if queries:
+                    entry += f';desc="{queries} queries"'
+                entries.append(entry)
+            response['Server-Timing'] = ', '.join(entries)
+        return response
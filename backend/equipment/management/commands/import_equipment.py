@@ -0,0 +1,155 @@
+import copy
+import glob
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from equipment.models import Dataset
+from equipment.utils import process_csv_file
+from equipment.workers import import_equipment_file, init_django_worker, parse_equipment_file
+
+
+# Plain and compressed CSV files pandas can read directly
+CSV_SUFFIXES = ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.csv.zst', '.csv.zip')
+COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst', '.zip')
+
+
+def find_csv_files(paths):
+    """Expand directories (recursively) and glob patterns into sorted CSV file paths"""
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                found.update(os.path.join(root, name) for name in files
+                             if name.lower().endswith(CSV_SUFFIXES))
+        elif glob.has_magic(path):
+            found.update(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(path):
+            found.add(path)
+        else:
+            raise CommandError(f'No such file or directory: {path}')
+    return sorted(os.path.abspath(p) for p in found)
+
+
+def dataset_name_for(path):
+    """Dataset name as an upload of the file would get it: the basename, minus compression"""
+    name = os.path.basename(path)
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.lower().endswith('.csv' + suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def completed_bounded(executor, fn, arguments, limit):
+    """
+    Run fn(*args) for each args in `arguments` and yield the futures as they complete,
+    with at most `limit` submitted and not yet yielded, so results can't pile up in memory
+    """
+    arguments = iter(arguments)
+    in_flight = set()
+    while True:
+        for args in itertools.islice(arguments, limit - len(in_flight)):
+            in_flight.add(executor.submit(fn, *args))
+        if not in_flight:
+            return
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+class Command(BaseCommand):
+    help = ('Bulk import equipment CSV files (plain or compressed) from directories or globs, '
+            'in parallel. Interrupted imports resume where they stopped: files already '
+            'imported are skipped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV files, directories or glob patterns')
+        parser.add_argument('--user', required=True, help='username the datasets are attributed to')
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help='parallel worker processes')
+        parser.add_argument('--force', action='store_true',
+                            help='import files again even if they were imported before')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        files = find_csv_files(options['paths'])
+        # The source path is stored on each dataset in the same transaction as
+        # its rows, so a file is either fully imported or will be retried
+        done = set() if options['force'] else set(
+            Dataset.objects.filter(uploaded_by=user, file_path__in=files)
+            .values_list('file_path', flat=True)
+        )
+        pending = [f for f in files if f not in done]
+        # SQLite has a single write lock, which parallel write transactions fight
+        # over ("database is locked"): there the workers only parse the files,
+        # and this process writes them one at a time
+        serial_writes = connection.vendor == 'sqlite'
+        self.stdout.write(f'{len(files)} files found, {len(done)} already imported, '
+                          f'{len(pending)} to import with {options["workers"]} workers'
+                          + (' (parsing; SQLite writes run one at a time)' if serial_writes else ''))
+        if not pending:
+            return
+
+        totals = {'imported': 0, 'failed': 0, 'rows': 0}
+        start = time.perf_counter()
+        workers = max(1, min(options["workers"], len(pending)))
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_django_worker,
+            initargs=(copy.deepcopy(settings.DATABASES),),
+        )
+        try:
+            if serial_writes:
+                # Parsed DataFrames wait here for the writer; keep only a few in memory
+                parsed = completed_bounded(executor, parse_equipment_file,
+                                           ((path,) for path in pending), 2 * workers)
+                results = (self.write_parsed(future.result(), user) for future in parsed)
+            else:
+                futures = [executor.submit(import_equipment_file, path, user.pk, dataset_name_for(path))
+                           for path in pending]
+                results = (future.result() for future in as_completed(futures))
+            for i, result in enumerate(results, 1):
+                totals[result['status']] += 1
+                totals['rows'] += result['rows']
+                prefix = f'[{i}/{len(pending)}] {result["path"]}: '
+                if result['status'] == 'imported':
+                    rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+                    self.stdout.write(f'{prefix}{result["rows"]} rows in {result["seconds"]:.2f}s '
+                                      f'({rate:,.0f} rows/s)')
+                else:
+                    self.stderr.write(f'{prefix}failed: {result["error"]}')
+        except KeyboardInterrupt:
+            self.stderr.write('Interrupted; run the same command again to resume')
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {totals["imported"]} files ({totals["rows"]:,} rows) in {elapsed:.1f}s '
+            f'({totals["rows"] / elapsed:,.0f} rows/s), {totals["failed"]} failed'
+        ))
+
+    def write_parsed(self, result, user):
+        """Write a file parsed by a worker; returns its outcome like import_equipment_file"""
+        if result['status'] != 'parsed':
+            return result
+        df = result.pop('df')
+        start = time.perf_counter()
+        try:
+            dataset, _ = process_csv_file(df, dataset_name_for(result['path']), user,
+                                          file_path=result['path'])
+        except Exception as e:
+            return {**result, 'status': 'failed', 'rows': 0, 'error': str(e),
+                    'seconds': result['seconds'] + time.perf_counter() - start}
+        return {**result, 'status': 'imported', 'dataset_id': dataset.pk,
+                'seconds': result['seconds'] + time.perf_counter() - start}
@@ -0,0 +1,57 @@
+import io
+import pstats
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from equipment.profiling import delete_profile, list_profiles, profile_path
+
+
+class Command(BaseCommand):
+    help = 'List captured request profiles, or summarize one by id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_id', nargs='?',
+                            help='profile to summarize (a unique prefix is enough)')
+        parser.add_argument('--sort', default='cumulative',
+                            choices=['cumulative', 'tottime', 'ncalls', 'name'],
+                            help='pstats sort order for the summary')
+        parser.add_argument('--limit', type=int, default=30, help='functions shown in the summary')
+        parser.add_argument('--view', help='only list profiles of this view name')
+        parser.add_argument('--clear', action='store_true', help='delete all captured profiles')
+
+    def handle(self, *args, **options):
+        profiles = list_profiles()
+
+        if options['clear']:
+            for meta in profiles:
+                delete_profile(meta['id'])
+            self.stdout.write(f'Deleted {len(profiles)} profiles from {settings.PROFILE_DIR}')
+            return
+
+        if options['profile_id']:
+            self.summarize(profiles, options)
+            return
+
+        if options['view']:
+            profiles = [p for p in profiles if p['view'] == options['view']]
+        if not profiles:
+            self.stdout.write(f'No profiles in {settings.PROFILE_DIR}')
+            return
+        self.stdout.write(f"{'id':<52} {'method':<6} {'status':>6} {'ms':>9}  user")
+        for p in profiles:
+            self.stdout.write(f"{p['id']:<52} {p['method']:<6} {p['status']:>6} "
+                              f"{p['duration_ms']:>9.1f}  {p['user']}")
+
+    def summarize(self, profiles, options):
+        matches = [p for p in profiles if p['id'].startswith(options['profile_id'])]
+        if not matches:
+            raise CommandError(f"No profile matches '{options['profile_id']}'")
+        if len(matches) > 1:
+            raise CommandError(f"'{options['profile_id']}' matches {len(matches)} profiles")
+        meta = matches[0]
+
+        self.stdout.write(f"{meta['method']} {meta['path']} -> {meta['status']} "
+                          f"in {meta['duration_ms']} ms ({meta['user']}, {meta['captured_at']})\n")
+        out = io.StringIO()
+        stats = pstats.Stats(profile_path(meta['id']), stream=out)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(out.getvalue())
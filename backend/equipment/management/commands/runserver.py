@@ -0,0 +1,23 @@
+import socket
+from django.contrib.staticfiles.management.commands.runserver import Command as StaticRunserverCommand
+from django.core.servers.basehttp import WSGIServer
+
+
+class NoDelayWSGIServer(WSGIServer):
+    """
+    Development server that disables Nagle's algorithm on client sockets
+
+    The server writes a response's status line, headers and body as
+    separate small sends. On a kept-alive connection Nagle's algorithm
+    holds the later sends until the client's delayed ACK (~40 ms), so every
+    request from a pooling client (the desktop ApiClient) would stall.
+    """
+
+    def get_request(self):
+        sock, address = super().get_request()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, address
+
+
+class Command(StaticRunserverCommand):
+    server_cls = NoDelayWSGIServer
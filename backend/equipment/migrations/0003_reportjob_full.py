@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='full',
+            field=models.BooleanField(default=False),
+        ),
+    ]
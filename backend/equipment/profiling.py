@@ -0,0 +1,138 @@
+"""
+On-demand profiling of individual API requests
+
+A staff user adds `X-Profile: 1` (or `?profile=1`) to a request, and the
+view handler runs under cProfile. The profile is written to PROFILE_DIR
+together with a JSON sidecar describing the request, and its id comes back
+in the `X-Profile-Id` response header. `manage.py profiles` lists and
+summarizes the captured profiles.
+
+Profiling starts after DRF has authenticated the request and checked
+permissions, so only the handler (ingest, report rendering, serialization)
+is measured. Work the handler hands to the SQLite writer thread (see
+write_queue) is profiled there and merged into the request's profile; the
+handler's wait for it still shows up as lock acquisition. Streamed response
+bodies are produced after the handler returns, so they are not included.
+"""
+
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import time
+from datetime import datetime
+from django.conf import settings
+
+
+# Profilers of work the profiled request ran on other threads, None when not profiling
+_thread_profilers = contextvars.ContextVar('thread_profilers', default=None)
+
+
+def run_profiled(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) on another thread on behalf of a request
+
+    Must run in a copy of the request's context (contextvars.copy_context);
+    if the request is being profiled, func is profiled too and its stats are
+    merged into the request's profile.
+    """
+    profilers = _thread_profilers.get()
+    if profilers is None:
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    profilers.append(profiler)
+    return profiler.runcall(func, *args, **kwargs)
+
+
+def profile_requested(request):
+    """True if a (DRF) request asks to be profiled"""
+    flag = request.headers.get('X-Profile') or request.query_params.get('profile')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+def list_profiles():
+    """Return the metadata of captured profiles, newest first"""
+    profiles = []
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return profiles
+    for name in os.listdir(settings.PROFILE_DIR):
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda p: p['id'], reverse=True)
+
+
+def profile_path(profile_id):
+    """Path of a captured cProfile stats file"""
+    return os.path.join(settings.PROFILE_DIR, f'{profile_id}.prof')
+
+
+def _meta_path(profile_id):
+    return os.path.join(settings.PROFILE_DIR, f'{profile_id}.json')
+
+
+def delete_profile(profile_id):
+    for path in (profile_path(profile_id), _meta_path(profile_id)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _prune_profiles():
+    """Keep at most PROFILE_MAX_FILES profiles, dropping the oldest"""
+    for meta in list_profiles()[settings.PROFILE_MAX_FILES:]:
+        delete_profile(meta['id'])
+
+
+class ProfilingMixin:
+    """APIView mixin running staff-requested handlers under cProfile"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._profiler = None
+        if (settings.PROFILING_ENABLED and profile_requested(request)
+                and request.user and request.user.is_staff):
+            self._profile_started = time.perf_counter()
+            self._thread_profilers = []
+            self._thread_profilers_token = _thread_profilers.set(self._thread_profilers)
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        profiler = getattr(self, '_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            self._profiler = None
+            _thread_profilers.reset(self._thread_profilers_token)
+            response['X-Profile-Id'] = self._save_profile(profiler, request, response)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def _save_profile(self, profiler, request, response):
+        duration = time.perf_counter() - self._profile_started
+        match = request.resolver_match
+        view = match.view_name if match else type(self).__name__
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{view}"
+
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        stats = pstats.Stats(profiler)
+        for thread_profiler in self._thread_profilers:
+            stats.add(thread_profiler)
+        stats.dump_stats(profile_path(profile_id))
+        with open(_meta_path(profile_id), 'w') as f:
+            json.dump({
+                'id': profile_id,
+                'view': view,
+                'method': request.method,
+                'path': request.get_full_path(),
+                'user': request.user.username,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 1),
+                'captured_at': datetime.now().isoformat(timespec='seconds'),
+            }, f, indent=2)
+        _prune_profiles()
+        return profile_id
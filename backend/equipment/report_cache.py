@@ -0,0 +1,43 @@
+import re
+
+from .file_cache import cache_path, get_or_render
+from .utils import generate_pdf_report, REPORT_TEMPLATE_VERSION
+
+
+def report_cache_path(dataset_id, full=False):
+    """Return the cache file path for a dataset's report at the current template version"""
+    variant = 'full-' if full else ''
+    return cache_path(f'dataset-{dataset_id}-{variant}v{REPORT_TEMPLATE_VERSION}.pdf')
+
+
+def get_cached_report(dataset, progress=None, full=False):
+    """
+    Return the path of a dataset's PDF report, rendering it on a cache miss
+
+    Datasets never change after upload, so a report rendered once for a given
+    template version can be served from disk for as long as the dataset lives.
+
+    Args:
+        dataset: Dataset object
+        progress: optional progress callable passed through to generate_pdf_report
+        full: cache the full report listing every equipment row
+
+    Returns:
+        str: path to the cached PDF
+    """
+    return get_or_render(
+        report_cache_path(dataset.id, full),
+        lambda f: generate_pdf_report(dataset, f, progress=progress, full=full),
+    )
+
+
+def pdf_page_count(path):
+    """
+    Return the number of pages of a PDF written by ReportLab
+
+    ReportLab writes the page tree uncompressed, and the root /Pages
+    object's /Count is the largest one in the file.
+    """
+    with open(path, 'rb') as f:
+        counts = [int(n) for n in re.findall(rb'/Count\s+(\d+)', f.read())]
+    return max(counts, default=0)
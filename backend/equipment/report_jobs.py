@@ -0,0 +1,163 @@
+import copy
+import multiprocessing
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .models import ReportJob
+from .utils import REPORT_PREVIEW_ROWS
+from .workers import init_django_worker, run_report_job, render_report
+from .exports import ChunkSink
+from .report_cache import report_cache_path
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Futures of the report jobs queued by this process, by job id
+_job_futures = {}
+_job_futures_lock = threading.Lock()
+
+
+def get_executor(broken=None):
+    """
+    Return the shared, bounded process pool used for report rendering
+
+    Args:
+        broken: a pool found broken by the caller; if it is still the shared
+            one it is shut down and replaced
+    """
+    global _executor
+    with _executor_lock:
+        if broken is not None and _executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            # Spawn rather than fork: forking a threaded server process is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.REPORT_JOB_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_django_worker,
+                initargs=(copy.deepcopy(settings.DATABASES),),
+            )
+        return _executor
+
+
+def submit(fn, *args):
+    """
+    Submit a call to the report pool and return its Future
+
+    A worker that dies (killed, out of memory) leaves the pool broken, and
+    it refuses all later work; the pool is then replaced and the call
+    submitted once more.
+    """
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        return get_executor(broken=executor).submit(fn, *args)
+
+
+def submit_report_job(dataset, user, full=False):
+    """
+    Queue report generation for a dataset and return the ReportJob
+
+    An unfinished job for the same dataset and report variant is reused
+    instead of queueing a duplicate render, as long as it is still queued
+    in this process. Unfinished jobs that aren't, left behind by a restart
+    or a crashed pool, are marked failed.
+    """
+    with _job_futures_lock:
+        unfinished = ReportJob.objects.filter(
+            dataset=dataset,
+            full=full,
+            status__in=[ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING],
+        )
+        for job in unfinished:
+            future = _job_futures.get(job.pk)
+            if future is not None and not future.done():
+                return job
+        unfinished.exclude(pk__in=list(_job_futures)).update(
+            status=ReportJob.STATUS_FAILED, error='Interrupted before it finished',
+            finished_at=timezone.now())
+
+        rows_total = dataset.total_count if full else min(dataset.total_count, REPORT_PREVIEW_ROWS)
+        job = ReportJob.objects.create(dataset=dataset, requested_by=user, full=full,
+                                       rows_total=rows_total)
+        future = submit(run_report_job, job.pk)
+        _job_futures[job.pk] = future
+    future.add_done_callback(lambda f: _record_crash(job.pk, f))
+    return job
+
+
+def _record_crash(job_id, future):
+    """Mark a job failed if its worker died, or it was cancelled, before it could record an outcome"""
+    with _job_futures_lock:
+        _job_futures.pop(job_id, None)
+    error = 'Cancelled before it started' if future.cancelled() else future.exception()
+    if error is None:
+        return
+    try:
+        ReportJob.objects.filter(pk=job_id).exclude(
+            status=ReportJob.STATUS_COMPLETED
+        ).update(status=ReportJob.STATUS_FAILED, error=str(error), finished_at=timezone.now())
+    finally:
+        # Runs on the executor's callback thread, whose connection Django never closes
+        connection.close()
+
+
+def _zip_entry_name(dataset, full):
+    stem = os.path.splitext(dataset.name)[0]
+    return f"report_{'full_' if full else ''}{dataset.id}_{stem}.pdf"
+
+
+def _write_zip_entry(zf, arcname, path):
+    """Copy a file into the archive in chunks; raises FileNotFoundError if it vanished"""
+    with open(path, 'rb') as src, zf.open(arcname, 'w') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def stream_report_zip(datasets, full=False):
+    """
+    Yield a zip archive of PDF reports for several datasets
+
+    Reports already in the cache are written first; the rest are rendered in
+    parallel on the report process pool and added in completion order, so
+    the client starts receiving data as soon as any entry is ready. Entries
+    are stored uncompressed since PDF content is already compressed.
+
+    Args:
+        datasets: iterable of Dataset objects
+        full: include every equipment row in each report
+    """
+    sink = ChunkSink()
+    futures = {}
+    try:
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zf:
+            for dataset in datasets:
+                try:
+                    _write_zip_entry(zf, _zip_entry_name(dataset, full),
+                                     report_cache_path(dataset.id, full))
+                except FileNotFoundError:
+                    futures[submit(render_report, dataset.id, full)] = dataset
+                    continue
+                yield sink.drain()
+
+            for future in as_completed(futures):
+                dataset = futures[future]
+                name = _zip_entry_name(dataset, full)
+                try:
+                    _write_zip_entry(zf, name, future.result())
+                except Exception as e:
+                    zf.writestr(name[:-4] + '.error.txt', f'Error generating report: {e}\n')
+                yield sink.drain()
+    finally:
+        # Don't render reports nobody will receive if the client went away
+        for future in futures:
+            future.cancel()
+
+    yield sink.drain()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Dataset, Equipment
+from django.urls import reverse
+from .models import Dataset, Equipment, ReportJob
 
 
 class EquipmentSerializer(serializers.ModelSerializer):
@@ -26,3 +27,21 @@ class DatasetSummarySerializer(serializers.ModelSerializer):
         model = Dataset
         fields = ['id', 'name', 'uploaded_at', 'uploaded_by_username', 'total_count', 
                   'avg_flowrate', 'avg_pressure', 'avg_temperature', 'equipment_types']
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    dataset_name = serializers.CharField(source='dataset.name', read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'dataset', 'dataset_name', 'full', 'status', 'pages_done', 'rows_done', 
+                  'rows_total', 'error', 'created_at', 'started_at', 'finished_at', 
+                  'download_url']
+        read_only_fields = ['status', 'pages_done', 'rows_done', 'rows_total', 'error', 
+                            'created_at', 'started_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != ReportJob.STATUS_COMPLETED:
+            return None
+        return reverse('reportjob-download', args=[obj.pk])
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate_token
+from .models import Dataset
+from .file_cache import evict_dataset_artifacts
+from .instrumentation import count_query
+
+
+@receiver(post_delete, sender=Dataset)
+def evict_artifacts_on_delete(sender, instance, **kwargs):
+    """Remove cached reports and charts when their dataset is deleted"""
+    evict_dataset_artifacts(instance.pk)
+
+
+@receiver(post_save, sender=Dataset)
+def evict_artifacts_on_update(sender, instance, created, **kwargs):
+    """Drop stale cached artifacts if a dataset is ever edited after upload"""
+    if not created:
+        evict_dataset_artifacts(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token from the auth cache as soon as it is deleted"""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_deactivated_user_tokens(sender, instance, **kwargs):
+    """Drop cached tokens of a user who has just been deactivated"""
+    if not instance.is_active:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            invalidate_token(key)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Count every query run on the connection towards the current request"""
+    # The wrapper list outlives reconnects of the same (thread's) connection
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS (WAL journal, busy timeout, ...) to new SQLite connections"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for pragma, value in settings.SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {pragma} = {value}')
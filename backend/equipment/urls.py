@@ -1,12 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DatasetViewSet, login_view, register_view
+from . import async_views
+from .views import DatasetViewSet, ReportJobViewSet, login_view, logout_view, register_view
 
 router = DefaultRouter()
 router.register(r'datasets', DatasetViewSet)
+router.register(r'report_jobs', ReportJobViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('live/datasets/', async_views.dataset_list, name='live-dataset-list'),
+    path('live/datasets/changes/', async_views.dataset_changes, name='live-dataset-changes'),
+    path('live/datasets/<int:pk>/summary/', async_views.dataset_summary, name='live-dataset-summary'),
+    path('live/datasets/<int:pk>/stats/', async_views.dataset_stats, name='live-dataset-stats'),
     path('auth/login/', login_view, name='login'),
+    path('auth/logout/', logout_view, name='logout'),
     path('auth/register/', register_view, name='register'),
 ]
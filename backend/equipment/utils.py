@@ -1,73 +1,227 @@
 import pandas as pd
+from django.db import transaction
 from .models import Dataset, Equipment
 from io import BytesIO
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image, KeepTogether
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+import time
 from datetime import datetime
+from itertools import chain, islice
+from .exports import iter_equipment_rows
+from .charts import get_cached_chart
+from .ingest import insert_equipment
+from .instrumentation import (
+    INGEST_ROWS, INGEST_ROWS_PER_SECOND, INGEST_SECONDS, REPORT_RENDER_SECONDS, timed_phase,
+)
 
 
-def process_csv_file(df, dataset_name, user):
+# Columns every uploaded or imported CSV must have
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+# Bump whenever the report layout changes so cached PDFs are regenerated
+REPORT_TEMPLATE_VERSION = 2
+
+# Number of equipment rows listed in the details table of a report
+REPORT_PREVIEW_ROWS = 25
+
+# Embedded chart images: pixel size at REPORT_CHART_DPI (6.2in x 4.1in on the page)
+REPORT_CHART_SIZE = (930, 615)
+REPORT_CHART_DPI = 150
+
+# Fixed row height (points) of the equipment tables in a full report; a fixed
+# height lets each chunk table be sized to fill exactly one page
+FULL_REPORT_ROW_HEIGHT = 14
+FULL_REPORT_COL_WIDTHS = [1.9*inch, 1.4*inch, 1.1*inch, 1.1*inch, 0.7*inch]
+FULL_REPORT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FFF5F5')]),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CCCCCC')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+
+def missing_columns(df):
+    """Return the REQUIRED_COLUMNS absent from an uploaded DataFrame"""
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+
+def process_csv_file(df, dataset_name, user, file_path=''):
     """
     Process CSV file and create dataset with equipment items
     
+    Equipment rows are inserted in bulk (COPY on PostgreSQL) inside the same
+    transaction as the dataset, so a failed upload leaves nothing behind.
+    
     Args:
         df: pandas DataFrame containing equipment data
         dataset_name: name of the dataset
         user: User who uploaded the file
+        file_path: source file the data was imported from, if any
     
     Returns:
-        tuple: (dataset, equipment_list)
+        tuple: (dataset, equipment queryset)
     """
-    # Calculate summary statistics
-    total_count = len(df)
-    avg_flowrate = df['Flowrate'].mean()
-    avg_pressure = df['Pressure'].mean()
-    avg_temperature = df['Temperature'].mean()
-    
-    # Calculate equipment type distribution
-    equipment_types = df['Type'].value_counts().to_dict()
-    
-    # Create Dataset
-    dataset = Dataset.objects.create(
-        name=dataset_name,
-        uploaded_by=user,
-        total_count=total_count,
-        avg_flowrate=round(avg_flowrate, 2),
-        avg_pressure=round(avg_pressure, 2),
-        avg_temperature=round(avg_temperature, 2),
-        equipment_types=equipment_types
-    )
-    
-    # Create Equipment items
-    equipment_list = []
-    for _, row in df.iterrows():
-        equipment = Equipment.objects.create(
-            dataset=dataset,
-            equipment_name=row['Equipment Name'],
-            equipment_type=row['Type'],
-            flowrate=row['Flowrate'],
-            pressure=row['Pressure'],
-            temperature=row['Temperature']
+    start = time.perf_counter()
+    
+    with timed_phase('stats'):
+        # Calculate summary statistics
+        total_count = len(df)
+        avg_flowrate = df['Flowrate'].mean()
+        avg_pressure = df['Pressure'].mean()
+        avg_temperature = df['Temperature'].mean()
+        
+        # Calculate equipment type distribution
+        equipment_types = df['Type'].value_counts().to_dict()
+    
+    with transaction.atomic():
+        # Create Dataset
+        dataset = Dataset.objects.create(
+            name=dataset_name,
+            uploaded_by=user,
+            total_count=total_count,
+            avg_flowrate=round(avg_flowrate, 2),
+            avg_pressure=round(avg_pressure, 2),
+            avg_temperature=round(avg_temperature, 2),
+            equipment_types=equipment_types,
+            file_path=file_path
         )
-        equipment_list.append(equipment)
+        
+        # Create Equipment items
+        with timed_phase('insert'):
+            insert_equipment(dataset, df)
+    
+    seconds = time.perf_counter() - start
+    INGEST_ROWS.inc(total_count)
+    INGEST_SECONDS.observe(seconds)
+    if seconds:
+        INGEST_ROWS_PER_SECOND.set(total_count / seconds)
+    
+    return dataset, dataset.equipment_items.all()
+
+
+class _ReportProgress:
+    """Collect pages started and equipment rows laid out during a PDF build"""
+    
+    def __init__(self, callback):
+        self.callback = callback
+        self.pages = 0
+        self.rows = 0
+    
+    def on_build(self, kind, value):
+        """ReportLab progress callback; only page starts are of interest"""
+        if kind == 'PAGE':
+            self.pages = value
+            self.callback(pages=self.pages, rows=self.rows)
+    
+    def add_rows(self, rows):
+        self.rows += rows
+        self.callback(pages=self.pages, rows=self.rows)
+
+
+class _ReportFlowables(list):
+    """
+    Flowable list that ReportLab consumes from the front while building
     
-    return dataset, equipment_list
+    Further flowables are pulled from `source` only as the list drains, so a
+    full report keeps just a page or two of tables alive at any time. Tables
+    carrying a `report_rows` attribute are counted as laid out when consumed.
+    """
+    
+    def __init__(self, head, source=(), progress=None, window=2):
+        super().__init__(head)
+        self._source = iter(source)
+        self._progress = progress
+        self._window = window
+        self._refill()
+    
+    def _refill(self):
+        while self._source is not None and len(self) < self._window:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+    
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        if self._progress is not None:
+            rows = sum(getattr(f, 'report_rows', 0) for f in removed)
+            if rows:
+                self._progress.add_rows(rows)
+        self._refill()
+
+
+def _full_detail_tables(dataset, first_page_height, page_height):
+    """
+    Yield the equipment details of a full report as page-sized tables
+    
+    Rows are streamed from the database and turned into one table per page,
+    each starting with the header row, so no more than a page of rows is ever
+    materialized as flowables. Tables still repeat their header if one has to
+    split across pages.
+    
+    Args:
+        dataset: Dataset object
+        first_page_height: frame height left on the page holding the section heading
+        page_height: frame height of a whole page
+    """
+    header = ['Equipment Name', 'Type', 'Flowrate (L/min)', 'Pressure (bar)', 'Temp (°C)']
+    rows = iter_equipment_rows(dataset)
+    available = first_page_height
+    
+    first = True
+    while True:
+        # Leave a row of slack (besides the header) so a chunk never overflows its page
+        chunk = list(islice(rows, max(int(available // FULL_REPORT_ROW_HEIGHT) - 2, 1)))
+        if not chunk:
+            return
+        
+        if not first:
+            yield PageBreak()
+        first = False
+        
+        data = [header]
+        for name, eq_type, flowrate, pressure, temperature in chunk:
+            data.append([name, eq_type, f"{flowrate:.2f}", f"{pressure:.2f}", f"{temperature:.2f}"])
+        
+        table = Table(data, colWidths=FULL_REPORT_COL_WIDTHS,
+                      rowHeights=[FULL_REPORT_ROW_HEIGHT] * len(data), repeatRows=1)
+        table.setStyle(FULL_REPORT_TABLE_STYLE)
+        table.report_rows = len(chunk)
+        yield table
+        
+        available = page_height
 
 
-def generate_pdf_report(dataset):
+def generate_pdf_report(dataset, output=None, progress=None, full=False):
     """
     Generate a PDF report for a dataset
     
     Args:
         dataset: Dataset object
+        output: optional file path or binary file object to write the PDF to
+        progress: optional callable receiving progress(pages=..., rows=...) during layout
+        full: list every equipment row instead of the first REPORT_PREVIEW_ROWS
     
     Returns:
-        BytesIO: PDF file buffer
+        BytesIO: PDF file buffer (or `output` when one was given)
     """
-    buffer = BytesIO()
+    start = time.perf_counter()
+    buffer = BytesIO() if output is None else output
     
     # Create document with proper margins
     doc = SimpleDocTemplate(
@@ -213,13 +367,72 @@ def generate_pdf_report(dataset):
     elements.append(type_table)
     elements.append(Spacer(1, 0.4*inch))
     
+    # Charts (rendered server-side and shared with the chart endpoints' cache)
+    charts_heading = Paragraph("<b>Charts</b>", heading_style)
+    chart_images = []
+    with timed_phase('charts'):
+        for chart in ('types', 'parameters'):
+            chart_path = get_cached_chart(dataset, chart, 'png', *REPORT_CHART_SIZE, dpi=REPORT_CHART_DPI)
+            with open(chart_path, 'rb') as f:
+                chart_images.append(Image(BytesIO(f.read()),
+                                          width=REPORT_CHART_SIZE[0] / REPORT_CHART_DPI * inch,
+                                          height=REPORT_CHART_SIZE[1] / REPORT_CHART_DPI * inch))
+    
+    elements.append(KeepTogether([charts_heading, Spacer(1, 0.1*inch), chart_images[0]]))
+    elements.append(Spacer(1, 0.2*inch))
+    elements.append(chart_images[1])
+    elements.append(Spacer(1, 0.4*inch))
+    
     # Equipment Details
     details_heading = Paragraph("<b>Equipment Details</b>", heading_style)
+    details_spacer = Spacer(1, 0.1*inch)
+    if full:
+        # Start the listing on a fresh page so each chunk table fills whole pages
+        elements.append(PageBreak())
     elements.append(details_heading)
-    elements.append(Spacer(1, 0.1*inch))
+    elements.append(details_spacer)
+    
+    if full:
+        frame_height = doc.height - 12  # Default frame padding is 6pt top and bottom
+        _, heading_height = details_heading.wrap(doc.width, doc.height)
+        heading_height += heading_style.spaceBefore + heading_style.spaceAfter + details_spacer.height
+        detail_tables = _full_detail_tables(dataset, frame_height - heading_height, frame_height)
+    else:
+        detail_tables = [_preview_detail_table(dataset)]
     
+    # Footer note
+    footer_text = Paragraph(
+        "<i>This report was automatically generated by the Chemical Equipment Visualizer System.</i>",
+        ParagraphStyle('footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey, alignment=1)
+    )
+    footer = [Spacer(1, 0.3*inch), footer_text]
+    
+    tracker = None
+    if progress is not None:
+        tracker = _ReportProgress(progress)
+        doc.setProgressCallBack(tracker.on_build)
+    
+    flowables = _ReportFlowables(elements, chain(detail_tables, footer), progress=tracker)
+    
+    # Build PDF
+    try:
+        with timed_phase('build'):
+            doc.build(flowables)
+    except Exception as e:
+        print(f"Error building PDF: {e}")
+        raise
+    
+    REPORT_RENDER_SECONDS.observe(time.perf_counter() - start, variant='full' if full else 'preview')
+    
+    if hasattr(buffer, 'seek'):
+        buffer.seek(0)
+    return buffer
+
+
+def _preview_detail_table(dataset):
+    """Build the equipment details table listing the first REPORT_PREVIEW_ROWS rows"""
     equipment_data = [['Equipment Name', 'Type', 'Flowrate\n(L/min)', 'Pressure\n(bar)', 'Temp\n(°C)']]
-    for equipment in dataset.equipment_items.all()[:25]:  # Show first 25 items
+    for equipment in dataset.equipment_items.all()[:REPORT_PREVIEW_ROWS]:
         equipment_data.append([
             equipment.equipment_name,
             equipment.equipment_type,
@@ -228,12 +441,15 @@ def generate_pdf_report(dataset):
             f"{equipment.temperature:.2f}"
         ])
     
-    if dataset.equipment_items.count() > 25:
+    shown_rows = len(equipment_data) - 1
+    
+    if dataset.equipment_items.count() > REPORT_PREVIEW_ROWS:
         equipment_data.append(['...', '...', '...', '...', '...'])
-        remaining = dataset.total_count - 25
-        equipment_data.append([f'+ {remaining} more items (showing 25 of {dataset.total_count})', '', '', '', ''])
+        remaining = dataset.total_count - REPORT_PREVIEW_ROWS
+        equipment_data.append([f'+ {remaining} more items (showing {REPORT_PREVIEW_ROWS} of {dataset.total_count})', '', '', '', ''])
     
     equipment_table = Table(equipment_data, colWidths=[1.9*inch, 1.4*inch, 1.1*inch, 1.1*inch, 0.7*inch])
+    equipment_table.report_rows = shown_rows
     equipment_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -254,22 +470,4 @@ def generate_pdf_report(dataset):
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
     ]))
     
-    elements.append(equipment_table)
-    
-    # Footer note
-    elements.append(Spacer(1, 0.3*inch))
-    footer_text = Paragraph(
-        "<i>This report was automatically generated by the Chemical Equipment Visualizer System.</i>",
-        ParagraphStyle('footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey, alignment=1)
-    )
-    elements.append(footer_text)
-    
-    # Build PDF
-    try:
-        doc.build(elements)
-    except Exception as e:
-        print(f"Error building PDF: {e}")
-        raise
-    
-    buffer.seek(0)
-    return buffer
+    return equipment_table
@@ -1,19 +1,76 @@
-from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.http import HttpResponse
-from .models import Dataset, Equipment
-from .serializers import DatasetSerializer, DatasetSummarySerializer, EquipmentSerializer
-from .utils import process_csv_file, generate_pdf_report
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .authentication import token_expired
+from .models import Dataset, Equipment, ReportJob
+from .serializers import DatasetSerializer, DatasetSummarySerializer, EquipmentSerializer, ReportJobSerializer
+from .utils import missing_columns, process_csv_file
+from .write_queue import serialized_write
+from .instrumentation import timed_phase
+from .profiling import ProfilingMixin
+from .file_cache import cached_file_response
+from .report_cache import get_cached_report
+from .report_jobs import stream_report_zip, submit_report_job
+from .exports import EXPORT_CONTENT_TYPES, EXPORT_FIELDS, EXPORT_STREAMS, parquet_available
+from .charts import CHART_CONTENT_TYPES, CHART_MAX_SIZE, CHART_MIN_SIZE, get_cached_chart
 import pandas as pd
+import gzip
 import io
+import os
+
+
+def _is_true(value):
+    """Interpret a query/body flag such as ?full=1 or {"full": true}"""
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def _dataset_etag(dataset_id, uploaded_at):
+    """ETag of a dataset's API representations; datasets never change after upload"""
+    return f'"dataset-{dataset_id}-{int(uploaded_at.timestamp() * 1000000)}"'
+
+
+def _conditional_response(request, etag, render):
+    """
+    Answer 304 Not Modified if the client already has `etag`, else render the response
+
+    Args:
+        request: the API request, checked for an If-None-Match header
+        etag: quoted ETag of the current representation
+        render: callable returning the full Response
+
+    Returns:
+        Response: with the ETag header set
+    """
+    if request.headers.get('If-None-Match') == etag:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = render()
+    response['ETag'] = etag
+    return response
+
+
+def _prune_datasets():
+    """
+    Delete all but the 5 most recent uploaded datasets
+
+    Datasets backfilled by the import_equipment command carry their source
+    file_path and are kept.
+    """
+    all_datasets = Dataset.objects.filter(file_path='')
+    if all_datasets.count() > 5:
+        datasets_to_delete = all_datasets[5:]
+        for ds in datasets_to_delete:
+            ds.delete()
 
 
 @api_view(['POST'])
+@authentication_classes([])  # A stale or expired token must not block logging in
 @permission_classes([AllowAny])
 def login_view(request):
     """Handle user login and return auth token"""
@@ -30,7 +87,12 @@ def login_view(request):
         return Response({'error': 'Invalid credentials'}, 
                        status=status.HTTP_401_UNAUTHORIZED)
     
-    token, _ = Token.objects.get_or_create(user=user)
+    token, created = Token.objects.get_or_create(user=user)
+    
+    # Rotate tokens that have outlived TOKEN_EXPIRY_HOURS
+    if not created and token_expired(token):
+        token.delete()
+        token = Token.objects.create(user=user)
     
     return Response({
         'token': token.key,
@@ -40,6 +102,17 @@ def login_view(request):
 
 
 @api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_view(request):
+    """Revoke the caller's auth token"""
+    if request.auth is not None and isinstance(request.auth, Token):
+        Token.objects.filter(key=request.auth.key).delete()
+    
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['POST'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def register_view(request):
     """Handle user registration"""
@@ -65,12 +138,16 @@ def register_view(request):
     }, status=status.HTTP_201_CREATED)
 
 
-class DatasetViewSet(viewsets.ModelViewSet):
+class DatasetViewSet(ProfilingMixin, viewsets.ModelViewSet):
     """ViewSet for managing datasets"""
     queryset = Dataset.objects.all()
     serializer_class = DatasetSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Users only ever see their own datasets; others' ids answer 404
+        return Dataset.objects.filter(uploaded_by=self.request.user)
+
     def get_serializer_class(self):
         if self.action == 'list':
             return DatasetSummarySerializer
@@ -79,73 +156,246 @@ class DatasetViewSet(viewsets.ModelViewSet):
     def list(self, request):
         """Return last 5 datasets for the current user"""
         datasets = Dataset.objects.filter(uploaded_by=request.user).order_by('-uploaded_at')[:5]
-        serializer = self.get_serializer(datasets, many=True)
-        return Response(serializer.data)
+        # The list changes only when a dataset is added or deleted
+        versions = ','.join(_dataset_etag(pk, uploaded_at).strip('"')
+                            for pk, uploaded_at in datasets.values_list('id', 'uploaded_at'))
+        etag = f'"datasets-{versions}"'
+        return _conditional_response(
+            request, etag, lambda: Response(self.get_serializer(datasets, many=True).data))
+
+    def retrieve(self, request, pk=None):
+        """Return a dataset with all of its equipment rows"""
+        dataset = self.get_object()
+        return _conditional_response(
+            request, _dataset_etag(dataset.pk, dataset.uploaded_at),
+            lambda: Response(self.get_serializer(dataset).data))
 
     @action(detail=False, methods=['post'])
     def upload_csv(self, request):
         """Handle CSV file upload and processing"""
-        if 'file' not in request.FILES:
+        with timed_phase('receive'):
+            files = request.FILES
+        
+        if 'file' not in files:
             return Response({'error': 'No file provided'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        csv_file = request.FILES['file']
+        csv_file = files['file']
         
-        # Validate file type
-        if not csv_file.name.endswith('.csv'):
-            return Response({'error': 'File must be a CSV'}, 
+        # Validate file type; clients may gzip the CSV to save bandwidth
+        compressed = csv_file.name.endswith('.csv.gz')
+        if not compressed and not csv_file.name.endswith('.csv'):
+            return Response({'error': 'File must be a CSV (or a gzip-compressed .csv.gz)'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_file)
-            
-            # Validate required columns
-            required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            with timed_phase('parse'):
+                # Read CSV file
+                df = pd.read_csv(gzip.GzipFile(fileobj=csv_file) if compressed else csv_file)
+                
+                # Validate required columns
+                missing = missing_columns(df)
             
-            if missing_columns:
-                return Response({'error': f'Missing columns: {", ".join(missing_columns)}'}, 
+            if missing:
+                return Response({'error': f'Missing columns: {", ".join(missing)}'}, 
                               status=status.HTTP_400_BAD_REQUEST)
             
             # Process the CSV data
-            dataset_name = csv_file.name
-            dataset, equipment_list = process_csv_file(df, dataset_name, request.user)
+            dataset_name = csv_file.name[:-len('.gz')] if compressed else csv_file.name
+            with timed_phase('ingest'):
+                dataset, equipment_list = serialized_write(process_csv_file, df, dataset_name, request.user)
             
             # Maintain only last 5 datasets
-            all_datasets = Dataset.objects.all()
-            if all_datasets.count() > 5:
-                datasets_to_delete = all_datasets[5:]
-                for ds in datasets_to_delete:
-                    ds.delete()
+            with timed_phase('prune'):
+                serialized_write(_prune_datasets)
             
-            serializer = DatasetSerializer(dataset)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            with timed_phase('serialize'):
+                data = DatasetSerializer(dataset).data
+            response = Response(data, status=status.HTTP_201_CREATED)
+            response['ETag'] = _dataset_etag(dataset.pk, dataset.uploaded_at)
+            return response
             
         except Exception as e:
             return Response({'error': f'Error processing file: {str(e)}'}, 
                           status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def batch_report(self, request):
+        """Stream a zip of PDF reports for {"datasets": [ids] or "all", "full": false}"""
+        requested = request.data.get('datasets')
+        datasets = Dataset.objects.filter(uploaded_by=request.user).select_related('uploaded_by')
+        
+        if requested == 'all':
+            datasets = list(datasets[:settings.BATCH_REPORT_MAX_DATASETS])
+        elif isinstance(requested, list) and requested:
+            if len(requested) > settings.BATCH_REPORT_MAX_DATASETS:
+                return Response({'error': f'At most {settings.BATCH_REPORT_MAX_DATASETS} datasets per batch'}, 
+                              status=status.HTTP_400_BAD_REQUEST)
+            try:
+                ids = [int(pk) for pk in requested]
+            except (TypeError, ValueError):
+                return Response({'error': 'Dataset ids must be integers'}, 
+                              status=status.HTTP_400_BAD_REQUEST)
+            datasets = list(datasets.filter(pk__in=ids))
+            missing = sorted(set(ids) - {ds.pk for ds in datasets})
+            if missing:
+                return Response({'error': f'Datasets not found: {", ".join(map(str, missing))}'}, 
+                              status=status.HTTP_404_NOT_FOUND)
+        else:
+            return Response({'error': 'Provide "datasets" as a list of ids or "all"'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        if not datasets:
+            return Response({'error': 'No datasets to report on'}, 
+                          status=status.HTTP_404_NOT_FOUND)
+        
+        full = _is_true(request.data.get('full'))
+        response = StreamingHttpResponse(stream_report_zip(datasets, full=full), 
+                                         content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="reports.zip"'
+        
+        return response
+
     @action(detail=True, methods=['get'])
     def summary(self, request, pk=None):
         """Get summary statistics for a dataset"""
         dataset = self.get_object()
-        serializer = DatasetSummarySerializer(dataset)
-        return Response(serializer.data)
+        return _conditional_response(
+            request, _dataset_etag(dataset.pk, dataset.uploaded_at),
+            lambda: Response(DatasetSummarySerializer(dataset).data))
+
+    @action(detail=True, methods=['get'])
+    def equipment(self, request, pk=None):
+        """Page through a dataset's equipment rows as column arrays (?after=<id>&limit=<n>)"""
+        dataset = self.get_object()
+        
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = int(request.query_params.get('limit', settings.EQUIPMENT_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': 'after and limit must be integers'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), settings.EQUIPMENT_PAGE_MAX)
+        
+        def render():
+            # Keyset pagination: each page starts after the last id of the previous one
+            fields = ['id'] + EXPORT_FIELDS
+            rows = list(Equipment.objects.filter(dataset=dataset, id__gt=after)
+                        .order_by('id').values_list(*fields)[:limit])
+            columns = [list(column) for column in zip(*rows)] or [[] for _ in fields]
+            return Response({
+                'count': dataset.total_count,
+                'next_after': rows[-1][0] if len(rows) == limit else None,
+                'columns': dict(zip(fields, columns)),
+            })
+        
+        # after and limit are part of the URL, so the dataset's ETag identifies the page
+        return _conditional_response(request, _dataset_etag(dataset.pk, dataset.uploaded_at), render)
 
     @action(detail=True, methods=['get'])
     def generate_report(self, request, pk=None):
-        """Generate PDF report for a dataset"""
+        """Generate PDF report for a dataset (?full=1 lists every equipment row)"""
         dataset = self.get_object()
+        full = _is_true(request.query_params.get('full'))
         
         try:
-            pdf_buffer = generate_pdf_report(dataset)
-            
-            response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="report_{dataset.name}"'
+            report_path = get_cached_report(dataset, full=full)
+            filename = f"report_{'full_' if full else ''}{dataset.name}"
+            return cached_file_response(request, report_path, 'application/pdf', filename)
             
+        except Exception as e:
+            return Response({'error': f'Error generating report: {str(e)}'}, 
+                          status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=True, methods=['get'], url_path='export/(?P<export_format>csv|ndjson|parquet)')
+    def export(self, request, pk=None, export_format=None):
+        """Stream every equipment row of a dataset as CSV, NDJSON or Parquet"""
+        dataset = self.get_object()
+        
+        if export_format == 'parquet' and not parquet_available():
+            return Response({'error': 'Parquet export requires pyarrow to be installed'}, 
+                          status=status.HTTP_501_NOT_IMPLEMENTED)
+        
+        response = StreamingHttpResponse(EXPORT_STREAMS[export_format](dataset), 
+                                         content_type=EXPORT_CONTENT_TYPES[export_format])
+        filename = f'{os.path.splitext(dataset.name)[0]}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        
+        return response
+
+    @action(detail=True, methods=['get'], url_path='charts/(?P<chart>types|parameters)/(?P<image_format>png|svg)')
+    def charts(self, request, pk=None, chart=None, image_format=None):
+        """Render a dataset chart server-side (?width=&height= in pixels)"""
+        dataset = self.get_object()
+        
+        try:
+            width = int(request.query_params.get('width', 800))
+            height = int(request.query_params.get('height', 600))
+        except ValueError:
+            return Response({'error': 'width and height must be integers'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        width = min(max(width, CHART_MIN_SIZE), CHART_MAX_SIZE)
+        height = min(max(height, CHART_MIN_SIZE), CHART_MAX_SIZE)
+        
+        try:
+            chart_path = get_cached_chart(dataset, chart, image_format, width, height)
+            response = cached_file_response(request, chart_path, CHART_CONTENT_TYPES[image_format])
+            response['Cache-Control'] = 'private, max-age=3600'
             return response
             
+        except Exception as e:
+            return Response({'error': f'Error rendering chart: {str(e)}'}, 
+                          status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ReportJobViewSet(ProfilingMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """ViewSet for background PDF report generation jobs"""
+    queryset = ReportJob.objects.all()
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ReportJob.objects.filter(requested_by=self.request.user).select_related('dataset')
+
+    def create(self, request):
+        """Queue report generation for one of the user's datasets and return the job"""
+        dataset_id = request.data.get('dataset')
+        
+        if not dataset_id:
+            return Response({'error': 'Please provide a dataset id'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        dataset = Dataset.objects.filter(pk=dataset_id, uploaded_by=request.user).first()
+        if not dataset:
+            return Response({'error': 'Dataset not found'}, 
+                          status=status.HTTP_404_NOT_FOUND)
+        
+        unfinished = self.get_queryset().filter(
+            status__in=[ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING]
+        ).exclude(dataset=dataset).count()
+        if unfinished >= settings.REPORT_JOB_MAX_PENDING:
+            return Response({'error': 'Too many report jobs in progress, try again shortly'}, 
+                          status=status.HTTP_429_TOO_MANY_REQUESTS)
+        
+        job = submit_report_job(dataset, request.user, full=_is_true(request.data.get('full')))
+        serializer = self.get_serializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the PDF produced by a completed job"""
+        job = self.get_object()
+        
+        if job.status != ReportJob.STATUS_COMPLETED:
+            return Response({'error': f'Report is not ready (status: {job.status})'}, 
+                          status=status.HTTP_409_CONFLICT)
+        
+        try:
+            report_path = get_cached_report(job.dataset, full=job.full)
+            filename = f"report_{'full_' if job.full else ''}{job.dataset.name}"
+            return cached_file_response(request, report_path, 'application/pdf', filename)
+            
         except Exception as e:
             return Response({'error': f'Error generating report: {str(e)}'}, 
                           status=status.HTTP_500_INTERNAL_SERVER_ERROR)
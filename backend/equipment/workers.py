@@ -0,0 +1,129 @@
+"""
+Entry points for process-pool workers
+
+Worker processes are spawned fresh, so this module must stay importable
+before Django is set up: model imports happen inside the functions.
+"""
+
+import time
+
+
+def init_django_worker(databases):
+    """Set up Django in a freshly spawned worker process"""
+    import django
+    from django.conf import settings
+
+    # Use the parent's live database settings (e.g. a test or benchmark DB)
+    settings.DATABASES = databases
+    django.setup()
+
+
+def run_report_job(job_id):
+    """
+    Render the report for a job inside a worker process
+
+    Progress (pages and equipment rows laid out) is written back to the job
+    row at most every REPORT_JOB_PROGRESS_INTERVAL seconds so that polling
+    clients can follow it without the worker hammering the database.
+    """
+    from django.conf import settings
+    from django.db import close_old_connections
+    from django.utils import timezone
+    from .models import ReportJob
+    from .report_cache import get_cached_report, pdf_page_count
+
+    close_old_connections()
+    job = ReportJob.objects.select_related('dataset', 'dataset__uploaded_by').get(pk=job_id)
+    ReportJob.objects.filter(pk=job_id).update(status=ReportJob.STATUS_RUNNING,
+                                               started_at=timezone.now())
+
+    state = {'pages': 0, 'written_at': 0.0}
+
+    def progress(pages, rows):
+        state['pages'] = pages
+        now = time.monotonic()
+        if now - state['written_at'] >= settings.REPORT_JOB_PROGRESS_INTERVAL:
+            state['written_at'] = now
+            ReportJob.objects.filter(pk=job_id).update(pages_done=pages, rows_done=rows)
+
+    try:
+        path = get_cached_report(job.dataset, progress=progress, full=job.full)
+        if not state['pages']:
+            # Served from the cache without rendering, so progress never ran
+            state['pages'] = pdf_page_count(path)
+    except Exception as e:
+        ReportJob.objects.filter(pk=job_id).update(status=ReportJob.STATUS_FAILED,
+                                                   error=str(e),
+                                                   finished_at=timezone.now())
+        return
+
+    ReportJob.objects.filter(pk=job_id).update(status=ReportJob.STATUS_COMPLETED,
+                                               pages_done=state['pages'],
+                                               rows_done=job.rows_total,
+                                               finished_at=timezone.now())
+
+
+def render_report(dataset_id, full=False):
+    """Render (or reuse) the cached report for a dataset and return its path"""
+    from django.db import close_old_connections
+    from .models import Dataset
+    from .report_cache import get_cached_report
+
+    close_old_connections()
+    dataset = Dataset.objects.select_related('uploaded_by').get(pk=dataset_id)
+    return get_cached_report(dataset, full=full)
+
+
+def read_equipment_file(path):
+    """Read and validate one CSV (optionally compressed) file for the import_equipment command"""
+    import pandas as pd
+    from .utils import missing_columns
+
+    df = pd.read_csv(path)  # Compression is inferred from the extension
+    missing = missing_columns(df)
+    if missing:
+        raise ValueError(f'Missing columns: {", ".join(missing)}')
+    return df
+
+
+def import_equipment_file(path, user_id, dataset_name):
+    """
+    Ingest one CSV (optionally compressed) file for the import_equipment command
+
+    Returns a dict with the file's outcome: status ('imported' or 'failed'),
+    rows, seconds, and dataset_id or error.
+    """
+    from django.contrib.auth.models import User
+    from django.db import close_old_connections
+    from .utils import process_csv_file
+
+    close_old_connections()
+    start = time.perf_counter()
+    try:
+        df = read_equipment_file(path)
+        dataset, _ = process_csv_file(df, dataset_name, User.objects.get(pk=user_id), file_path=path)
+    except Exception as e:
+        return {'path': path, 'status': 'failed', 'rows': 0,
+                'seconds': time.perf_counter() - start, 'error': str(e)}
+    return {'path': path, 'status': 'imported', 'rows': len(df),
+            'seconds': time.perf_counter() - start, 'dataset_id': dataset.pk}
+
+
+def parse_equipment_file(path):
+    """
+    Read one file for an import whose database writes happen in the parent process
+
+    Used on SQLite, which allows one writer at a time: the workers only
+    parse, and the parent writes each DataFrame with process_csv_file.
+
+    Returns a dict with status 'parsed' and the DataFrame as `df`, or
+    status 'failed' and `error`; both with path, rows and seconds.
+    """
+    start = time.perf_counter()
+    try:
+        df = read_equipment_file(path)
+    except Exception as e:
+        return {'path': path, 'status': 'failed', 'rows': 0,
+                'seconds': time.perf_counter() - start, 'error': str(e)}
+    return {'path': path, 'status': 'parsed', 'rows': len(df),
+            'seconds': time.perf_counter() - start, 'df': df}
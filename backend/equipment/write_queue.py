@@ -0,0 +1,48 @@
+"""
+Single-writer queue for SQLite
+
+SQLite allows one writer at a time. Concurrent uploads would otherwise
+contend for the write lock, each retrying until busy_timeout runs out.
+Funnelling them through one dedicated thread makes them wait their turn in
+order instead. Readers are unaffected: with the WAL journal they never
+wait for the writer.
+
+The queue only serializes writes made by this process. Other processes
+(report workers, extra server processes) still rely on busy_timeout.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection
+from .profiling import run_profiled
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-writer')
+        return _writer
+
+
+def serialized_write(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) on the writer thread and return its result
+
+    Calls run directly when the database is not SQLite, the queue is
+    disabled, or the caller already is the writer thread. Exceptions
+    propagate to the caller.
+    """
+    if (not settings.SQLITE_WRITE_QUEUE or connection.vendor != 'sqlite'
+            or threading.current_thread().name.startswith('sqlite-writer')):
+        return func(*args, **kwargs)
+    # Run in the caller's context so request instrumentation (timings, a
+    # requested profile) follows the write
+    context = contextvars.copy_context()
+    return _get_writer().submit(context.run, run_profiled, func, *args, **kwargs).result()
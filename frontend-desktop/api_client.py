@@ -0,0 +1,184 @@
+"""
+HTTP client for the Chemical Equipment API
+
+One ApiClient wraps a persistent requests.Session: connections are pooled
+and kept alive between calls, idempotent requests are retried with
+exponential backoff on connection errors and 502/503/504 responses, every
+call gets a default timeout, and compressed responses are accepted. The
+desktop app and the test scripts share it instead of building a new
+connection and Authorization header for every call. Dataset endpoints
+take the ETag of a cached copy and answer 304 Not Modified while it is
+still current.
+
+The session may be used from several threads at once; change the token
+only from one thread (the GUI thread in the desktop app).
+"""
+
+import io
+import os
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.fields import RequestField
+from urllib3.util import Retry, make_headers
+
+API_BASE_URL = 'http://localhost:8000/api'
+
+# (connect, read) timeouts in seconds for API calls
+REQUEST_TIMEOUT = (5, 30)
+# Uploads and report downloads can keep the server busy for a while
+TRANSFER_TIMEOUT = (5, 300)
+
+
+class MultipartFileBody:
+    """
+    multipart/form-data request body that streams one file from disk
+
+    requests sends it with a Content-Length (the development server does
+    not accept chunked request bodies) and reads it block by block, so
+    memory use stays flat however large the file is. `on_read(sent, total)`
+    is called after every block and may raise to abort the upload.
+    """
+
+    def __init__(self, field, file_path, filename=None, content_type='text/csv', on_read=None):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        part = RequestField(name=field, data=b'', filename=filename or os.path.basename(file_path))
+        part.make_multipart(content_type=content_type)
+        head = f'--{self.boundary}\r\n{part.render_headers()}'.encode()
+        tail = f'\r\n--{self.boundary}--\r\n'.encode()
+        self.length = len(head) + os.path.getsize(file_path) + len(tail)
+        self.sent = 0
+        self.on_read = on_read
+        self._file = open(file_path, 'rb')
+        self._parts = [io.BytesIO(head), self._file, io.BytesIO(tail)]
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        data = b''
+        while self._parts and (size < 0 or len(data) < size):
+            chunk = self._parts[0].read(-1 if size < 0 else size - len(data))
+            if chunk:
+                data += chunk
+            else:
+                self._parts.pop(0)
+        self.sent += len(data)
+        if data and self.on_read:
+            self.on_read(self.sent, self.length)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+class ApiClient:
+    """Pooled, retrying session bound to one API base URL and auth token"""
+
+    def __init__(self, base_url=API_BASE_URL, token=None, timeout=REQUEST_TIMEOUT,
+                 retries=3, backoff=0.3, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        # POSTs are not retried: an upload may have been processed even if
+        # the response never arrived
+        retry = Retry(total=retries, backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # gzip and deflate, plus br/zstd when their decoders are installed
+        self.session.headers.update(make_headers(accept_encoding=True))
+        self.set_token(token)
+
+    def set_token(self, token):
+        """Authenticate subsequent requests with `token`, or none if it is None"""
+        self.token = token
+        if token:
+            self.session.headers['Authorization'] = f'Token {token}'
+        else:
+            self.session.headers.pop('Authorization', None)
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        """Send a request to `path` under the base URL and return the response"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, self.url(path), **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    # Endpoints
+
+    def login(self, username, password):
+        return self.post('auth/login/', json={'username': username, 'password': password})
+
+    def register(self, username, password):
+        return self.post('auth/register/', json={'username': username, 'password': password})
+
+    def logout(self, token=None):
+        """Revoke `token`, by default the one currently set, on the server"""
+        token = token or self.token
+        return self.post('auth/logout/', headers={'Authorization': f'Token {token}'})
+
+    @staticmethod
+    def conditional_headers(etag):
+        """Headers asking for a 304 Not Modified if the resource still has `etag`"""
+        return {'If-None-Match': etag} if etag else {}
+
+    def datasets(self, etag=None):
+        return self.get('datasets/', headers=self.conditional_headers(etag))
+
+    def dataset(self, dataset_id, etag=None):
+        """A dataset with all of its equipment rows"""
+        return self.get(f'datasets/{dataset_id}/', headers=self.conditional_headers(etag))
+
+    def dataset_summary(self, dataset_id, etag=None):
+        """A dataset's summary fields, without its equipment rows"""
+        return self.get(f'datasets/{dataset_id}/summary/', headers=self.conditional_headers(etag))
+
+    def dataset_stats(self, dataset_id):
+        """Per-type equipment counts and average parameters, aggregated by the server"""
+        return self.get(f'live/datasets/{dataset_id}/stats/')
+
+    def equipment_page(self, dataset_id, after=None, limit=None):
+        """Equipment rows of a dataset with ids above `after`, as column arrays"""
+        params = {'after': after, 'limit': limit}
+        return self.get(f'datasets/{dataset_id}/equipment/',
+                        params={k: v for k, v in params.items() if v is not None})
+
+    def upload_csv(self, file_path, filename=None, on_progress=None):
+        """
+        Stream a CSV file, or a gzip-compressed one named *.csv.gz, to the server
+
+        Args:
+            file_path: file to send
+            filename: name to upload it as (default: the file's own name)
+            on_progress: called with (bytes sent, total bytes) while sending
+        """
+        compressed = (filename or file_path).endswith('.gz')
+        body = MultipartFileBody('file', file_path, filename,
+                                 content_type='application/gzip' if compressed else 'text/csv',
+                                 on_read=on_progress)
+        try:
+            return self.post('datasets/upload_csv/', data=body,
+                             headers={'Content-Type': body.content_type}, timeout=TRANSFER_TIMEOUT)
+        finally:
+            body.close()
+
+    def report(self, dataset_id, stream=True):
+        return self.get(f'datasets/{dataset_id}/generate_report/', stream=stream,
+                        timeout=TRANSFER_TIMEOUT)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compare repeated-call latency of one-off requests with the pooled ApiClient
+
+Registers a throwaway user on a running backend and fetches the dataset
+list --calls times, first with a fresh `requests.get` (new TCP connection
+per call, as the desktop app used to) and then through one ApiClient
+session (keep-alive connection reuse).
+
+Usage (with the backend running):
+    python bench_client.py --calls 200
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+import requests
+
+from api_client import API_BASE_URL, ApiClient
+
+
+def measure(call, count):
+    """Per-call latencies in milliseconds"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = call()
+        response.content
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def report(name, latencies):
+    p95 = statistics.quantiles(latencies, n=20, method='inclusive')[-1]
+    print(f'{name:<22} median {statistics.median(latencies):7.2f} ms   '
+          f'p95 {p95:7.2f} ms   mean {statistics.mean(latencies):7.2f} ms')
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default=API_BASE_URL, help='API base URL')
+    parser.add_argument('--calls', type=int, default=200, help='requests per variant')
+    args = parser.parse_args()
+
+    client = ApiClient(args.url)
+    response = client.register(f'bench_{uuid.uuid4().hex[:8]}', uuid.uuid4().hex)
+    response.raise_for_status()
+    token = response.json()['token']
+    client.set_token(token)
+
+    headers = {'Authorization': f'Token {token}'}
+    one_off = measure(lambda: requests.get(client.url('datasets/'), headers=headers, timeout=5),
+                      args.calls)
+    pooled = measure(client.datasets, args.calls)
+
+    print(f'{args.calls} x GET {client.url("datasets/")}')
+    baseline = report('requests.get', one_off)
+    improved = report('ApiClient (pooled)', pooled)
+    print(f'median latency {1 - improved / baseline:.0%} lower with connection reuse')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Measure desktop startup time on an offscreen Qt platform
+
+Each run starts a fresh Python process that launches the app the way
+main() does and reports two times:
+
+- first window: from process start until the login window has been painted
+- main window: from a (simulated, offline) login until the main window
+  has been painted with the most recent cached dataset; no backend is needed
+
+Each run gets a fresh local cache seeded with a synthetic dataset of
+--rows equipment rows (0 for an empty cache) and an unreachable API URL,
+so nothing depends on the machine's state and the script can run in CI.
+
+Usage:
+    python bench_startup.py --runs 5
+    python bench_startup.py --runs 5 --rows 0
+    python bench_startup.py --runs 5 --max-first-window 1.0   # exit 1 if slower
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+USERNAME = 'bench'
+
+
+def child():
+    """Start the app, report when each window has been painted, then quit"""
+    started = float(os.environ['BENCH_STARTED'])
+    from PyQt5.QtCore import QThreadPool, QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    import main
+
+    app = QApplication(sys.argv)
+    window = main.MainWindow()
+    times = {}
+
+    def first_window_painted():
+        times['first_window'] = time.time() - started
+        window.api.base_url = 'http://127.0.0.1:9/api'  # Unreachable; the app goes offline
+        login_started = time.perf_counter()
+        window.on_auth_success('bench-token', USERNAME, True)
+
+        def main_window_painted():
+            times['main_window'] = time.perf_counter() - login_started
+            window.tasks.cancel_all()
+            app.quit()
+
+        # Runs once the event loop has processed the main window's first paint
+        QTimer.singleShot(0, main_window_painted)
+
+    QTimer.singleShot(0, first_window_painted)
+    app.exec_()
+    QThreadPool.globalInstance().waitForDone(5000)
+    print(json.dumps(times))
+
+
+def seed_cache(cache_dir, rows):
+    """Cache one dataset of `rows` synthetic equipment rows for USERNAME"""
+    import numpy as np
+
+    from api_client import API_BASE_URL
+    from local_cache import LocalCache
+
+    types = np.array(['Pump', 'Valve', 'Compressor', 'Reactor', 'HeatExchanger'])
+    rng = np.random.default_rng(0)
+    columns = {
+        'id': np.arange(1, rows + 1),
+        'equipment_name': np.array([f'Equipment-{i}' for i in range(rows)]),
+        'equipment_type': types[rng.integers(len(types), size=rows)],
+        'flowrate': rng.uniform(50, 300, rows),
+        'pressure': rng.uniform(1, 20, rows),
+        'temperature': rng.uniform(20, 400, rows),
+    }
+    counts = dict(zip(*np.unique(columns['equipment_type'], return_counts=True)))
+    summary = {
+        'id': 1, 'name': 'bench.csv', 'uploaded_at': '2024-01-01T00:00:00Z',
+        'uploaded_by_username': USERNAME, 'total_count': rows,
+        'avg_flowrate': float(columns['flowrate'].mean()),
+        'avg_pressure': float(columns['pressure'].mean()),
+        'avg_temperature': float(columns['temperature'].mean()),
+        'equipment_types': {str(name): int(count) for name, count in counts.items()},
+    }
+    cache = LocalCache(API_BASE_URL, os.path.join(cache_dir, 'cache.sqlite3'))
+    cache.save_dataset_list(USERNAME, '"bench"', [summary])
+    cache.save_dataset(USERNAME, '"bench"', summary, columns)
+    cache.close()
+
+
+def run_once(cache_dir):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', BENCH_STARTED=repr(time.time()),
+               EQUIPMENT_VISUALIZER_CACHE_DIR=cache_dir)
+    output = subprocess.run([sys.executable, __file__, '--child'], cwd=HERE, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='number of app launches')
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='rows of the cached dataset shown at login (0: empty cache)')
+    parser.add_argument('--max-first-window', type=float,
+                        help='fail if the median time to first window exceeds this many seconds')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    results = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            if args.rows:
+                seed_cache(cache_dir, args.rows)
+            results.append(run_once(cache_dir))
+
+    medians = {}
+    for name in ('first_window', 'main_window'):
+        values = [result[name] for result in results]
+        medians[name] = statistics.median(values)
+        print(f'{name.replace("_", " "):<13} median {medians[name] * 1000:7.1f} ms   '
+              f'min {min(values) * 1000:7.1f} ms   max {max(values) * 1000:7.1f} ms')
+
+    if args.max_first_window is not None and medians['first_window'] > args.max_first_window:
+        print(f'Time to first window exceeds {args.max_first_window:.2f} s')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+Matplotlib charts for the desktop app
+
+Each ChartWidget keeps its figure, axes and artists between updates. When
+a new dataset has the same structure (pie categories, bar labels) only the
+artists' data changes; the axes are rebuilt, and tight_layout run, only
+when the structure changes. Rendered charts are kept per dataset, so
+showing a dataset again restores its pixels with a blit instead of
+re-rendering, and charts on a hidden tab are drawn when the tab is shown.
+
+Datasets with more equipment than fit as bars are charted as per-type
+averages over every row, instead of only the first few items.
+"""
+
+import math
+import sys
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+import matplotlib
+matplotlib.use('Qt5Agg')
+
+try:
+    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+except (ImportError, AttributeError):
+    try:
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    except ImportError as e:
+        print(f"Error importing matplotlib backend: {e}")
+        print("Try: pip install matplotlib --upgrade")
+        sys.exit(1)
+
+from matplotlib.figure import Figure
+
+PIE_COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b', '#fa709a']
+PIE_START_ANGLE = 90
+PIE_EXPLODE = 0.05
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.6
+
+# Up to this many items get one bar group each; larger datasets are averaged by type
+MAX_ITEM_BARS = 10
+PARAMETERS = [('flowrate', 'Flowrate', '#667eea'),
+              ('pressure', 'Pressure', '#764ba2'),
+              ('temperature', 'Temperature', '#f093fb')]
+BAR_HEIGHT = 0.25
+
+
+def average_by_type(columns):
+    """
+    Average each parameter per equipment type, vectorized over all rows
+
+    Args:
+        columns: {field: array} of equipment rows
+
+    Returns:
+        tuple: (type labels, {parameter: array of per-type means}, per-type counts)
+    """
+    types, inverse = np.unique(columns['equipment_type'], return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(types))
+    means = {}
+    for field, _, _ in PARAMETERS:
+        values = np.asarray(columns[field], dtype=float)
+        means[field] = np.bincount(inverse, weights=values, minlength=len(types)) / counts
+    return list(types), means, counts
+
+
+class ChartWidget(QWidget):
+    """Widget for displaying matplotlib charts"""
+
+    def __init__(self, parent=None, figsize=(10, 6), cache_size=8):
+        super().__init__(parent)
+        self.figure = Figure(figsize=figsize, dpi=100)
+        self.canvas = FigureCanvas(self.figure)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+        self.ax = None
+        self.artists = {}
+        self._structure = None
+        self._key = None
+        self._needs_draw = False
+        self._rendered = OrderedDict()  # (key, canvas size) -> saved pixels
+        self._bar_data = OrderedDict()  # key -> arguments of _plot_bars
+        self._cache_size = cache_size
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def clear(self):
+        self.figure.clear()
+        self.ax = None
+        self.artists = {}
+        self._structure = None
+        self._key = None
+        self._refresh()
+
+    # Rendering
+
+    def _canvas_size(self):
+        width, height = self.figure.bbox.size
+        return round(width), round(height)
+
+    def _on_draw(self, event):
+        """Keep the pixels of every full draw for the dataset on display"""
+        if self._key is None:
+            return
+        cache_key = (self._key, self._canvas_size())
+        self._rendered[cache_key] = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._rendered.move_to_end(cache_key)
+        while len(self._rendered) > self._cache_size:
+            self._rendered.popitem(last=False)
+
+    def _refresh(self):
+        """Bring the canvas up to date from cached pixels, or redraw it"""
+        if not self.isVisible():
+            self._needs_draw = True
+            return
+        cache_key = (self._key, self._canvas_size())
+        if self._key is None or cache_key not in self._rendered:
+            self.canvas.draw_idle()
+            return
+        self._rendered.move_to_end(cache_key)
+        self.canvas.restore_region(self._rendered[cache_key])
+        self.canvas.blit(self.figure.bbox)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._needs_draw:
+            self._needs_draw = False
+            self._refresh()
+
+    def _show(self, key, structure, build, update):
+        """
+        Display a chart, reusing artists and cached pixels where possible
+
+        Args:
+            key: identifies the data shown (e.g. the dataset id); None disables caching
+            structure: artists are rebuilt only when this differs from the last call
+            build: creates the axes' artists in self.artists
+            update: sets the artists' data
+        """
+        rebuilt = structure != self._structure
+        if rebuilt:
+            self.figure.clear()
+            self.ax = self.figure.add_subplot(111)
+            self.artists = {}
+            build()
+            self._structure = structure
+        update()
+        if rebuilt:
+            self.figure.tight_layout()
+
+        self._key = key
+        self._refresh()
+
+    # Equipment type distribution
+
+    def plot_equipment_types(self, equipment_types, key=None):
+        labels = list(equipment_types.keys())
+        sizes = np.array(list(equipment_types.values()), dtype=float)
+        if not labels or not sizes.sum():
+            self.clear()
+            return
+
+        def build():
+            ax = self.ax
+            # Create pie chart with better styling
+            wedges, texts, autotexts = ax.pie(
+                sizes,
+                labels=labels,
+                autopct='%1.1f%%',
+                colors=PIE_COLORS[:len(labels)],
+                startangle=PIE_START_ANGLE,
+                textprops={'fontsize': 11, 'weight': 'bold'},
+                explode=[PIE_EXPLODE] * len(labels)  # Slight separation
+            )
+
+            # Make percentage text more readable
+            for autotext in autotexts:
+                autotext.set_color('white')
+                autotext.set_fontsize(10)
+                autotext.set_weight('bold')
+
+            ax.set_title('Equipment Type Distribution', fontsize=16, fontweight='bold', pad=20)
+            self.artists = {'wedges': wedges, 'texts': texts, 'autotexts': autotexts}
+
+        def update():
+            # Same geometry as Axes.pie, applied to the existing wedges and texts
+            theta1 = PIE_START_ANGLE / 360
+            for wedge, text, autotext, frac in zip(self.artists['wedges'], self.artists['texts'],
+                                                   self.artists['autotexts'], sizes / sizes.sum()):
+                theta2 = theta1 + frac
+                thetam = math.pi * (theta1 + theta2)
+                x, y = PIE_EXPLODE * math.cos(thetam), PIE_EXPLODE * math.sin(thetam)
+                wedge.set_center((x, y))
+                wedge.set_theta1(360 * theta1)
+                wedge.set_theta2(360 * theta2)
+                xt = x + PIE_LABEL_DISTANCE * math.cos(thetam)
+                text.set_position((xt, y + PIE_LABEL_DISTANCE * math.sin(thetam)))
+                text.set_horizontalalignment('left' if xt > 0 else 'right')
+                autotext.set_position((x + PIE_PCT_DISTANCE * math.cos(thetam),
+                                       y + PIE_PCT_DISTANCE * math.sin(thetam)))
+                autotext.set_text('%1.1f%%' % (100 * frac))
+                theta1 = theta2
+
+        self._show(key, ('types', tuple(labels)), build, update)
+
+    # Parameter comparison
+
+    def plot_parameters(self, columns, key=None):
+        """Bars per item for small datasets, per-type averages over all rows otherwise"""
+        if key is not None and key in self._bar_data:
+            self._bar_data.move_to_end(key)
+            data = self._bar_data[key]
+        else:
+            count = len(columns['equipment_name'])
+            if count <= MAX_ITEM_BARS:
+                names = [str(name) for name in columns['equipment_name']]
+                values = {field: columns[field] for field, _, _ in PARAMETERS}
+                data = (names, values, 'Equipment', None)
+            else:
+                types, means, _ = average_by_type(columns)
+                data = (types, means, 'Equipment Type (average)',
+                        f'Averages by type over all {count:,} items')
+            if key is not None:
+                self._bar_data[key] = data
+                while len(self._bar_data) > self._cache_size:
+                    self._bar_data.popitem(last=False)
+        self._plot_bars(key, *data)
+
+    def plot_parameter_averages(self, type_stats, total_count, key=None):
+        """Per-type averages already aggregated by the server (`avg_<parameter>` per type)"""
+        types = [row['equipment_type'] for row in type_stats]
+        means = {field: [row[f'avg_{field}'] for row in type_stats] for field, _, _ in PARAMETERS}
+        self._plot_bars(key, types, means, 'Equipment Type (average)',
+                        f'Averages by type over all {total_count:,} items')
+
+    def _plot_bars(self, key, labels, values, ylabel, note):
+        if not labels:
+            self.clear()
+            return
+
+        def build():
+            ax = self.ax
+            y = np.arange(len(labels))
+
+            # Create horizontal bars for better label readability
+            bars = {}
+            for offset, (field, label, color) in zip((-BAR_HEIGHT, 0, BAR_HEIGHT), PARAMETERS):
+                bars[field] = ax.barh(y + offset, np.zeros(len(labels)), BAR_HEIGHT,
+                                      label=label, color=color, alpha=0.8)
+
+            ax.set_ylabel(ylabel, fontweight='bold', fontsize=12)
+            ax.set_xlabel('Value', fontweight='bold', fontsize=12)
+            ax.set_title('Equipment Parameters Comparison', fontsize=16, fontweight='bold', pad=20)
+            ax.set_yticks(y)
+            ax.set_yticklabels(labels, fontsize=10)
+            ax.legend(loc='lower right', fontsize=10)
+            ax.grid(axis='x', alpha=0.3, linestyle='--')
+
+            note_text = ax.text(0.02, 0.98, '', transform=ax.transAxes, fontsize=9,
+                                verticalalignment='top',
+                                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+            self.artists = {'bars': bars, 'note': note_text}
+
+        def update():
+            for field, _, _ in PARAMETERS:
+                for bar, value in zip(self.artists['bars'][field], values[field]):
+                    bar.set_width(value)
+            self.artists['note'].set_text(note or '')
+            self.artists['note'].set_visible(bool(note))
+            self.ax.relim()
+            self.ax.autoscale_view(scaley=False)
+
+        self._show(key, ('bars', ylabel, tuple(labels)), build, update)
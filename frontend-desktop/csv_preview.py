@@ -0,0 +1,110 @@
+"""
+Local preview of a CSV file before it is uploaded
+
+The file is read in a background task with the csv module, one row at a
+time, keeping only running totals of the columns the server uses, so even
+very large files take constant memory. The statistics match what the
+backend's process_csv_file computes with pandas, where a missing Type (one
+of pandas' default NA strings) is left out of the type counts. Files the
+server would reject are flagged: a parameter value that is missing (the
+equipment table's columns are NOT NULL) or not a number, or no rows at all.
+"""
+
+import csv
+import os
+from collections import Counter
+
+# Must match REQUIRED_COLUMNS in backend/equipment/utils.py
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+# (CSV column, summary field) of each averaged parameter
+NUMERIC_COLUMNS = [('Flowrate', 'avg_flowrate'), ('Pressure', 'avg_pressure'),
+                   ('Temperature', 'avg_temperature')]
+# Strings pandas.read_csv reads as missing values by default
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+# Rows between progress reports, each with the statistics so far
+CHUNK_ROWS = 50000
+
+
+class CsvPreviewError(Exception):
+    """The server would reject the file; the message says why"""
+
+
+class CsvStats:
+    """Running totals of a CSV's rows, summarized like process_csv_file"""
+
+    def __init__(self, header):
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise CsvPreviewError(f'Missing columns: {", ".join(missing)}')
+        self.width = len(header)
+        self.type_index = header.index('Type')
+        self.numeric_indexes = [header.index(column) for column, _ in NUMERIC_COLUMNS]
+        self.rows = 0
+        self.sums = [0.0] * len(NUMERIC_COLUMNS)
+        self.types = Counter()
+
+    def add(self, row, line):
+        if len(row) > self.width:
+            raise CsvPreviewError(f'Expected {self.width} fields on line {line}, saw {len(row)}')
+        self.rows += 1
+        # Short rows are padded with missing values, as pandas does
+        if self.type_index < len(row) and row[self.type_index] not in NA_VALUES:
+            self.types[row[self.type_index]] += 1
+        for i, index in enumerate(self.numeric_indexes):
+            value = row[index] if index < len(row) else ''
+            if value in NA_VALUES:
+                raise CsvPreviewError(f'{NUMERIC_COLUMNS[i][0]} value is missing on line {line}')
+            try:
+                self.sums[i] += float(value)
+            except ValueError:
+                raise CsvPreviewError(f'{NUMERIC_COLUMNS[i][0]} value {value!r} on line {line} '
+                                      f'is not a number')
+
+    def summary(self):
+        """
+        Returns:
+            dict: total_count, avg_<parameter> (None without rows) and
+                equipment_types (most common first), as the API reports them
+        """
+        summary = {'total_count': self.rows}
+        for (_, field), total in zip(NUMERIC_COLUMNS, self.sums):
+            summary[field] = round(total / self.rows, 2) if self.rows else None
+        summary['equipment_types'] = dict(self.types.most_common())
+        return summary
+
+
+def preview_csv(task, file_path, chunk_rows=CHUNK_ROWS):
+    """
+    Compute a CSV's summary statistics in the background
+
+    Reports (bytes read, file size) every `chunk_rows` rows, with the
+    statistics so far as a partial result. Returns the
+    final summary (see CsvStats.summary), or raises CsvPreviewError if the
+    server would reject the file.
+    """
+    size = os.path.getsize(file_path)
+    try:
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                raise CsvPreviewError('The file is empty')
+            stats = CsvStats(header)
+            for row in reader:
+                if not row:
+                    continue  # pandas skips blank lines
+                stats.add(row, reader.line_num)
+                if stats.rows % chunk_rows == 0:
+                    task.check_cancelled()
+                    task.report_progress(f.buffer.tell(), size)
+                    task.report_partial_result(stats.summary())
+    except UnicodeDecodeError as e:
+        raise CsvPreviewError(f'The file is not UTF-8 text ({e.reason})')
+    except csv.Error as e:
+        raise CsvPreviewError(f'Malformed CSV on line {reader.line_num}: {e}')
+    if not stats.rows:
+        raise CsvPreviewError('The file has no equipment rows')
+    return stats.summary()
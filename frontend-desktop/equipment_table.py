@@ -0,0 +1,219 @@
+"""
+Table model for a dataset's equipment rows
+
+Rows are held as one NumPy array per column, and cells are formatted only
+when the view paints them, so a QTableView stays fast at 100k+ rows.
+Sorting and filtering are computed with vectorized NumPy operations into
+an array of row positions; the view sees the rows in that order. Rows not
+included with the dataset are fetched page by page from the server as the
+user scrolls towards the end of the table (Qt's canFetchMore/fetchMore).
+"""
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+# (field, header) of each column, in display order
+COLUMNS = [
+    ('equipment_name', 'Equipment Name'),
+    ('equipment_type', 'Type'),
+    ('flowrate', 'Flowrate'),
+    ('pressure', 'Pressure'),
+    ('temperature', 'Temperature'),
+]
+NUMERIC_FIELDS = {'flowrate', 'pressure', 'temperature'}
+
+
+def _empty_column(field):
+    return np.array([], dtype=float if field in NUMERIC_FIELDS else str)
+
+
+def items_to_columns(items):
+    """Convert API equipment dicts to {field: array} columns, including `id`"""
+    columns = {'id': np.array([item['id'] for item in items], dtype=np.int64)}
+    for field, _ in COLUMNS:
+        columns[field] = np.array([item[field] for item in items],
+                                  dtype=float if field in NUMERIC_FIELDS else str)
+    return columns
+
+
+class EquipmentTableModel(QAbstractTableModel):
+    """
+    Read-only model over column arrays with vectorized sort and filter
+
+    `page_loader(dataset_id, after, on_page, on_error)` is called to fetch
+    the rows with ids above `after` in the background; it must call
+    `on_page` with the API's page (`count`, `next_after` and `columns`) or
+    `on_error` with a message, on the GUI thread.
+    """
+
+    loaded_changed = pyqtSignal()  # Rows loaded, filter or totals changed
+
+    def __init__(self, page_loader=None, parent=None):
+        super().__init__(parent)
+        self.page_loader = page_loader
+        self.dataset_id = None
+        self.total = 0
+        self.fetch_error = None
+        self._columns = {field: _empty_column(field) for field, _ in COLUMNS}
+        self._next_after = None
+        self._fetching = False
+        self._order = np.arange(0)
+        self._sort = None  # (column, Qt.SortOrder)
+        self._filter = ''
+        self._search_text = None  # Lower-cased "name\ttype" per row, built on first filter
+
+    # Loading
+
+    @property
+    def loaded(self):
+        return len(self._columns['flowrate'])
+
+    def set_dataset(self, dataset_id, total, columns=None):
+        """
+        Show a dataset, starting from the rows already at hand
+
+        Args:
+            dataset_id: id of the dataset, used to fetch missing rows
+            total: number of equipment rows in the dataset
+            columns: all rows, or the first rows in id order, as {field: array}
+                including `id` (see items_to_columns), if already loaded
+        """
+        self.beginResetModel()
+        self.dataset_id = dataset_id
+        self.total = total
+        self.fetch_error = None
+        self._fetching = False
+        self._columns = {field: _empty_column(field) for field, _ in COLUMNS}
+        self._search_text = None
+        self._next_after = 0
+        if columns is not None and len(columns['id']):
+            self._columns = {
+                field: np.asarray(columns[field], dtype=float if field in NUMERIC_FIELDS else str)
+                for field, _ in COLUMNS
+            }
+            self._next_after = int(columns['id'][-1]) if self.loaded < total else None
+        elif not total:
+            self._next_after = None
+        self._order = self._compute_order()
+        self.endResetModel()
+        self.loaded_changed.emit()
+
+    def clear(self):
+        self.set_dataset(None, 0)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (not parent.isValid() and self.page_loader is not None
+                and self._next_after is not None and self.loaded < self.total
+                and not self._fetching and self.fetch_error is None)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        dataset_id = self.dataset_id
+        self.page_loader(dataset_id, self._next_after,
+                         lambda page: self._on_page(dataset_id, page),
+                         lambda message: self._on_page_error(dataset_id, message))
+
+    def _on_page(self, dataset_id, page):
+        if dataset_id != self.dataset_id:
+            return  # The model moved on to another dataset meanwhile
+        self._fetching = False
+        self.total = page['count']
+        self._next_after = page['next_after']
+        new = page['columns']
+        for field, _ in COLUMNS:
+            self._columns[field] = np.concatenate([
+                self._columns[field],
+                np.asarray(new[field], dtype=float if field in NUMERIC_FIELDS else str),
+            ])
+        if self._search_text is not None:
+            self._search_text = np.concatenate([self._search_text, self._lowered(new)])
+
+        order = self._compute_order()
+        if self._sort is None:
+            # Loaded rows keep their positions; new matches go at the end
+            if len(order) > len(self._order):
+                self.beginInsertRows(QModelIndex(), len(self._order), len(order) - 1)
+                self._order = order
+                self.endInsertRows()
+        else:
+            self.layoutAboutToBeChanged.emit()
+            self._order = order
+            self.layoutChanged.emit()
+        self.loaded_changed.emit()
+
+    def _on_page_error(self, dataset_id, message):
+        if dataset_id != self.dataset_id:
+            return
+        self._fetching = False
+        # Stop fetching until the dataset is shown again, rather than retry on every scroll
+        self.fetch_error = message
+        self.loaded_changed.emit()
+
+    # Sorting and filtering
+
+    @staticmethod
+    def _lowered(columns):
+        names = np.char.lower(np.asarray(columns['equipment_name'], dtype=str))
+        types = np.char.lower(np.asarray(columns['equipment_type'], dtype=str))
+        return np.char.add(np.char.add(names, '\t'), types)
+
+    def _compute_order(self):
+        """Positions of the loaded rows to show, filtered and sorted"""
+        if self._filter:
+            if self._search_text is None:
+                self._search_text = self._lowered(self._columns)
+            order = np.flatnonzero(np.char.find(self._search_text, self._filter) >= 0)
+        else:
+            order = np.arange(self.loaded)
+        if self._sort is not None:
+            column, sort_order = self._sort
+            keys = self._columns[COLUMNS[column][0]][order]
+            order = order[np.argsort(keys, kind='stable')]
+            if sort_order == Qt.DescendingOrder:
+                order = order[::-1]
+        return order
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort = (column, order) if 0 <= column < len(COLUMNS) else None
+        self.layoutAboutToBeChanged.emit()
+        self._order = self._compute_order()
+        self.layoutChanged.emit()
+
+    def set_filter(self, text):
+        """Show only rows whose name or type contains `text` (case-insensitive)"""
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        self.beginResetModel()
+        self._filter = text
+        self._order = self._compute_order()
+        self.endResetModel()
+        self.loaded_changed.emit()
+
+    # Model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        field = COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            value = self._columns[field][self._order[index.row()]]
+            return str(float(value)) if field in NUMERIC_FIELDS else str(value)
+        if role == Qt.TextAlignmentRole and field in NUMERIC_FIELDS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return str(section + 1)
@@ -0,0 +1,86 @@
+"""
+List model of the dataset history
+
+set_datasets() compares a freshly fetched list with the one on display by
+dataset id, and removes, inserts, moves or updates only the rows that
+differ, so a refresh that changed one entry repaints that entry alone.
+Entries are formatted once, when they are added or change.
+"""
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+def format_dataset(dataset):
+    """Text of one history entry"""
+    return (f"📁 {dataset['name']}\n"
+            f"   Uploaded: {dataset['uploaded_at']}\n"
+            f"   Count: {dataset['total_count']} | "
+            f"Avg Flowrate: {dataset['avg_flowrate']:.2f}\n"
+            f"   User: {dataset.get('uploaded_by_username', 'Unknown')}")
+
+
+class HistoryModel(QAbstractListModel):
+    """Dataset summaries, most recent first; Qt.UserRole holds the summary dict"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.datasets = []
+        self._texts = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.datasets)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._texts[index.row()]
+        if role == Qt.UserRole:
+            return self.datasets[index.row()]
+        return None
+
+    def set_datasets(self, datasets):
+        """
+        Show `datasets`, touching only the rows that changed
+
+        Returns:
+            int: number of rows removed, inserted, moved or updated
+        """
+        changes = 0
+        ids = {dataset['id'] for dataset in datasets}
+        for row in reversed(range(len(self.datasets))):
+            if self.datasets[row]['id'] not in ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.datasets[row], self._texts[row]
+                self.endRemoveRows()
+                changes += 1
+
+        for row, dataset in enumerate(datasets):
+            current = self.datasets[row]['id'] if row < len(self.datasets) else None
+            if current == dataset['id']:
+                if self.datasets[row] != dataset:
+                    self.datasets[row] = dataset
+                    self._texts[row] = format_dataset(dataset)
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                    changes += 1
+                continue
+            old_row = next((i for i in range(row + 1, len(self.datasets))
+                            if self.datasets[i]['id'] == dataset['id']), None)
+            if old_row is not None:
+                self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), row)
+                self.datasets.insert(row, self.datasets.pop(old_row))
+                self._texts.insert(row, self._texts.pop(old_row))
+                self.endMoveRows()
+                if self.datasets[row] != dataset:
+                    self.datasets[row] = dataset
+                    self._texts[row] = format_dataset(dataset)
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+            else:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.datasets.insert(row, dataset)
+                self._texts.insert(row, format_dataset(dataset))
+                self.endInsertRows()
+            changes += 1
+        return changes
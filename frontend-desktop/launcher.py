@@ -46,6 +46,11 @@ def check_backend_running():
     except:
         return False
 
+def has_local_cache():
+    """Check if an earlier session left datasets to show offline"""
+    from local_cache import CACHE_DIR
+    return os.path.exists(os.path.join(CACHE_DIR, 'cache.sqlite3'))
+
 def main():
     """Main launcher function"""
     print("\n" + "="*60)
@@ -58,8 +63,11 @@ def main():
     # Check virtual environment
     check_venv()
     
-    # Check if backend is running
-    if not check_backend_running():
+    # Check if backend is running; without it only cached data can be shown
+    backend_running = check_backend_running()
+    if not backend_running and has_local_cache():
+        print("Backend server is not running - starting offline with cached data (read-only).\n")
+    elif not backend_running:
         print("\n" + "="*60)
         print("ERROR: Backend server is not running!")
         print("="*60)
@@ -0,0 +1,212 @@
+"""
+Local cache of the desktop app's datasets, for instant startup and offline use
+
+Dataset summaries and equipment rows are kept in an SQLite file under the
+user's profile, keyed by server, username and dataset id together with the
+ETag the server sent with them. After login the main window paints the
+cached data at once and revalidates it in the background with
+If-None-Match, so an unchanged dataset costs a 304 instead of a download.
+While the server cannot be reached the cached datasets stay available
+read-only, and a user who logged in online before can log in offline.
+
+Offline logins check a salted PBKDF2 hash of the password; no API token
+is stored, so the app logs in again for a fresh one once the server is
+back. The cache file (and SQLite's journal files, which inherit its mode)
+is readable by its owner only, inside a directory created with mode 0700.
+
+Rows are stored as compressed NumPy column arrays, the same layout the
+table model and charts use. NumPy is imported when rows are first read or
+written, so the login window does not wait for it.
+"""
+
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Under %LOCALAPPDATA% on Windows, $XDG_CACHE_HOME or ~/.cache elsewhere
+CACHE_DIR = os.environ.get('EQUIPMENT_VISUALIZER_CACHE_DIR') or os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+    or os.path.join(os.path.expanduser('~'), '.cache'),
+    'ChemicalEquipmentVisualizer')
+PASSWORD_ITERATIONS = 100000
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+-- Older caches kept the API token with each login
+DROP TABLE IF EXISTS logins;
+CREATE TABLE IF NOT EXISTS offline_logins (
+    server TEXT NOT NULL,
+    username TEXT NOT NULL,
+    salt BLOB NOT NULL,
+    password_hash BLOB NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (server, username)
+);
+CREATE TABLE IF NOT EXISTS dataset_lists (
+    server TEXT NOT NULL,
+    username TEXT NOT NULL,
+    etag TEXT,
+    datasets TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (server, username)
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    server TEXT NOT NULL,
+    username TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    etag TEXT,
+    summary TEXT NOT NULL,
+    rows BLOB NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (server, username, id)
+);
+"""
+
+
+def _hash_password(password, salt):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PASSWORD_ITERATIONS)
+
+
+def _pack_columns(columns):
+    import numpy as np
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    return buffer.getvalue()
+
+
+def _unpack_columns(blob):
+    import numpy as np
+    with np.load(io.BytesIO(blob), allow_pickle=False) as arrays:
+        return {name: arrays[name] for name in arrays.files}
+
+
+class LocalCache:
+    """
+    Per-server SQLite cache of logins, dataset lists, summaries and rows
+
+    Safe to use from the GUI thread and background tasks at once; writes
+    of large datasets are best left to a background task.
+    """
+
+    def __init__(self, server, path=None):
+        self.server = server
+        self.path = path or os.path.join(CACHE_DIR, 'cache.sqlite3')
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            self._conn = self._connect(self.path)
+        except (OSError, sqlite3.Error) as e:
+            # The app still works without a persistent cache, only not offline
+            logger.warning('Local cache unavailable (%s); using an in-memory cache', e)
+            self.path = ':memory:'
+            self._conn = self._connect(self.path)
+
+    @staticmethod
+    def _connect(path):
+        if path != ':memory:':
+            # Create the file owner-only before SQLite does, and fix older ones
+            os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(path, 0o600)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Overwrite deleted content, such as the tokens of a dropped old logins table
+        conn.execute('PRAGMA secure_delete=ON')
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Logins
+
+    def remember_login(self, username, password):
+        """Keep a salted hash of the password so `username` can log in offline later"""
+        salt = os.urandom(16)
+        self._execute('INSERT OR REPLACE INTO offline_logins VALUES (?, ?, ?, ?, ?)',
+                      (self.server, username, salt, _hash_password(password, salt), time.time()))
+
+    def check_offline_login(self, username, password):
+        """
+        Check credentials against the last successful online login
+
+        Returns:
+            bool: True if `username` logged in online before with this password
+        """
+        rows = self._execute('SELECT salt, password_hash FROM offline_logins '
+                             'WHERE server = ? AND username = ?', (self.server, username))
+        if not rows:
+            return False
+        salt, password_hash = rows[0]
+        return hmac.compare_digest(_hash_password(password, salt), password_hash)
+
+    def forget_login(self, username):
+        self._execute('DELETE FROM offline_logins WHERE server = ? AND username = ?',
+                      (self.server, username))
+
+    # Datasets
+
+    def dataset_list(self, username):
+        """
+        Returns:
+            tuple: (ETag, list of dataset summaries), or (None, []) if nothing is cached
+        """
+        rows = self._execute('SELECT etag, datasets FROM dataset_lists '
+                             'WHERE server = ? AND username = ?', (self.server, username))
+        if not rows:
+            return None, []
+        return rows[0][0], json.loads(rows[0][1])
+
+    def save_dataset_list(self, username, etag, datasets):
+        """Store the dataset list and drop cached datasets no longer in it"""
+        ids = [dataset['id'] for dataset in datasets]
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO dataset_lists VALUES (?, ?, ?, ?, ?)',
+                               (self.server, username, etag, json.dumps(datasets), time.time()))
+            self._conn.execute(
+                f'DELETE FROM datasets WHERE server = ? AND username = ? '
+                f'AND id NOT IN ({", ".join("?" * len(ids))})',
+                (self.server, username, *ids))
+
+    def dataset(self, username, dataset_id):
+        """
+        Returns:
+            tuple: (ETag, summary dict, {field: array} of rows), or None if not cached
+        """
+        rows = self._execute('SELECT etag, summary, rows FROM datasets '
+                             'WHERE server = ? AND username = ? AND id = ?',
+                             (self.server, username, dataset_id))
+        if not rows:
+            return None
+        etag, summary, blob = rows[0]
+        return etag, json.loads(summary), _unpack_columns(blob)
+
+    def save_dataset(self, username, etag, summary, columns):
+        """
+        Store a dataset's summary and all of its rows
+
+        Args:
+            username: owner of the cache entry
+            etag: ETag the server sent with the dataset
+            summary: dataset fields without `equipment_items`
+            columns: {field: array} of every equipment row, including `id`
+        """
+        blob = _pack_columns(columns)
+        self._execute('INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?)',
+                      (self.server, username, summary['id'], etag, json.dumps(summary),
+                       blob, time.time()))
+
+    def forget_dataset(self, username, dataset_id):
+        self._execute('DELETE FROM datasets WHERE server = ? AND username = ? AND id = ?',
+                      (self.server, username, dataset_id))
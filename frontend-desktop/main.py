@@ -1,30 +1,16 @@
+import logging
 import sys
 import os
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
 
 # Check and install dependencies before importing
 def check_dependencies():
-    """Check if required packages are installed"""
-    missing = []
-    
-    try:
-        import PyQt5
-    except ImportError:
-        missing.append('PyQt5')
-    
-    try:
-        import matplotlib
-    except ImportError:
-        missing.append('matplotlib')
-    
-    try:
-        import requests
-    except ImportError:
-        missing.append('requests')
-    
-    try:
-        import pandas
-    except ImportError:
-        missing.append('pandas')
+    """Check if required packages are installed, without importing them yet"""
+    # matplotlib and numpy are imported on first use, e.g. when the Charts tab opens
+    missing = [package for package in ('PyQt5', 'matplotlib', 'numpy', 'requests')
+               if find_spec(package) is None]
     
     if missing:
         print("\n" + "="*60)
@@ -42,47 +28,45 @@ def check_dependencies():
 
 check_dependencies()
 
-import requests
-import pandas as pd
-
 try:
     from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                  QHBoxLayout, QPushButton, QLabel, QLineEdit, 
-                                 QFileDialog, QTableWidget, QTableWidgetItem, 
+                                 QFileDialog, QTableView, QHeaderView, 
                                  QMessageBox, QTabWidget, QGroupBox, QGridLayout,
-                                 QTextEdit, QScrollArea, QFrame)
-    from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
+                                 QTextEdit, QScrollArea, QFrame, QProgressBar,
+                                 QCheckBox, QListView)
+    from PyQt5.QtCore import Qt, QThread, QThreadPool, pyqtSignal, QTimer
     from PyQt5.QtGui import QFont, QPalette, QColor
 except ImportError as e:
     print(f"Error importing PyQt5: {e}")
     sys.exit(1)
 
-import matplotlib
-matplotlib.use('Qt5Agg')
-import matplotlib.pyplot as plt
+from api_client import ApiClient
+from csv_preview import preview_csv
+from history_model import HistoryModel
+from local_cache import LocalCache
+from refresh_scheduler import MAX_INTERVAL, MIN_INTERVAL, RefreshScheduler
+from workers import (TaskRunner, api_call, download_report, fetch_json, load_dataset,
+                     upload_csv)
 
-try:
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-except (ImportError, AttributeError):
-    try:
-        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-    except ImportError as e:
-        print(f"Error importing matplotlib backend: {e}")
-        print("Try: pip install matplotlib --upgrade")
-        sys.exit(1)
+logger = logging.getLogger(__name__)
 
-from matplotlib.figure import Figure
-
-API_BASE_URL = 'http://localhost:8000/api'
+# Datasets opened from the history that are kept in memory for instant switching
+RECENT_DATASETS = 8
 
 
 class AuthWindow(QWidget):
     """Authentication window for login/register"""
     
-    auth_success = pyqtSignal(str, str)  # token, username
+    auth_success = pyqtSignal(str, str, bool)  # token, username, offline
+    # username, password: kept in memory to log in online once the server is back
+    offline_login = pyqtSignal(str, str)
     
-    def __init__(self):
+    def __init__(self, api, cache):
         super().__init__()
+        self.api = api
+        self.cache = cache
+        self.tasks = TaskRunner()
         self.initUI()
     
     def initUI(self):
@@ -139,6 +123,22 @@ class AuthWindow(QWidget):
         
         self.setLayout(layout)
     
+    def set_busy(self, busy):
+        """Disable the buttons while a login or registration is in flight"""
+        self.login_btn.setEnabled(not busy)
+        self.register_btn.setEnabled(not busy)
+        if busy:
+            self.error_label.setText('⏳ Contacting server...')
+    
+    def submit(self, action, on_result, on_error=None):
+        """Post the credentials to /auth/<action>/ in the background"""
+        self.set_busy(True)
+        self.tasks.start(api_call, getattr(self.api, action),
+                         self.username_input.text(), self.password_input.text(),
+                         on_result=on_result,
+                         on_error=on_error or (lambda message: self.error_label.setText(f'❌ {message}')),
+                         on_finished=lambda: self.set_busy(False))
+    
     def login(self):
         username = self.username_input.text()
         password = self.password_input.text()
@@ -147,15 +147,16 @@ class AuthWindow(QWidget):
             self.error_label.setText('⚠️ Please enter username and password')
             return
         
+        self.submit('login', self.on_login_response, self.on_login_error)
+    
+    def on_login_response(self, response):
         try:
-            response = requests.post(f'{API_BASE_URL}/auth/login/', 
-                                    json={'username': username, 'password': password},
-                                    timeout=5)
-            
             if response.status_code == 200:
                 data = response.json()
                 if 'token' in data and 'username' in data:
-                    self.auth_success.emit(data['token'], data['username'])
+                    self.error_label.setText('')
+                    self.cache.remember_login(data['username'], self.password_input.text())
+                    self.auth_success.emit(data['token'], data['username'], False)
                     self.close()
                 else:
                     self.error_label.setText('❌ Invalid response from server')
@@ -166,13 +167,19 @@ class AuthWindow(QWidget):
                 self.error_label.setText(f'❌ {error_msg}')
             else:
                 self.error_label.setText(f'❌ Login failed (Status: {response.status_code})')
-        except requests.exceptions.ConnectionError:
-            self.error_label.setText('❌ Backend server not running! Start it first.')
-        except requests.exceptions.Timeout:
-            self.error_label.setText('❌ Server timeout. Check backend connection.')
         except Exception as e:
             self.error_label.setText(f'❌ Error: {str(e)}')
     
+    def on_login_error(self, message):
+        """Fall back to the cached data if these credentials worked online before"""
+        username, password = self.username_input.text(), self.password_input.text()
+        if not self.cache.check_offline_login(username, password):
+            self.error_label.setText(f'❌ {message}')
+            return
+        self.error_label.setText('')
+        self.offline_login.emit(username, password)
+        self.close()
+    
     def register(self):
         username = self.username_input.text()
         password = self.password_input.text()
@@ -185,17 +192,19 @@ class AuthWindow(QWidget):
             self.error_label.setText('⚠️ Password must be at least 6 characters')
             return
         
+        self.submit('register', self.on_register_response)
+    
+    def on_register_response(self, response):
+        username = self.username_input.text()
         try:
-            response = requests.post(f'{API_BASE_URL}/auth/register/', 
-                                    json={'username': username, 'password': password},
-                                    timeout=5)
-            
             if response.status_code == 201:
                 data = response.json()
                 if 'token' in data and 'username' in data:
+                    self.error_label.setText('')
                     QMessageBox.information(self, 'Success', 
                         f'✅ Account created successfully!\nWelcome, {username}!')
-                    self.auth_success.emit(data['token'], data['username'])
+                    self.cache.remember_login(data['username'], self.password_input.text())
+                    self.auth_success.emit(data['token'], data['username'], False)
                     self.close()
                 else:
                     self.error_label.setText('❌ Invalid response from server')
@@ -207,97 +216,12 @@ class AuthWindow(QWidget):
                     self.error_label.setText(f'❌ {error_msg}')
             else:
                 self.error_label.setText(f'❌ Registration failed (Status: {response.status_code})')
-        except requests.exceptions.ConnectionError:
-            self.error_label.setText('❌ Backend server not running! Start it first.')
-        except requests.exceptions.Timeout:
-            self.error_label.setText('❌ Server timeout. Check backend connection.')
         except Exception as e:
             self.error_label.setText(f'❌ Error: {str(e)}')
-
-
-class ChartWidget(QWidget):
-    """Widget for displaying matplotlib charts"""
     
-    def __init__(self, parent=None, figsize=(10, 6)):
-        super().__init__(parent)
-        self.figure = Figure(figsize=figsize, dpi=100)
-        self.canvas = FigureCanvas(self.figure)
-        
-        layout = QVBoxLayout()
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.addWidget(self.canvas)
-        self.setLayout(layout)
-    
-    def clear(self):
-        self.figure.clear()
-        self.canvas.draw()
-    
-    def plot_equipment_types(self, equipment_types):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        labels = list(equipment_types.keys())
-        sizes = list(equipment_types.values())
-        colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b', '#fa709a']
-        
-        # Create pie chart with better styling
-        wedges, texts, autotexts = ax.pie(
-            sizes, 
-            labels=labels, 
-            autopct='%1.1f%%', 
-            colors=colors[:len(labels)], 
-            startangle=90,
-            textprops={'fontsize': 11, 'weight': 'bold'},
-            explode=[0.05] * len(labels)  # Slight separation
-        )
-        
-        # Make percentage text more readable
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(10)
-            autotext.set_weight('bold')
-        
-        ax.set_title('Equipment Type Distribution', fontsize=16, fontweight='bold', pad=20)
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
-    
-    def plot_parameters(self, equipment_items):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        # Limit to first 10 items for better readability
-        items_to_plot = equipment_items[:10] if len(equipment_items) > 10 else equipment_items
-        
-        names = [item['equipment_name'] for item in items_to_plot]
-        flowrates = [item['flowrate'] for item in items_to_plot]
-        pressures = [item['pressure'] for item in items_to_plot]
-        temperatures = [item['temperature'] for item in items_to_plot]
-        
-        y = range(len(names))
-        height = 0.25
-        
-        # Create horizontal bars for better label readability
-        ax.barh([i - height for i in y], flowrates, height, label='Flowrate', color='#667eea', alpha=0.8)
-        ax.barh(y, pressures, height, label='Pressure', color='#764ba2', alpha=0.8)
-        ax.barh([i + height for i in y], temperatures, height, label='Temperature', color='#f093fb', alpha=0.8)
-        
-        ax.set_ylabel('Equipment', fontweight='bold', fontsize=12)
-        ax.set_xlabel('Value', fontweight='bold', fontsize=12)
-        ax.set_title('Equipment Parameters Comparison', fontsize=16, fontweight='bold', pad=20)
-        ax.set_yticks(y)
-        ax.set_yticklabels(names, fontsize=10)
-        ax.legend(loc='lower right', fontsize=10)
-        ax.grid(axis='x', alpha=0.3, linestyle='--')
-        
-        # Add note if items were limited
-        if len(equipment_items) > 10:
-            ax.text(0.02, 0.98, f'Showing first 10 of {len(equipment_items)} items', 
-                   transform=ax.transAxes, fontsize=9, verticalalignment='top',
-                   bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+    def closeEvent(self, event):
+        self.tasks.cancel_all()
+        super().closeEvent(event)
 
 
 class MainWindow(QMainWindow):
@@ -307,24 +231,55 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.token = None
         self.username = None
+        self.reconnect_password = None  # Set while logged in offline without a token
         self.current_dataset = None
+        self.current_columns = None  # {field: array} of the current dataset's rows
+        self.current_etag = None
+        self.current_stats = None  # Per-type averages from the server, when rows aren't loaded
+        self.recent_datasets = OrderedDict()  # id -> loaded dataset, least recently used first
+        self.loading_datasets = {}  # id -> background task loading it
+        self.syncing_history = False
         self.datasets = []
-        self.refresh_timer = None
+        self.datasets_etag = None
+        self.offline = False
+        self.refresh_scheduler = RefreshScheduler(self)
+        self.refresh_scheduler.due.connect(self.auto_refresh_data)
+        self.refresh_task = None
+        self.transfer_task = None
+        self.transfer_stage = ''
+        self.stage_started = 0
+        self.preview_task = None
+        self.preview_error = None  # Why the server would reject the selected file
+        self.preview_scanned = 0  # Percent of the file the running preview has read
+        self.api = ApiClient()
+        self.cache = LocalCache(self.api.base_url)
+        self.tasks = TaskRunner()
         
         self.show_auth()
     
     def show_auth(self):
         """Show authentication window"""
-        self.auth_window = AuthWindow()
+        self.auth_window = AuthWindow(self.api, self.cache)
         self.auth_window.auth_success.connect(self.on_auth_success)
+        self.auth_window.offline_login.connect(self.on_offline_login)
         self.auth_window.show()
     
-    def on_auth_success(self, token, username):
+    def on_offline_login(self, username, password):
+        """Start offline, without a token; one is fetched once the server answers"""
+        self.reconnect_password = password
+        self.on_auth_success('', username, offline=True)
+    
+    def on_auth_success(self, token, username, offline=False):
         """Handle successful authentication"""
         self.token = token
         self.username = username
+        self.api.set_token(token)
         self.initUI()
         self.show()
+        self.load_cached_data()
+        self.set_offline(offline)
+        if not offline:
+            self.revalidate_current_dataset()
         self.fetch_datasets()
         self.start_auto_refresh()
     
@@ -352,6 +307,11 @@ class MainWindow(QMainWindow):
         
         header_layout.addStretch()
         
+        self.offline_label = QLabel('📴 Offline - showing cached data (read-only)')
+        self.offline_label.setStyleSheet('color: white; font-weight: bold; padding-right: 10px;')
+        self.offline_label.setVisible(False)
+        header_layout.addWidget(self.offline_label)
+        
         self.refresh_label = QLabel('🔄 Auto-refresh: ON')
         self.refresh_label.setStyleSheet('color: white; padding-right: 10px;')
         header_layout.addWidget(self.refresh_label)
@@ -376,6 +336,10 @@ class MainWindow(QMainWindow):
         self.upload_btn.setEnabled(False)
         upload_layout.addWidget(self.upload_btn)
         
+        self.compress_checkbox = QCheckBox('Compress (gzip)')
+        self.compress_checkbox.setToolTip('Compress the CSV before sending; faster on slow networks')
+        upload_layout.addWidget(self.compress_checkbox)
+        
         self.download_btn = QPushButton('Download PDF Report')
         self.download_btn.clicked.connect(self.download_report)
         self.download_btn.setEnabled(False)
@@ -387,6 +351,11 @@ class MainWindow(QMainWindow):
         self.refresh_toggle_btn.setStyleSheet('background-color: #43e97b; color: black;')
         upload_layout.addWidget(self.refresh_toggle_btn)
         
+        self.cancel_btn = QPushButton('Cancel')
+        self.cancel_btn.clicked.connect(self.cancel_transfer)
+        self.cancel_btn.setVisible(False)
+        upload_layout.addWidget(self.cancel_btn)
+        
         logout_btn = QPushButton('Logout')
         logout_btn.clicked.connect(self.logout)
         upload_layout.addWidget(logout_btn)
@@ -394,35 +363,56 @@ class MainWindow(QMainWindow):
         upload_group.setLayout(upload_layout)
         main_layout.addWidget(upload_group)
         
-        # Tabs
+        # Statistics of the selected file, computed locally before it is uploaded
+        self.preview_label = QLabel()
+        self.preview_label.setWordWrap(True)
+        self.preview_label.setStyleSheet('padding: 5px 10px; background-color: #f5f5f5;')
+        self.preview_label.setVisible(False)
+        main_layout.addWidget(self.preview_label)
+        
+        # Transfer progress, shown while an upload or download runs
+        self.transfer_progress = QProgressBar()
+        self.transfer_progress.setVisible(False)
+        main_layout.addWidget(self.transfer_progress)
+        
+        # Tabs; each one is set up the first time it is shown
         self.tabs = QTabWidget()
+        self.tab_setups = {}
         
         # Summary Tab
-        self.summary_tab = QWidget()
-        self.setup_summary_tab()
-        self.tabs.addTab(self.summary_tab, 'Summary')
+        self.summary_tab = self.add_tab('Summary', self.setup_summary_tab)
         
         # Charts Tab
-        self.charts_tab = QWidget()
-        self.setup_charts_tab()
-        self.tabs.addTab(self.charts_tab, 'Charts')
+        self.charts_tab = self.add_tab('Charts', self.setup_charts_tab)
         
         # Data Table Tab
-        self.table_tab = QWidget()
-        self.setup_table_tab()
-        self.tabs.addTab(self.table_tab, 'Data Table')
+        self.table_tab = self.add_tab('Data Table', self.setup_table_tab)
         
         # History Tab
-        self.history_tab = QWidget()
-        self.setup_history_tab()
-        self.tabs.addTab(self.history_tab, 'History')
+        self.history_tab = self.add_tab('History', self.setup_history_tab)
         
+        self.tabs.currentChanged.connect(self.build_tab)
+        self.build_tab(self.tabs.currentIndex())
         main_layout.addWidget(self.tabs)
         
         central_widget.setLayout(main_layout)
         
         self.selected_file = None
     
+    def add_tab(self, title, setup):
+        """Add an empty tab whose contents `setup` creates when the tab is first shown"""
+        tab = QWidget()
+        self.tab_setups[self.tabs.addTab(tab, title)] = setup
+        return tab
+    
+    def build_tab(self, index):
+        setup = self.tab_setups.pop(index, None)
+        if setup is not None:
+            setup()
+    
+    def is_tab_built(self, tab):
+        return self.tabs.indexOf(tab) not in self.tab_setups
+    
     def setup_summary_tab(self):
         """Setup summary statistics tab with improved styling"""
         layout = QVBoxLayout()
@@ -508,6 +498,9 @@ class MainWindow(QMainWindow):
     
     def setup_charts_tab(self):
         """Setup charts tab with improved layout"""
+        # matplotlib is the slowest import; load it only once the charts are needed
+        from charts import ChartWidget
+        
         main_layout = QVBoxLayout()
         
         # Create scroll area for charts
@@ -545,24 +538,50 @@ class MainWindow(QMainWindow):
         
         main_layout.addWidget(scroll)
         self.charts_tab.setLayout(main_layout)
+        
+        if self.current_dataset:
+            self.update_charts()
     
     def setup_table_tab(self):
         """Setup data table tab with improved styling"""
+        from equipment_table import EquipmentTableModel
+        
         layout = QVBoxLayout()
         
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(5)
-        self.data_table.setHorizontalHeaderLabels(['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
+        # Filter and row count
+        filter_layout = QHBoxLayout()
+        self.table_filter = QLineEdit()
+        self.table_filter.setPlaceholderText('Filter by equipment name or type')
+        filter_layout.addWidget(self.table_filter)
+        self.table_status_label = QLabel('')
+        filter_layout.addWidget(self.table_status_label)
+        layout.addLayout(filter_layout)
+        
+        # Rows live in a model; the view only formats the cells it paints
+        self.table_model = EquipmentTableModel(page_loader=self.load_equipment_page)
+        self.table_model.loaded_changed.connect(self.update_table_status)
+        self.table_filter.textChanged.connect(self.table_model.set_filter)
+        
+        self.data_table = QTableView()
+        self.data_table.setModel(self.table_model)
+        
+        # Sort by clicking a header; no indicator means upload order
+        self.data_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.data_table.setSortingEnabled(True)
+        
+        # Fixed row heights and sampled column widths keep large tables cheap
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.horizontalHeader().setResizeContentsPrecision(200)
         
         # Improve table appearance
         self.data_table.setAlternatingRowColors(True)
         self.data_table.horizontalHeader().setStretchLastSection(True)
         self.data_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #d0d0d0;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
             QHeaderView::section {
@@ -576,15 +595,22 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(self.data_table)
         self.table_tab.setLayout(layout)
+        
+        if self.current_dataset:
+            self.update_table()
     
     def setup_history_tab(self):
         """Setup history tab with improved styling"""
         layout = QVBoxLayout()
         
-        self.history_list = QTextEdit()
-        self.history_list.setReadOnly(True)
+        # Refreshes update only the entries that changed (see history_model)
+        self.history_model = HistoryModel(self)
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_model)
+        self.history_list.setSpacing(6)
+        self.history_list.selectionModel().currentRowChanged.connect(self.on_history_row_changed)
         self.history_list.setStyleSheet("""
-            QTextEdit {
+            QListView {
                 background-color: #f8f9fa;
                 border: 1px solid #dee2e6;
                 border-radius: 5px;
@@ -594,10 +620,16 @@ class MainWindow(QMainWindow):
             }
         """)
         
-        layout.addWidget(QLabel('<b style="font-size: 14px;">📜 Last 5 Uploaded Datasets (Your Uploads Only)</b>'))
+        self.history_empty_label = QLabel('No datasets uploaded yet.\n\nUpload a CSV file to get started!')
+        self.history_empty_label.setStyleSheet('padding: 15px; font-size: 13px;')
+        
+        layout.addWidget(QLabel('<b style="font-size: 14px;">📜 Last 5 Uploaded Datasets (Your Uploads Only)</b>'
+                                ' - select one to open it'))
+        layout.addWidget(self.history_empty_label)
         layout.addWidget(self.history_list)
         
         self.history_tab.setLayout(layout)
+        self.update_history()
     
     def select_file(self):
         """Handle file selection"""
@@ -606,7 +638,117 @@ class MainWindow(QMainWindow):
         if file_path:
             self.selected_file = file_path
             self.file_label.setText(file_path.split('/')[-1])
-            self.upload_btn.setEnabled(True)
+            self.start_preview(file_path)
+            self.update_transfer_buttons()
+    
+    def start_preview(self, file_path):
+        """Compute the selected file's statistics locally, as the server will"""
+        if self.preview_task is not None:
+            self.preview_task.cancel()
+        self.preview_error = None
+        self.preview_scanned = 0
+        self.preview_label.setText('🔍 Reading file...')
+        self.preview_label.setVisible(True)
+        task = self.tasks.start(
+            preview_csv, file_path,
+            on_result=lambda summary: self.show_preview(task, summary, final=True),
+            on_partial_result=lambda summary: self.show_preview(task, summary),
+            on_progress=lambda done, total: self.on_preview_progress(task, done, total),
+            on_error=lambda message: self.on_preview_error(task, message))
+        self.preview_task = task
+    
+    def on_preview_progress(self, task, done, total):
+        if task is self.preview_task and total:
+            self.preview_scanned = done * 100 // total
+    
+    def show_preview(self, task, summary, final=False):
+        """
+        Show the selected file's statistics
+        
+        Args:
+            task: the preview task; results of a superseded task are ignored
+            summary: statistics as process_csv_file reports them
+            final: False for the statistics of the rows read so far
+        """
+        if task is not self.preview_task:
+            return
+        if final:
+            self.preview_task = None
+            prefix = '✅ Preview'
+        else:
+            prefix = f'⏳ Preview so far ({self.preview_scanned}% of the file read)'
+        averages = ', '.join(
+            f'{name} {summary[field]:.2f}' if summary[field] is not None else f'{name} n/a'
+            for name, field in (('Flowrate', 'avg_flowrate'), ('Pressure', 'avg_pressure'),
+                                ('Temperature', 'avg_temperature')))
+        count = summary['total_count']
+        types = ', '.join(f'{name} {n:,} ({n * 100 / count:.1f}%)'
+                          for name, n in summary['equipment_types'].items())
+        self.preview_label.setText(f'{prefix}: <b>{count:,}</b> items &nbsp;|&nbsp; '
+                                   f'Average {averages} &nbsp;|&nbsp; Types: {types or "none"}')
+    
+    def on_preview_error(self, task, message):
+        if task is not self.preview_task:
+            return
+        self.preview_task = None
+        self.preview_error = message
+        self.preview_label.setText(f'❌ {message} - the server will reject this file')
+        self.update_transfer_buttons()
+    
+    def start_transfer(self, text, fn, *args, **kwargs):
+        """Run an upload or download in the background with a progress bar"""
+        self.upload_btn.setEnabled(False)
+        self.download_btn.setEnabled(False)
+        self.cancel_btn.setVisible(True)
+        self.on_transfer_stage(text)
+        self.transfer_progress.setVisible(True)
+        task = self.tasks.start(fn, *args, on_progress=self.on_transfer_progress,
+                                on_stage=self.on_transfer_stage, **kwargs)
+        task.signals.finished.connect(lambda: self.on_transfer_finished(task))
+        self.transfer_task = task
+    
+    def on_transfer_stage(self, text):
+        self.transfer_stage = text
+        self.stage_started = time.monotonic()
+        self.transfer_progress.setRange(0, 0)  # Busy until the size is known
+        self.transfer_progress.setFormat(f'{text}...')
+    
+    def on_transfer_progress(self, done, total):
+        """Show the bytes done in the current stage and the throughput"""
+        mb = 1024 * 1024
+        elapsed = time.monotonic() - self.stage_started
+        text = f'{self.transfer_stage}: {done / mb:.1f}'
+        if total:
+            # Per mille, as QProgressBar values are 32-bit
+            self.transfer_progress.setRange(0, 1000)
+            self.transfer_progress.setValue(done * 1000 // total)
+            text += f' of {total / mb:.1f} MB (%p%)'
+        else:
+            text += ' MB'
+        if elapsed > 0:
+            text += f' - {done / mb / elapsed:.1f} MB/s'
+        self.transfer_progress.setFormat(text)
+    
+    def on_transfer_finished(self, task):
+        if task is not self.transfer_task:
+            return  # Already cancelled
+        self.transfer_task = None
+        self.transfer_progress.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        self.update_transfer_buttons()
+    
+    def update_transfer_buttons(self):
+        """Uploads need the server and a valid file, downloads the server and a dataset"""
+        self.upload_btn.setEnabled(not self.offline and self.selected_file is not None
+                                   and self.preview_error is None)
+        self.download_btn.setEnabled(not self.offline and self.current_dataset is not None)
+    
+    def cancel_transfer(self):
+        """Cancel the running upload or download"""
+        if self.transfer_task is not None:
+            self.transfer_task.cancel()
+            # The request may still complete server-side; its result is ignored
+            self.on_transfer_finished(self.transfer_task)
     
     def upload_file(self):
         """Upload and process CSV file"""
@@ -614,36 +756,105 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Error', 'Please select a file first')
             return
         
-        try:
-            with open(self.selected_file, 'rb') as f:
-                files = {'file': f}
-                headers = {'Authorization': f'Token {self.token}'}
-                
-                response = requests.post(f'{API_BASE_URL}/datasets/upload_csv/', 
-                                       files=files, headers=headers)
-                
-                if response.status_code == 201:
-                    self.current_dataset = response.json()
-                    self.update_display()
-                    self.fetch_datasets()
-                    self.download_btn.setEnabled(True)
-                    QMessageBox.information(self, 'Success', 'File uploaded successfully!')
-                else:
-                    QMessageBox.warning(self, 'Error', f'Upload failed: {response.text}')
-        except Exception as e:
-            QMessageBox.critical(self, 'Error', f'Error uploading file: {str(e)}')
+        self.start_transfer('Uploading', upload_csv, self.api, self.selected_file,
+                            self.compress_checkbox.isChecked(),
+                            on_result=self.on_upload_response,
+                            on_error=lambda message: QMessageBox.critical(
+                                self, 'Error', f'Error uploading file: {message}'))
+    
+    def on_upload_response(self, response):
+        if response.status_code == 201:
+            self.show_dataset(response.json(), response.headers.get('ETag'))
+            self.fetch_datasets()
+            QMessageBox.information(self, 'Success', 'File uploaded successfully!')
+        else:
+            QMessageBox.warning(self, 'Error', f'Upload failed: {response.text}')
     
     def fetch_datasets(self):
         """Fetch dataset history"""
-        try:
-            headers = {'Authorization': f'Token {self.token}'}
-            response = requests.get(f'{API_BASE_URL}/datasets/', headers=headers)
+        self.start_refresh()
+    
+    def start_refresh(self):
+        """Fetch the dataset list in the background unless a fetch is already running"""
+        if self.refresh_task is not None:
+            return
+        if not self.token:
+            # Logged in offline: log in online first, which fails while the server is down
+            self.refresh_task = self.tasks.start(
+                api_call, self.api.login, self.username, self.reconnect_password,
+                on_result=self.on_reconnect_response,
+                on_error=self.on_refresh_error,
+                on_finished=self.on_refresh_finished)
+            return
+        self.refresh_task = self.tasks.start(
+            api_call, self.api.datasets, self.datasets_etag,
+            on_result=self.on_datasets_response,
+            on_error=self.on_refresh_error,
+            on_finished=self.on_refresh_finished)
+    
+    def on_refresh_finished(self):
+        self.refresh_task = None
+    
+    def on_refresh_error(self, message):
+        logger.warning('Error fetching datasets: %s', message)
+        self.refresh_scheduler.record(changed=False)
+        self.set_offline(True)
+    
+    def on_reconnect_response(self, response):
+        """Take the token of the online login made after an offline one"""
+        if response.status_code in (400, 401):
+            # e.g. the password was changed on the server meanwhile
+            self.session_expired()
+            return
+        if response.status_code != 200:
+            logger.warning('Login failed while reconnecting: %s', response.status_code)
+            self.refresh_scheduler.record(changed=False)
+            return
+        self.token = response.json()['token']
+        self.api.set_token(self.token)
+        self.cache.remember_login(self.username, self.reconnect_password)
+        self.reconnect_password = None
+        self.set_offline(False)
+        # Once this refresh has finished
+        QTimer.singleShot(0, self.fetch_datasets)
+    
+    def session_expired(self):
+        self.stop_auto_refresh()
+        QMessageBox.warning(self, 'Session expired', 'Your session has expired. Please log in again.')
+        self.logout()
+    
+    def on_datasets_response(self, response):
+        if response.status_code == 401:
+            self.session_expired()
+            return
+        self.set_offline(False)
+        if response.status_code != 200:
+            self.refresh_scheduler.record(changed=False)
+            if response.status_code != 304:  # 304: the cached list is current
+                logger.warning('Refresh failed: %s', response.status_code)
+            return
+        new_datasets = response.json()
+        self.datasets_etag = response.headers.get('ETag')
+        self.cache.save_dataset_list(self.username, self.datasets_etag, new_datasets)
+        self.refresh_scheduler.record(changed=new_datasets != self.datasets)
+        
+        # Check if there are new datasets
+        if new_datasets != self.datasets:
+            old_count = len(self.datasets)
+            self.datasets = new_datasets
+            ids = {dataset['id'] for dataset in new_datasets}
+            for dataset_id in [dataset_id for dataset_id in self.recent_datasets if dataset_id not in ids]:
+                del self.recent_datasets[dataset_id]
+            self.update_history()
             
-            if response.status_code == 200:
-                self.datasets = response.json()
-                self.update_history()
-        except Exception as e:
-            print(f'Error fetching datasets: {str(e)}')
+            # Update refresh label with timestamp
+            from datetime import datetime
+            now = datetime.now().strftime('%H:%M:%S')
+            self.refresh_label.setText(f'🔄 Updated: {now}')
+            
+            # Show notification if new dataset detected
+            if old_count and len(new_datasets) > old_count:
+                logger.info('New dataset detected, total: %d', len(new_datasets))
     
     def download_report(self):
         """Download PDF report"""
@@ -651,29 +862,90 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Error', 'No dataset selected')
             return
         
-        try:
-            file_path, _ = QFileDialog.getSaveFileName(self, 'Save PDF Report', 
-                                                       f"report_{self.current_dataset['name']}", 
-                                                       'PDF Files (*.pdf)')
-            
-            if file_path:
-                headers = {'Authorization': f'Token {self.token}'}
-                response = requests.get(
-                    f"{API_BASE_URL}/datasets/{self.current_dataset['id']}/generate_report/",
-                    headers=headers
-                )
-                
-                if response.status_code == 200:
-                    with open(file_path, 'wb') as f:
-                        f.write(response.content)
-                    QMessageBox.information(self, 'Success', 'Report downloaded successfully!')
-                else:
-                    QMessageBox.warning(self, 'Error', 'Failed to download report')
-        except Exception as e:
-            QMessageBox.critical(self, 'Error', f'Error downloading report: {str(e)}')
+        file_path, _ = QFileDialog.getSaveFileName(self, 'Save PDF Report', 
+                                                   f"report_{self.current_dataset['name']}", 
+                                                   'PDF Files (*.pdf)')
+        
+        if file_path:
+            self.start_transfer('Downloading report', download_report,
+                                self.api, self.current_dataset['id'], file_path,
+                                on_result=self.on_download_finished,
+                                on_error=lambda message: QMessageBox.critical(
+                                    self, 'Error', f'Error downloading report: {message}'))
+    
+    def on_download_finished(self, status_code):
+        if status_code == 200:
+            QMessageBox.information(self, 'Success', 'Report downloaded successfully!')
+        else:
+            QMessageBox.warning(self, 'Error', 'Failed to download report')
+    
+    def load_cached_data(self):
+        """Paint the datasets cached by an earlier session before the server answers"""
+        self.datasets_etag, self.datasets = self.cache.dataset_list(self.username)
+        self.update_history()
+        for dataset in self.datasets:  # Most recent first
+            cached = self.cache.dataset(self.username, dataset['id'])
+            if cached is not None:
+                self.current_etag, self.current_dataset, self.current_columns = cached
+                self.current_stats = None
+                self.remember_dataset(dataset['id'], {'etag': self.current_etag,
+                                                      'summary': self.current_dataset,
+                                                      'columns': self.current_columns, 'stats': None})
+                self.update_display()
+                return
     
-    def update_display(self):
-        """Update all display elements with current dataset"""
+    def set_offline(self, offline):
+        """Switch between normal and read-only offline mode"""
+        came_online = self.offline and not offline
+        self.offline = offline
+        self.offline_label.setVisible(offline)
+        if self.transfer_task is None:
+            self.update_transfer_buttons()
+        if came_online:
+            self.revalidate_current_dataset()
+    
+    def revalidate_current_dataset(self):
+        """Check in the background that the cached copy of the current dataset is still current"""
+        if self.current_dataset is None or self.current_etag is None:
+            return
+        dataset_id = self.current_dataset['id']
+        self.tasks.start(api_call, self.api.dataset, dataset_id, self.current_etag,
+                         on_result=lambda response: self.on_dataset_response(dataset_id, response),
+                         on_error=lambda message: logger.warning('Error revalidating dataset: %s', message))
+    
+    def on_dataset_response(self, dataset_id, response):
+        if self.current_dataset is None or self.current_dataset['id'] != dataset_id:
+            return
+        if response.status_code == 200:
+            self.show_dataset(response.json(), response.headers.get('ETag'))
+        elif response.status_code == 404:
+            self.cache.forget_dataset(self.username, dataset_id)
+    
+    def show_dataset(self, data, etag):
+        """Display a dataset received with all of its rows, and cache it for later sessions"""
+        from equipment_table import items_to_columns
+        
+        self.current_columns = items_to_columns(data.pop('equipment_items'))
+        self.current_dataset = data
+        self.current_etag = etag
+        self.current_stats = None
+        self.remember_dataset(data['id'], {'etag': etag, 'summary': data,
+                                           'columns': self.current_columns, 'stats': None})
+        self.update_display()
+        if self.transfer_task is None:
+            self.update_transfer_buttons()
+        
+        username, columns = self.username, self.current_columns
+        self.tasks.start(lambda task: self.cache.save_dataset(username, etag, data, columns),
+                         on_error=lambda message: logger.warning('Error caching dataset: %s', message))
+    
+    def update_display(self, rows_changed=True):
+        """
+        Update all display elements with current dataset
+        
+        Args:
+            rows_changed: False to leave the table, and the rows it has loaded, as they are
+        """
         if not self.current_dataset:
             return
         
@@ -693,89 +965,173 @@ class MainWindow(QMainWindow):
         
         self.dataset_info_text.setText(info_text)
         
-        # Update charts
-        self.type_chart.plot_equipment_types(self.current_dataset['equipment_types'])
-        
-        if self.current_dataset['equipment_items']:
-            self.params_chart.plot_parameters(self.current_dataset['equipment_items'])
-        
-        # Update table
-        equipment_items = self.current_dataset['equipment_items']
-        self.data_table.setRowCount(len(equipment_items))
-        
-        for i, item in enumerate(equipment_items):
-            self.data_table.setItem(i, 0, QTableWidgetItem(item['equipment_name']))
-            self.data_table.setItem(i, 1, QTableWidgetItem(item['equipment_type']))
-            self.data_table.setItem(i, 2, QTableWidgetItem(str(item['flowrate'])))
-            self.data_table.setItem(i, 3, QTableWidgetItem(str(item['pressure'])))
-            self.data_table.setItem(i, 4, QTableWidgetItem(str(item['temperature'])))
+        # Tabs not shown yet pick up the dataset when they are set up
+        if self.is_tab_built(self.charts_tab):
+            self.update_charts()
+        if rows_changed and self.is_tab_built(self.table_tab):
+            self.update_table()
+        self.select_current_history_row()
+    
+    def update_charts(self):
+        """Draw the current dataset's charts"""
+        # A dataset id can come back with other data after a server reset
+        chart_key = (self.current_dataset['id'], self.current_etag)
+        self.type_chart.plot_equipment_types(self.current_dataset['equipment_types'], key=chart_key)
+        
+        if self.current_columns is not None and len(self.current_columns['id']):
+            self.params_chart.plot_parameters(self.current_columns, key=chart_key)
+        elif self.current_stats is not None:
+            self.params_chart.plot_parameter_averages(self.current_stats['types'],
+                                                      self.current_stats['total_count'], key=chart_key)
+        else:
+            self.params_chart.clear()  # Drawn once the dataset has loaded
+    
+    def update_table(self):
+        """Show the current dataset's rows in the table"""
+        # Rows missing from the dataset are fetched as the user scrolls
+        self.table_model.set_dataset(self.current_dataset['id'], self.current_dataset['total_count'],
+                                     self.current_columns)
         
-        # Auto-resize columns to content
+        # Auto-resize columns to content (sampled rows only)
         self.data_table.resizeColumnsToContents()
         self.data_table.horizontalHeader().setStretchLastSection(True)
     
+    def load_equipment_page(self, dataset_id, after, on_page, on_error):
+        """Fetch the next page of equipment rows for the table model"""
+        self.tasks.start(fetch_json, self.api.equipment_page, dataset_id, after,
+                         on_result=on_page, on_error=on_error)
+    
+    def update_table_status(self):
+        """Show how many rows are shown, loaded and in the dataset"""
+        model = self.table_model
+        text = f'{model.rowCount():,} shown'
+        if model.loaded < model.total:
+            text += f' ({model.loaded:,} of {model.total:,} loaded)'
+        if model.fetch_error:
+            text += f' - ⚠️ {model.fetch_error}'
+        self.table_status_label.setText(text)
+    
     def update_history(self):
         """Update history list"""
-        if not self.datasets:
-            self.history_list.setText("No datasets uploaded yet.\n\nUpload a CSV file to get started!")
+        if not self.is_tab_built(self.history_tab):
+            return
+        self.syncing_history = True
+        self.history_model.set_datasets(self.datasets)
+        self.syncing_history = False
+        self.history_empty_label.setVisible(not self.datasets)
+        self.history_list.setVisible(bool(self.datasets))
+        self.select_current_history_row()
+    
+    def select_current_history_row(self):
+        """Highlight the dataset on display in the history, without reopening it"""
+        if not self.is_tab_built(self.history_tab) or self.current_dataset is None:
+            return
+        rows = [row for row, dataset in enumerate(self.history_model.datasets)
+                if dataset['id'] == self.current_dataset['id']]
+        self.syncing_history = True
+        if rows:
+            self.history_list.setCurrentIndex(self.history_model.index(rows[0]))
+        else:
+            self.history_list.selectionModel().clear()
+        self.syncing_history = False
+    
+    def on_history_row_changed(self, current, previous):
+        if not self.syncing_history and current.isValid():
+            self.open_dataset(current.data(Qt.UserRole))
+    
+    def open_dataset(self, summary):
+        """
+        Show a dataset from the history: at once if it was opened recently,
+        otherwise its summary first and its charts once loaded in the background
+        """
+        dataset_id = summary['id']
+        for other_id in [other_id for other_id in self.loading_datasets if other_id != dataset_id]:
+            self.loading_datasets.pop(other_id).cancel()
+        if self.current_dataset is not None and self.current_dataset['id'] == dataset_id:
             return
         
-        history_text = ""
-        for dataset in self.datasets:
-            history_text += f"📁 {dataset['name']}\n"
-            history_text += f"   Uploaded: {dataset['uploaded_at']}\n"
-            history_text += f"   Count: {dataset['total_count']} | "
-            history_text += f"Avg Flowrate: {dataset['avg_flowrate']:.2f}\n"
-            history_text += f"   User: {dataset.get('uploaded_by_username', 'Unknown')}\n\n"
-        
-        self.history_list.setText(history_text)
+        entry = self.recent_datasets.get(dataset_id)
+        if entry is None:
+            # Until it is loaded, the table pages the rows in from the server
+            entry = {'etag': None, 'summary': summary, 'columns': None, 'stats': None}
+            self.start_loading_dataset(dataset_id)
+        else:
+            self.recent_datasets.move_to_end(dataset_id)
+            self.prefetch_dataset_after(dataset_id)
+        self.current_dataset = entry['summary']
+        self.current_etag = entry['etag']
+        self.current_columns = entry['columns']
+        self.current_stats = entry['stats']
+        self.update_display()
+        if self.transfer_task is None:
+            self.update_transfer_buttons()
+    
+    def start_loading_dataset(self, dataset_id):
+        if dataset_id in self.loading_datasets:
+            return
+        self.loading_datasets[dataset_id] = self.tasks.start(
+            load_dataset, self.api, self.cache, self.username, dataset_id,
+            on_result=lambda entry: self.on_dataset_loaded(dataset_id, entry),
+            on_error=lambda message: self.on_dataset_load_error(dataset_id, message))
+    
+    def on_dataset_loaded(self, dataset_id, entry):
+        self.loading_datasets.pop(dataset_id, None)
+        self.remember_dataset(dataset_id, entry)
+        if self.current_dataset is None or self.current_dataset['id'] != dataset_id:
+            return  # Prefetched
+        self.current_dataset = entry['summary']
+        self.current_etag = entry['etag']
+        self.current_stats = entry['stats']
+        if entry['columns'] is not None:
+            self.current_columns = entry['columns']
+            self.update_display()
+            if not self.offline:
+                self.revalidate_current_dataset()
+        else:
+            # Keep the rows the table has paged in meanwhile
+            self.update_display(rows_changed=False)
+        self.prefetch_dataset_after(dataset_id)
+    
+    def on_dataset_load_error(self, dataset_id, message):
+        self.loading_datasets.pop(dataset_id, None)
+        logger.warning('Error loading dataset %s: %s', dataset_id, message)
+    
+    def remember_dataset(self, dataset_id, entry):
+        """Keep a loaded dataset in memory, dropping the least recently used ones"""
+        self.recent_datasets[dataset_id] = entry
+        self.recent_datasets.move_to_end(dataset_id)
+        while len(self.recent_datasets) > RECENT_DATASETS:
+            self.recent_datasets.popitem(last=False)
+    
+    def prefetch_dataset_after(self, dataset_id):
+        """Load the next older dataset in the history, the one most likely opened next"""
+        ids = [dataset['id'] for dataset in self.datasets]
+        if self.offline or dataset_id not in ids or ids.index(dataset_id) + 1 == len(ids):
+            return
+        next_id = ids[ids.index(dataset_id) + 1]
+        if next_id not in self.recent_datasets:
+            self.start_loading_dataset(next_id)
     
     def start_auto_refresh(self):
-        """Start auto-refresh timer for real-time monitoring"""
-        if self.refresh_timer is None:
-            self.refresh_timer = QTimer()
-            self.refresh_timer.timeout.connect(self.auto_refresh_data)
-            self.refresh_timer.start(5000)  # Refresh every 5 seconds
-            print("Auto-refresh started (every 5 seconds)")
+        """Start auto-refresh for real-time monitoring"""
+        if not self.refresh_scheduler.is_active():
+            self.refresh_scheduler.start()
+            logger.info('Auto-refresh started (every %d-%d seconds, slower while nothing changes)',
+                        MIN_INTERVAL, MAX_INTERVAL)
     
     def stop_auto_refresh(self):
-        """Stop auto-refresh timer"""
-        if self.refresh_timer is not None:
-            self.refresh_timer.stop()
-            self.refresh_timer = None
-            print("Auto-refresh stopped")
+        """Stop auto-refresh"""
+        if self.refresh_scheduler.is_active():
+            self.refresh_scheduler.stop()
+            logger.info('Auto-refresh stopped')
     
     def auto_refresh_data(self):
         """Auto-refresh datasets from backend"""
-        try:
-            headers = {'Authorization': f'Token {self.token}'}
-            response = requests.get(f'{API_BASE_URL}/datasets/', headers=headers, timeout=2)
-            
-            if response.status_code == 200:
-                new_datasets = response.json()
-                
-                # Check if there are new datasets
-                if new_datasets != self.datasets:
-                    old_count = len(self.datasets)
-                    self.datasets = new_datasets
-                    self.update_history()
-                    
-                    # Update refresh label with timestamp
-                    from datetime import datetime
-                    now = datetime.now().strftime('%H:%M:%S')
-                    self.refresh_label.setText(f'🔄 Updated: {now}')
-                    
-                    # Show notification if new dataset detected
-                    if len(new_datasets) > old_count:
-                        print(f"New dataset detected! Total: {len(new_datasets)}")
-            else:
-                print(f"Refresh failed: {response.status_code}")
-        except Exception as e:
-            print(f"Auto-refresh error: {str(e)}")
+        self.start_refresh()
     
     def toggle_auto_refresh(self):
         """Toggle auto-refresh on/off"""
-        if self.refresh_timer and self.refresh_timer.isActive():
+        if self.refresh_scheduler.is_active():
             self.stop_auto_refresh()
             self.refresh_toggle_btn.setText('⏸️ Auto-Refresh: OFF')
             self.refresh_toggle_btn.setStyleSheet('background-color: #fa709a; color: white;')
@@ -788,18 +1144,59 @@ class MainWindow(QMainWindow):
             now = datetime.now().strftime('%H:%M:%S')
             self.refresh_label.setText(f'🔄 Updated: {now}')
     
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        self.update_refresh_visibility()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_refresh_visibility()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_refresh_visibility()
+    
+    def update_refresh_visibility(self):
+        """Auto-refresh slows down while nobody can see the window"""
+        self.refresh_scheduler.set_hidden(self.isHidden() or self.isMinimized())
+    
+    def closeEvent(self, event):
+        self.stop_auto_refresh()
+        self.tasks.cancel_all()
+        super().closeEvent(event)
+    
     def logout(self):
-        """Handle logout"""
+        """Handle logout; the cached datasets stay, but not the offline login"""
+        token = self.token
         self.stop_auto_refresh()
+        self.tasks.cancel_all()
+        self.cache.forget_login(self.username)
         self.token = None
+        self.api.set_token(None)
         self.username = None
+        self.reconnect_password = None
         self.current_dataset = None
+        self.current_columns = None
+        self.current_etag = None
+        self.current_stats = None
+        self.recent_datasets.clear()
+        self.loading_datasets.clear()
         self.datasets = []
+        self.datasets_etag = None
+        self.offline = False
+        self.preview_task = None
+        self.preview_error = None
         self.close()
+        if token:
+            # Revoke the token on the server; started after close(), whose
+            # cancel_all() would cancel it, and without an error slot so
+            # logging out still works offline
+            self.tasks.start(api_call, self.api.logout, token)
         self.show_auth()
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     app = QApplication(sys.argv)
     
     # Set application style
@@ -816,7 +1213,11 @@ def main():
     app.setPalette(palette)
     
     window = MainWindow()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    # Closing the window cancels running requests; let them return before
+    # Python tears down the objects they report to
+    QThreadPool.globalInstance().waitForDone(5000)
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,95 @@
+"""
+Adaptive timing of the desktop app's auto-refresh
+
+Instead of polling on a fixed interval, the delay before the next refresh
+doubles each time a refresh finds nothing new (the server answered the
+conditional request with 304) or the server can't be reached, up to
+MAX_INTERVAL, and drops back to MIN_INTERVAL as soon as something changes.
+While the window is hidden or minimized every delay is HIDDEN_FACTOR times
+longer; when it is shown again it refreshes at once if the last refresh is
+older than MIN_INTERVAL. Each delay is spread randomly by +/- JITTER, so
+stations started together don't keep polling the server in lockstep.
+"""
+
+import random
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# Seconds between refreshes while the data keeps changing
+MIN_INTERVAL = 5
+# Longest delay the backoff reaches while nothing changes
+MAX_INTERVAL = 60
+BACKOFF_FACTOR = 2
+HIDDEN_FACTOR = 5
+# Fraction by which each delay is randomly lengthened or shortened
+JITTER = 0.2
+
+
+class RefreshScheduler(QObject):
+    """Emits `due` whenever the next refresh should run"""
+
+    due = pyqtSignal()
+
+    def __init__(self, parent=None, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        super().__init__(parent)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.hidden = False
+        self.last_refresh = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+
+    def is_active(self):
+        return self._timer.isActive()
+
+    def start(self):
+        self.interval = self.min_interval
+        self._schedule()
+
+    def stop(self):
+        self._timer.stop()
+
+    def next_delay(self):
+        """Seconds until the next refresh, with backoff, hidden factor and jitter applied"""
+        delay = self.interval * (HIDDEN_FACTOR if self.hidden else 1)
+        return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def _schedule(self):
+        self._timer.start(round(self.next_delay() * 1000))
+
+    def _fire(self):
+        self.last_refresh = time.monotonic()
+        # Rescheduled by record(); this covers a refresh that never reports back
+        self._schedule()
+        self.due.emit()
+
+    def record(self, changed):
+        """
+        Adapt the interval to the outcome of a refresh, whatever started it
+
+        Args:
+            changed: True if the refresh brought new data, False if nothing
+                changed or the server could not be reached
+        """
+        self.last_refresh = time.monotonic()
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * BACKOFF_FACTOR, self.max_interval)
+        if self.is_active():
+            self._schedule()
+
+    def set_hidden(self, hidden):
+        """Slow down while the window is hidden or minimized, catch up when it is shown"""
+        if hidden == self.hidden:
+            return
+        self.hidden = hidden
+        if not self.is_active():
+            return
+        if not hidden and time.monotonic() - self.last_refresh >= self.min_interval:
+            self._fire()
+        else:
+            self._schedule()
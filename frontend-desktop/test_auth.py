@@ -4,10 +4,11 @@ Test script to verify authentication is working correctly
 Run this to check if login/register endpoints are properly secured
 """
 
-import requests
 import sys
 
-API_BASE_URL = 'http://localhost:8000/api'
+from api_client import ApiClient
+
+api = ApiClient()
 
 def test_backend_connection():
     """Test if backend is running"""
@@ -16,7 +17,7 @@ def test_backend_connection():
     print("=" * 60)
     
     try:
-        response = requests.get(f'{API_BASE_URL}/', timeout=2)
+        response = api.get('', timeout=2)
         print("✅ Backend is running!")
         return True
     except Exception as e:
@@ -31,10 +32,7 @@ def test_invalid_login():
     print("=" * 60)
     
     try:
-        response = requests.post(
-            f'{API_BASE_URL}/auth/login/',
-            json={'username': 'nonexistent_user_12345', 'password': 'wrongpassword'}
-        )
+        response = api.login('nonexistent_user_12345', 'wrongpassword')
         
         if response.status_code == 401:
             print("✅ PASS: Invalid credentials correctly rejected")
@@ -59,10 +57,7 @@ def test_register_new_user():
     test_password = "testpass123"
     
     try:
-        response = requests.post(
-            f'{API_BASE_URL}/auth/register/',
-            json={'username': test_username, 'password': test_password}
-        )
+        response = api.register(test_username, test_password)
         
         if response.status_code == 201:
             data = response.json()
@@ -88,10 +83,7 @@ def test_valid_login(username, password):
     print("=" * 60)
     
     try:
-        response = requests.post(
-            f'{API_BASE_URL}/auth/login/',
-            json={'username': username, 'password': password}
-        )
+        response = api.login(username, password)
         
         if response.status_code == 200:
             data = response.json()
@@ -117,10 +109,7 @@ def test_duplicate_registration(username, password):
     print("=" * 60)
     
     try:
-        response = requests.post(
-            f'{API_BASE_URL}/auth/register/',
-            json={'username': username, 'password': password}
-        )
+        response = api.register(username, password)
         
         if response.status_code == 400:
             error = response.json().get('error', '')
@@ -146,10 +135,7 @@ def test_missing_credentials():
     print("=" * 60)
     
     try:
-        response = requests.post(
-            f'{API_BASE_URL}/auth/login/',
-            json={'username': '', 'password': ''}
-        )
+        response = api.login('', '')
         
         if response.status_code == 400:
             print("✅ PASS: Empty credentials correctly rejected")
@@ -0,0 +1,253 @@
+"""
+Background workers for the desktop app's API calls
+
+Network requests never run on the GUI thread. Each call is wrapped in a
+BackgroundTask and run on the global QThreadPool; its result, error and
+progress come back through Qt signals, which are delivered on the GUI
+thread. A cancelled task emits nothing but `finished`, so a window that
+logged out or moved on never receives stale results.
+"""
+
+import gzip
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+# Minimum seconds between progress signals, so fast transfers don't flood the GUI thread
+PROGRESS_INTERVAL = 0.05
+# gzip level for compressed uploads; CSV shrinks well even at the fastest level
+UPLOAD_GZIP_LEVEL = 1
+
+
+class TaskCancelled(Exception):
+    """Raised by a task function that noticed it was cancelled"""
+
+
+def describe_error(exc):
+    """User-facing message for an exception raised by an API call"""
+    # ConnectTimeout is both a Timeout and a ConnectionError
+    if isinstance(exc, requests.exceptions.Timeout):
+        return 'Server timeout. Check backend connection.'
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return 'Backend server not running! Start it first.'
+    return str(exc)
+
+
+class TaskSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal('qint64', 'qint64')  # done, total (0 when unknown)
+    stage = pyqtSignal(str)  # e.g. 'Uploading'; progress restarts with each stage
+    partial_result = pyqtSignal(object)  # Provisional result while the task runs
+    finished = pyqtSignal()
+
+
+class BackgroundTask(QRunnable):
+    """
+    Run `fn(task, *args, **kwargs)` on a pool thread
+
+    The function receives the task itself so long transfers can report
+    progress and stop early with `task.check_cancelled()`.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+        self._cancelled = threading.Event()
+        self._last_progress = 0
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def report_progress(self, done, total=0):
+        now = time.monotonic()
+        if done != total and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        if not self.cancelled:
+            self.signals.progress.emit(done, total)
+
+    def report_stage(self, text):
+        self._last_progress = 0
+        if not self.cancelled:
+            self.signals.stage.emit(text)
+
+    def report_partial_result(self, value):
+        if not self.cancelled:
+            self.signals.partial_result.emit(value)
+
+    def run(self):
+        try:
+            result = self.fn(self, *self.args, **self.kwargs)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(describe_error(e))
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class TaskRunner:
+    """Start background tasks on behalf of a window and cancel them together"""
+
+    def __init__(self, pool=None):
+        self.pool = pool or QThreadPool.globalInstance()
+        self.tasks = set()
+
+    def start(self, fn, *args, on_result=None, on_error=None, on_progress=None,
+              on_stage=None, on_partial_result=None, on_finished=None, **kwargs):
+        """Run `fn` in the background and return its BackgroundTask"""
+        task = BackgroundTask(fn, *args, **kwargs)
+        for signal, slot in ((task.signals.result, on_result), (task.signals.error, on_error),
+                             (task.signals.progress, on_progress), (task.signals.stage, on_stage),
+                             (task.signals.partial_result, on_partial_result)):
+            if slot:
+                signal.connect(self._unless_cancelled(task, slot))
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        task.signals.finished.connect(lambda: self.tasks.discard(task))
+        self.tasks.add(task)
+        self.pool.start(task)
+        return task
+
+    @staticmethod
+    def _unless_cancelled(task, slot):
+        """
+        Wrap a slot so it is skipped once the task is cancelled
+
+        A signal emitted just before cancel() is still queued for the GUI
+        thread; this drops it on delivery, e.g. a result arriving after logout.
+        """
+        def deliver(*args):
+            if not task.cancelled:
+                slot(*args)
+        return deliver
+
+    def cancel_all(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+
+# Task functions, run on pool threads
+
+def api_call(task, call, *args, **kwargs):
+    """Run one ApiClient method, e.g. `client.login`, and return its response"""
+    return call(*args, **kwargs)
+
+
+def fetch_json(task, call, *args, **kwargs):
+    """Run one ApiClient method and return its decoded JSON body, raising on HTTP errors"""
+    response = call(*args, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+def load_dataset(task, client, cache, username, dataset_id):
+    """
+    Load what the main window needs to show a dataset, leaving out its rows if it can
+
+    A dataset in the local cache comes with all of its rows. Otherwise only
+    its summary (for the ETag) and the per-type statistics the parameter
+    chart needs are fetched; the table pages rows in as they are scrolled to.
+
+    Returns:
+        dict: `etag`, `summary`, `columns` ({field: array} of all rows, or
+            None) and `stats` (the live stats endpoint's response, or None)
+    """
+    cached = cache.dataset(username, dataset_id)
+    if cached is not None:
+        etag, summary, columns = cached
+        return {'etag': etag, 'summary': summary, 'columns': columns, 'stats': None}
+    response = client.dataset_summary(dataset_id)
+    response.raise_for_status()
+    task.check_cancelled()
+    stats = fetch_json(task, client.dataset_stats, dataset_id)
+    return {'etag': response.headers.get('ETag'), 'summary': response.json(),
+            'columns': None, 'stats': stats}
+
+
+def upload_csv(task, client, file_path, compress=False, chunk_size=1024 * 1024):
+    """
+    Stream a CSV file to the server, gzip-compressing it to a temporary file first if `compress`
+
+    Reports the stages (compressing, uploading, processing) and the bytes
+    done in each. Returns the response.
+    """
+    def on_read(done, total):
+        task.check_cancelled()
+        task.report_progress(done, total)
+        if done == total:
+            task.report_stage('Processing on server')
+
+    path, filename = file_path, os.path.basename(file_path)
+    if compress:
+        task.report_stage('Compressing')
+        fd, path = tempfile.mkstemp(suffix='.csv.gz')
+        filename += '.gz'
+    try:
+        if compress:
+            total, done = os.path.getsize(file_path), 0
+            with open(file_path, 'rb') as src, os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(filename=os.path.basename(file_path), mode='wb',
+                                  compresslevel=UPLOAD_GZIP_LEVEL, fileobj=raw) as dst:
+                for chunk in iter(lambda: src.read(chunk_size), b''):
+                    task.check_cancelled()
+                    dst.write(chunk)
+                    done += len(chunk)
+                    task.report_progress(done, total)
+        task.report_stage('Uploading')
+        return client.upload_csv(path, filename, on_progress=on_read)
+    finally:
+        if compress:
+            os.remove(path)
+
+
+def download_report(task, client, dataset_id, file_path, chunk_size=64 * 1024):
+    """
+    Stream a dataset's PDF report into `file_path`, reporting bytes written
+
+    Returns the response's status code. Nothing is written unless the
+    server answers 200. The report is streamed into a temporary file next
+    to `file_path` and moved into place once complete, so a cancelled or
+    failed download never leaves a truncated PDF behind.
+    """
+    with client.report(dataset_id, stream=True) as response:
+        if response.status_code != 200:
+            return response.status_code
+        total = int(response.headers.get('Content-Length') or 0)
+        done = 0
+        directory, name = os.path.split(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.part', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size):
+                    task.check_cancelled()
+                    f.write(chunk)
+                    done += len(chunk)
+                    task.report_progress(done, total)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return response.status_code
@@ -3,18 +3,18 @@
 Test script to verify user-specific dataset filtering
 """
 
-import requests
+import os
 import sys
 
-API_BASE_URL = 'http://localhost:8000/api'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend-desktop'))
+from api_client import ApiClient
+
+api = ApiClient()
 
 def create_test_user(username, password):
     """Create a test user and return token"""
     try:
-        response = requests.post(
-            f'{API_BASE_URL}/auth/register/',
-            json={'username': username, 'password': password}
-        )
+        response = api.register(username, password)
         
         if response.status_code == 201:
             data = response.json()
@@ -22,10 +22,7 @@ def create_test_user(username, password):
             return data['token']
         elif response.status_code == 400 and 'already exists' in response.json().get('error', ''):
             # User exists, try login
-            response = requests.post(
-                f'{API_BASE_URL}/auth/login/',
-                json={'username': username, 'password': password}
-            )
+            response = api.login(username, password)
             if response.status_code == 200:
                 data = response.json()
                 print(f"✅ Logged in existing user: {username}")
@@ -40,8 +37,9 @@ def create_test_user(username, password):
 def get_datasets(token, username):
     """Get datasets for a user"""
     try:
-        headers = {'Authorization': f'Token {token}'}
-        response = requests.get(f'{API_BASE_URL}/datasets/', headers=headers)
+        # One pooled session for every user; only the token changes
+        api.set_token(token)
+        response = api.datasets()
         
         if response.status_code == 200:
             datasets = response.json()
@@ -67,7 +65,7 @@ def main():
     
     # Check backend
     try:
-        requests.get(f'{API_BASE_URL}/', timeout=2)
+        api.get('', timeout=2)
         print("✅ Backend is running\n")
     except:
         print("❌ Backend not running! Start it with: python manage.py runserver")